@@ -0,0 +1,138 @@
+"""
+Wall-clock time of the discrete-tau and marginalized-tau engines to a fixed effective sample size.
+
+Each engine is refitted with more draws until the minimum ESS over
+tau/mu/sigma reaches ``--target-ess``. The engine's time is the wall-clock
+time of the first fit that reaches the target, so each engine runs only
+the draws it needs. An engine stops early once one fit takes longer than
+``--max-seconds`` without reaching the target. Its time to target is then
+longer than that fit, and the speed-up is reported as a lower bound.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import replace
+import math
+from pathlib import Path
+import sys
+import time
+from typing import Any, Dict
+
+import arviz as az
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from src.config import ModelConfig  # noqa: E402
+from src.models.bayesian_change_point import (  # noqa: E402
+    load_posterior,
+    run_change_point_pipeline,
+)
+
+
+def synthetic_prices(n_obs: int, n_change_points: int, seed: int = 7) -> pd.DataFrame:
+    """Daily price series whose log returns shift mean/volatility at even intervals."""
+    rng = np.random.default_rng(seed)
+    segments = np.array_split(np.arange(n_obs - 1), n_change_points + 1)
+    returns = np.concatenate(
+        [
+            rng.normal(0.0005 * (idx % 2), 0.015 + 0.01 * idx, len(seg))
+            for idx, seg in enumerate(segments)
+        ]
+    )
+    prices = 20.0 * np.exp(np.concatenate([[0.0], np.cumsum(returns)]))
+    dates = pd.bdate_range("1987-05-20", periods=n_obs)
+    out = pd.DataFrame({"Date": dates, "Price": prices})
+    out["log_price"] = np.log(out["Price"])
+    out["log_return"] = out["log_price"].diff()
+    return out
+
+
+def fit_to_target_ess(
+    df: pd.DataFrame,
+    config: ModelConfig,
+    target_ess: float,
+    max_seconds: float,
+    out_dir: Path,
+    label: str,
+) -> Dict[str, Any]:
+    """Refit with more draws until the min ESS reaches ``target_ess`` or a fit exceeds ``max_seconds``."""
+    draws = config.draws
+    while True:
+        cfg = replace(config, draws=draws)
+        posterior_path = out_dir / f"{label}_{draws}_posterior.nc"
+        start = time.perf_counter()
+        summary = run_change_point_pipeline(
+            df,
+            config=cfg,
+            posterior_path=str(posterior_path),
+            results_path=str(out_dir / f"{label}_results.json"),
+            use_cache=False,
+        )
+        seconds = time.perf_counter() - start
+        trace = load_posterior(str(posterior_path))
+        ess = float(
+            az.ess(trace, var_names=["tau", "mu_regimes", "sigma_regimes"]).to_array().min()
+        )
+        taus = [cp["tau_index"] for cp in summary["change_points"]]
+        print(f"{label:>12}: draws={draws:6d}  {seconds:8.2f}s  min_ess={ess:8.1f}  tau={taus}")
+        result = {"seconds": seconds, "ess": ess, "draws": draws, "reached": ess >= target_ess}
+        if result["reached"] or seconds >= max_seconds:
+            return result
+        # Draws the observed ESS per draw asks for, but no fit much longer than
+        # the time budget: that one settles the engine either way.
+        needed = math.ceil(draws * target_ess / max(ess, 1.0) * 1.1)
+        per_iteration = seconds / (cfg.tune + draws)
+        affordable = math.ceil(1.05 * max_seconds / per_iteration) - cfg.tune
+        draws = max(min(needed, affordable), draws + 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-obs", type=int, default=9000)
+    parser.add_argument("--n-change-points", type=int, default=2)
+    parser.add_argument("--draws", type=int, default=200, help="draws of the first fit")
+    parser.add_argument("--tune", type=int, default=500)
+    parser.add_argument("--chains", type=int, default=4)
+    parser.add_argument("--target-ess", type=float, default=400.0)
+    parser.add_argument("--max-seconds", type=float, default=600.0)
+    parser.add_argument("--output-dir", default="bench_output")
+    args = parser.parse_args()
+
+    df = synthetic_prices(args.n_obs, args.n_change_points)
+    out_dir = Path(args.output_dir)
+    results = {}
+    for marginalize in (True, False):
+        label = "marginalized" if marginalize else "discrete"
+        config = ModelConfig(
+            n_change_points=args.n_change_points,
+            draws=args.draws,
+            tune=args.tune,
+            chains=args.chains,
+            marginalize_tau=marginalize,
+        )
+        results[label] = fit_to_target_ess(
+            df, config, args.target_ess, args.max_seconds, out_dir, label
+        )
+
+    marginalized, discrete = results["marginalized"], results["discrete"]
+    for label, result in results.items():
+        outcome = "reached" if result["reached"] else "did not reach"
+        print(
+            f"{label:>12}: {outcome} min_ess={args.target_ess:.0f} "
+            f"in {result['seconds']:.2f}s ({result['draws']} draws per chain)"
+        )
+    if not marginalized["reached"]:
+        print("wall-clock speed-up: n/a (the marginalized engine missed the target)")
+        return
+    speedup = discrete["seconds"] / marginalized["seconds"]
+    bound = "" if discrete["reached"] else ">= "
+    print(f"wall-clock speed-up to min_ess={args.target_ess:.0f}: {bound}{speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,18 +12,41 @@ if str(REPO_ROOT) not in sys.path:
 
 from cache import InMemoryCache
 from routes.change_points import change_points_bp
-from routes.events import events_bp
+from routes.events import EVENTS_PATH, PRICES_PATH, events_bp
 from routes.prices import prices_bp
+from routes.var import var_bp
+from src.data.columnar_store import event_table, price_table
+from src.data.price_snapshot import load_price_snapshot
+
+
+def _warm_data_store() -> None:
+    """
+    Convert (if stale) and memory-map the processed CSVs before the first request.
+
+    Under ``gunicorn.conf.py`` (``preload_app``) this runs once in the master,
+    and forked workers share the mapped pages instead of loading their own.
+    """
+    for path, open_table in (
+        (PRICES_PATH, price_table),
+        (PRICES_PATH, load_price_snapshot),
+        (EVENTS_PATH, event_table),
+    ):
+        try:
+            open_table(str(path))
+        except FileNotFoundError:
+            pass
 
 
 def create_app() -> Flask:
     app = Flask(__name__)
     CORS(app)
     app.config["CACHE"] = InMemoryCache(ttl_seconds=120)
+    _warm_data_store()
 
     app.register_blueprint(prices_bp, url_prefix="/api/prices")
     app.register_blueprint(change_points_bp, url_prefix="/api/change-points")
     app.register_blueprint(events_bp, url_prefix="/api/events")
+    app.register_blueprint(var_bp, url_prefix="/api/var")
 
     @app.route("/api/health", methods=["GET"])
     def health_check() -> tuple[dict[str, str], int]:
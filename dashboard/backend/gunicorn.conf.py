@@ -0,0 +1,13 @@
+"""Gunicorn settings for serving the dashboard API with several workers."""
+
+import multiprocessing
+import os
+
+wsgi_app = "app:create_app()"
+bind = os.environ.get("DASHBOARD_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("DASHBOARD_WORKERS", multiprocessing.cpu_count()))
+# Build and map the columnar store and price snapshot once in the master;
+# workers inherit the read-only mappings, so memory stays flat as they scale.
+preload_app = True
+# Background jobs (SHAP builds, change-point refits) keep their status in
+# marker files under models/, so any worker can report a job another started.
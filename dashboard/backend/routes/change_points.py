@@ -1,17 +1,48 @@
 from __future__ import annotations
 
-import base64
+from datetime import datetime, timezone
 import json
 from pathlib import Path
-from typing import Any, Dict, List
+import threading
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 import pandas as pd
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request, send_file
 
-from src.constants import CHANGE_POINT_RESULTS_PATH, SHAP_GLOBAL_PNG, SHAP_LOCAL_PNG
-from src.data.macro_loader import load_macro_data
-from src.models.explainability import run_shap_analysis, shap_runtime_status
+from routes.events import EVENTS_PATH
+from src.analysis.event_mapping import nearest_events
+from src.config import load_model_config
+from src.constants import (
+    CHANGE_POINT_RESULTS_PATH,
+    DEFAULT_EVENT_MATCH_LIMIT,
+    DEFAULT_EVENT_TOLERANCE_DAYS,
+    MODEL_V1_CONFIG_PATH,
+    MODEL_V2_POSTERIOR_PATH,
+    SHAP_ARTIFACT_DIR,
+    SHAP_GLOBAL_PNG,
+    SHAP_LOCAL_PNG,
+)
+from src.data.columnar_store import (
+    event_date_column,
+    event_table,
+    event_titles,
+    price_table,
+    text_column,
+)
+from src.data.json_values import float32_list
+from src.models.explainability import (
+    global_importance_data,
+    local_explanation_data,
+    shap_runtime_status,
+)
+from src.models.job_state import JobMarker
+from src.models.shap_artifacts import (
+    ShapArtifacts,
+    ShapArtifactStore,
+    ShapJobRunner,
+    shap_artifact_version,
+)
 
 change_points_bp = Blueprint("change_points", __name__)
 
@@ -20,12 +51,54 @@ RESULTS_PATH = BASE_DIR / CHANGE_POINT_RESULTS_PATH
 PRICES_PATH = BASE_DIR / "data" / "processed" / "brentoilprices_processed.csv"
 SHAP_GLOBAL_PATH = BASE_DIR / SHAP_GLOBAL_PNG
 SHAP_LOCAL_PATH = BASE_DIR / SHAP_LOCAL_PNG
+SHAP_ARTIFACT_PATH = BASE_DIR / SHAP_ARTIFACT_DIR
+MODEL_CONFIG_PATH = BASE_DIR / MODEL_V1_CONFIG_PATH
+POSTERIOR_PATH = BASE_DIR / MODEL_V2_POSTERIOR_PATH
+
+_shap_store = ShapArtifactStore(str(SHAP_ARTIFACT_PATH))
+_shap_jobs = ShapJobRunner(_shap_store)
+
+# Refit status, shared by every server worker: only the worker whose claim
+# creates the marker refits, so two refits never write the same files.
+REFRESH_STATE_PATH = POSTERIOR_PATH.parent / "refresh.job.json"
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _load_prices() -> pd.DataFrame:
+    return price_table(str(PRICES_PATH)).to_frame()
+
+
+def _load_pelt_results() -> Optional[Dict[str, Any]]:
+    """Deterministic PELT summary, computed once per cache lifetime."""
+    cache = current_app.config.get("CACHE")
+    if cache is not None:
+        cached = cache.get("pelt_change_points")
+        if cached is not None:
+            return cached
+    try:
+        # Imported on first use: the PELT kernels load numba, which startup avoids.
+        from src.models.pelt_change_point import run_pelt_pipeline
+
+        prices = _load_prices()
+        config = load_model_config(str(MODEL_CONFIG_PATH))
+        summary = run_pelt_pipeline(prices, n_change_points=config.n_change_points, results_path=None)
+    except Exception:
+        return None
+    if cache is not None:
+        cache.set("pelt_change_points", summary)
+    return summary
 
 
 def _load_change_point_results() -> Dict[str, Any]:
     if RESULTS_PATH.exists():
         with RESULTS_PATH.open("r", encoding="utf-8") as handle:
             return json.load(handle)
+    pelt_results = _load_pelt_results()
+    if pelt_results is not None:
+        return pelt_results
     return {
         "n_change_points": 1,
         "change_points": [{"name": "cp_1", "tau_date": "2012-06-04", "tau_index": 1500}],
@@ -39,12 +112,55 @@ def get_change_points() -> Any:
     return jsonify(_load_change_point_results())
 
 
+def _refresh_marker() -> JobMarker:
+    return JobMarker(str(REFRESH_STATE_PATH))
+
+
+def _run_refresh(prices: pd.DataFrame) -> None:
+    try:
+        from src.models.bayesian_change_point import run_change_point_pipeline
+
+        run_change_point_pipeline(
+            prices,
+            config=load_model_config(str(MODEL_CONFIG_PATH)),
+            posterior_path=str(POSTERIOR_PATH),
+            results_path=str(RESULTS_PATH),
+        )
+        outcome = {"status": "completed", "error": None}
+    except Exception as exc:  # pragma: no cover
+        outcome = {"status": "failed", "error": str(exc)}
+    _refresh_marker().update(**outcome, finished_at=_utc_now())
+
+
+@change_points_bp.route("/refresh", methods=["POST"])
+def refresh_change_points() -> Any:
+    """Start a background MCMC refit; results keep being served meanwhile."""
+    try:
+        prices = _load_prices()
+    except FileNotFoundError:
+        return jsonify({"error": "Required files not found"}), 404
+    marker = _refresh_marker()
+    claimed, state = marker.claim(replace=("completed", "failed"))
+    if not claimed:
+        return jsonify(state), 409
+    state = marker.update(status="running", started_at=_utc_now())
+    threading.Thread(target=_run_refresh, args=(prices,), daemon=True).start()
+    return jsonify(state), 202
+
+
+@change_points_bp.route("/refresh", methods=["GET"])
+def get_refresh_status() -> Any:
+    state = _refresh_marker().read()
+    if state is None:
+        state = {"status": "idle", "started_at": None, "finished_at": None, "error": None}
+    return jsonify(state)
+
+
 @change_points_bp.route("/details", methods=["GET"])
 def get_change_point_details() -> Any:
     try:
         results = _load_change_point_results()
-        prices = pd.read_csv(PRICES_PATH)
-        prices["Date"] = pd.to_datetime(prices["Date"], errors="coerce")
+        prices = _load_prices()
 
         regimes: List[Dict[str, Any]] = []
         for cp in results.get("change_points", []):
@@ -77,19 +193,22 @@ def get_change_point_details() -> Any:
 
 @change_points_bp.route("/posterior", methods=["GET"])
 def get_posterior_samples() -> Any:
-    """Provide synthetic posterior samples shaped for dashboard rendering."""
+    """Posterior tau summaries persisted with the change-point results."""
     results = _load_change_point_results()
-    cps = results.get("change_points", [])
     posterior: Dict[str, Dict[str, Any]] = {}
-    for idx, cp in enumerate(cps, start=1):
-        center = cp.get("tau_index", 1)
-        samples = np.random.normal(center, 5.0, 300).clip(min=0).tolist()
+    for idx, cp in enumerate(results.get("change_points", []), start=1):
+        # Point-estimate results (PELT, online, canned) have a degenerate posterior.
+        tau_index = cp.get("tau_index")
         posterior[f"tau_{idx}"] = {
-            "samples": samples,
-            "posterior_mean": float(np.mean(samples)),
-            "hdi_lower": float(np.percentile(samples, 3)),
-            "hdi_upper": float(np.percentile(samples, 97)),
+            "posterior_mean": cp.get("posterior_mean", tau_index),
+            "hdi_lower": cp.get("hdi_lower", tau_index),
+            "hdi_upper": cp.get("hdi_upper", tau_index),
+            "hdi_lower_date": cp.get("hdi_lower_date", cp.get("tau_date")),
+            "hdi_upper_date": cp.get("hdi_upper_date", cp.get("tau_date")),
             "tau_date": cp.get("tau_date"),
+            "posterior_mass": cp.get(
+                "posterior_mass", [{"date": cp.get("tau_date"), "probability": 1.0}]
+            ),
         }
     return jsonify(posterior)
 
@@ -100,39 +219,247 @@ def get_business_impact() -> Any:
     return jsonify({"business_impact": results.get("business_impact", [])})
 
 
-def _png_to_base64(path: Path) -> str | None:
-    if not path.exists():
-        return None
-    return base64.b64encode(path.read_bytes()).decode("utf-8")
+@change_points_bp.route("/events", methods=["GET"])
+def get_change_point_events() -> Any:
+    """
+    Events from events.csv near each change point.
+
+    Every change point gets its ``limit`` nearest events within
+    ``tolerance_days`` (either side), nearest first, with the signed offset
+    in days from the change point to the event.
+    """
+    try:
+        tolerance_days = int(request.args.get("tolerance_days", DEFAULT_EVENT_TOLERANCE_DAYS))
+        limit = int(request.args.get("limit", DEFAULT_EVENT_MATCH_LIMIT))
+        events = event_table(str(EVENTS_PATH)).to_frame()
+        change_points = _load_change_point_results().get("change_points", [])
+        date_col = event_date_column(events)
+        event_dates = (
+            events[date_col].to_numpy(dtype="datetime64[ns]")
+            if date_col is not None
+            else np.full(len(events), np.datetime64("NaT"), dtype="datetime64[ns]")
+        )
+        owner, matched, offset = nearest_events(
+            [cp.get("tau_date") for cp in change_points], event_dates, tolerance_days, limit
+        )
+    except FileNotFoundError:
+        return jsonify({"error": "Events file not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as exc:  # pragma: no cover
+        return jsonify({"error": str(exc)}), 500
+
+    dates = np.datetime_as_string(event_dates[matched], unit="D").tolist()
+    titles = event_titles(events)[matched].tolist()
+    categories = text_column(events, "category")[matched].tolist()
+    descriptions = text_column(events, "description")[matched].tolist()
+    attributed: List[Dict[str, Any]] = [dict(cp, events=[]) for cp in change_points]
+    for row, cp_row in enumerate(owner.tolist()):
+        attributed[cp_row]["events"].append(
+            {
+                "date": dates[row],
+                "title": titles[row],
+                "category": categories[row],
+                "description": descriptions[row],
+                "offset_days": int(offset[row]),
+            }
+        )
+    return jsonify(
+        {"tolerance_days": tolerance_days, "limit": limit, "change_points": attributed}
+    )
+
+
+# Artifact versions never change once published, so their plots can be cached for good.
+SHAP_PLOT_MAX_AGE = 365 * 24 * 3600
+SHAP_PLOT_URL = "/api/change-points/shap/plots"
+_STATIC_SHAP_PLOTS = {"global.png": SHAP_GLOBAL_PATH, "local.png": SHAP_LOCAL_PATH}
+
+
+def _static_plot_url(name: str) -> Optional[str]:
+    return f"{SHAP_PLOT_URL}/static/{name}" if _STATIC_SHAP_PLOTS[name].exists() else None
+
+
+def _parse_iso_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, "%Y-%m-%d") if value else None
+
+
+def _shap_version() -> tuple:
+    digest = price_table(str(PRICES_PATH)).digest
+    return shap_artifact_version(digest, _shap_jobs.method), digest
+
+
+def _shap_payload(artifacts: ShapArtifacts, selected_date: Optional[str]) -> Dict[str, Any]:
+    """Plot-ready numbers for both charts, plus URLs of their PNGs (rendered only when fetched)."""
+    explanation = artifacts.explanation()
+    row = explanation.row_for_date(selected_date)
+    local_chart = local_explanation_data(explanation, row)
+    plots = f"{SHAP_PLOT_URL}/{artifacts.version}"
+    return {
+        "status": "ready",
+        "version": artifacts.version,
+        "mode": artifacts.meta["mode"],
+        "selected_date": local_chart["date"],
+        "local_explanation": dict(
+            zip(artifacts.meta["feature_names"], float32_list(artifacts.values[row]))
+        ),
+        "base_value": artifacts.meta["base_value"],
+        "global_chart": global_importance_data(explanation),
+        "local_chart": local_chart,
+        "global_plot_url": f"{plots}/global.png",
+        "local_plot_url": f"{plots}/local/{local_chart['date']}.png",
+    }
 
 
 @change_points_bp.route("/shap", methods=["GET"])
 def get_shap_assets() -> Any:
+    """
+    SHAP charts for the current price data, without training in the request.
+
+    Artifacts are built once per data version by a background job. While it
+    runs the response is 202 with the job handle (and the previous version's
+    charts, marked ``stale``, when there are any). ``selected_date`` picks the
+    local explanation from the stored SHAP matrix. Charts are plot-ready
+    numbers; PNGs are linked by URL, never inlined.
+    """
     selected_date = request.args.get("selected_date")
     try:
-        prices = pd.read_csv(PRICES_PATH)
-        prices["Date"] = pd.to_datetime(prices["Date"], errors="coerce")
-        merged = load_macro_data(prices)
-        run_shap_analysis(
-            merged,
-            global_path=str(SHAP_GLOBAL_PATH),
-            local_path=str(SHAP_LOCAL_PATH),
-            selected_date=selected_date,
+        version, digest = _shap_version()
+    except FileNotFoundError:
+        # No price data to explain: serve the plots shipped in reports/.
+        return jsonify(
+            {
+                "status": "static",
+                "global_plot_url": _static_plot_url("global.png"),
+                "local_plot_url": _static_plot_url("local.png"),
+            }
         )
-    except Exception:
-        # Keep serving existing artifacts if dynamic generation fails.
-        pass
 
+    artifacts = _shap_store.load(version)
+    if artifacts is not None:
+        return jsonify(_shap_payload(artifacts, selected_date))
+
+    job = _shap_jobs.submit(version, _load_prices, digest)
+    payload: Dict[str, Any] = {
+        "status": job["status"],
+        "version": version,
+        "job": job,
+        "status_url": f"/api/change-points/shap/jobs/{version}",
+        "global_plot_url": None,
+        "local_plot_url": None,
+    }
+    previous = _shap_store.latest()
+    if previous is not None:
+        payload.update(_shap_payload(previous, selected_date), status=job["status"], stale=True)
+        payload["version"] = version
+    return jsonify(payload), 202
+
+
+@change_points_bp.route("/shap/local", methods=["GET"])
+def get_shap_local_explanations() -> Any:
+    """
+    Numeric local explanations from the stored SHAP matrix.
+
+    ``date`` returns the row on or before that date; ``start_date`` and/or
+    ``end_date`` return every row in the range. Rows are found by binary
+    search on the artifact's date index; nothing is trained or plotted.
+    """
+    try:
+        version, digest = _shap_version()
+        date = _parse_iso_date(request.args.get("date"))
+        start_date = _parse_iso_date(request.args.get("start_date"))
+        end_date = _parse_iso_date(request.args.get("end_date"))
+    except FileNotFoundError:
+        return jsonify({"error": "Data file not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    artifacts = _shap_store.load(version)
+    if artifacts is None:
+        job = _shap_jobs.submit(version, _load_prices, digest)
+        return jsonify({"status": job["status"], "version": version, "job": job}), 202
+
+    if date is not None:
+        row = artifacts.row_asof(date)
+        if row is None:
+            return jsonify({"error": f"No SHAP values on or before {date:%Y-%m-%d}"}), 404
+        rows = slice(row, row + 1)
+    else:
+        rows = artifacts.rows(start_date, end_date)
+
+    names = artifacts.meta["feature_names"]
+    values = artifacts.values[rows]
+    features = artifacts.features[rows]
+    base_value = float(artifacts.meta["base_value"])
     return jsonify(
         {
-            "global_plot_b64": _png_to_base64(SHAP_GLOBAL_PATH),
-            "local_plot_b64": _png_to_base64(SHAP_LOCAL_PATH),
-            "global_plot_path": str(SHAP_GLOBAL_PATH),
-            "local_plot_path": str(SHAP_LOCAL_PATH),
+            "version": version,
+            "mode": artifacts.meta["mode"],
+            "base_value": base_value,
+            "feature_names": names,
+            "count": len(values),
+            "dates": np.datetime_as_string(artifacts.dates[rows], unit="D").tolist(),
+            "shap_values": {name: float32_list(values[:, col]) for col, name in enumerate(names)},
+            "feature_values": {
+                name: float32_list(features[:, col]) for col, name in enumerate(names)
+            },
+            "prediction": float32_list(base_value + values.sum(axis=1, dtype=np.float64)),
         }
     )
 
 
+@change_points_bp.route("/shap/plots/<version>/<path:name>", methods=["GET"])
+def get_shap_plot(version: str, name: str) -> Any:
+    """
+    A SHAP plot PNG, served as a file with an ETag (``If-None-Match`` gets a 304).
+
+    ``name`` is ``global.png`` or ``local/<YYYY-MM-DD>.png`` (the row on or
+    before that date, rendered with the Agg API on first request). Version
+    ``static`` serves the ``global.png``/``local.png`` shipped in reports/.
+    """
+    if version == "static":
+        path = _STATIC_SHAP_PLOTS.get(name)
+        if path is None or not path.exists():
+            return jsonify({"error": "Plot not found"}), 404
+        return send_file(path, mimetype="image/png", max_age=0)
+
+    artifacts = _shap_store.load(version)
+    if artifacts is None:
+        return jsonify({"error": f"Unknown SHAP version {version}"}), 404
+    if name == "global.png":
+        path = artifacts.global_plot
+    elif name.startswith("local/") and name.endswith(".png"):
+        try:
+            date = _parse_iso_date(name[len("local/") : -len(".png")])
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        row = artifacts.row_asof(date) if date is not None else None
+        if row is None:
+            return jsonify({"error": f"No SHAP values on or before {name}"}), 404
+        path = artifacts.local_plot(row)
+    else:
+        return jsonify({"error": "Plot not found"}), 404
+    return send_file(path, mimetype="image/png", max_age=SHAP_PLOT_MAX_AGE)
+
+
+@change_points_bp.route("/shap/jobs/<version>", methods=["GET"])
+def get_shap_job(version: str) -> Any:
+    job = _shap_jobs.status(version)
+    if job is None:
+        return jsonify({"error": "Unknown SHAP job"}), 404
+    return jsonify(job)
+
+
+@change_points_bp.route("/shap/jobs", methods=["POST"])
+def submit_shap_job() -> Any:
+    """(Re)start the artifact build for the current data; retries a failed job."""
+    try:
+        version, digest = _shap_version()
+    except FileNotFoundError:
+        return jsonify({"error": "Data file not found"}), 404
+    job = _shap_jobs.submit(version, _load_prices, digest, retry=True)
+    return jsonify(job), 200 if job["status"] == "done" else 202
+
+
 @change_points_bp.route("/shap/status", methods=["GET"])
 def get_shap_status() -> Any:
     return jsonify(shap_runtime_status())
@@ -1,56 +1,126 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+import numpy as np
 import pandas as pd
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from src.analysis.event_impact import batch_event_impact
+from src.constants import DEFAULT_EVENT_WINDOWS
+from src.data.columnar_store import (
+    ColumnarTable,
+    event_date_column,
+    event_table,
+    event_titles,
+    text_column,
+)
+from src.data.price_snapshot import PriceSnapshot, load_price_snapshot
+from wire_formats import (
+    JSON_MIMETYPE,
+    columnar_body,
+    columnar_response,
+    negotiate,
+    vary_on_accept,
+)
 
 events_bp = Blueprint("events", __name__)
+events_bp.after_request(vary_on_accept)
 
 BASE_DIR = Path(__file__).resolve().parents[3]
 EVENTS_PATH = BASE_DIR / "data" / "processed" / "events.csv"
 PRICES_PATH = BASE_DIR / "data" / "processed" / "brentoilprices_processed.csv"
 
 
-def _event_date_column(df: pd.DataFrame) -> Optional[str]:
-    for col in ("start_date", "date", "event_date"):
-        if col in df.columns:
-            return col
-    return None
+def _event_store() -> ColumnarTable:
+    return event_table(str(EVENTS_PATH))
+
+
+def _load_events() -> pd.DataFrame:
+    """Events with parsed date columns, from the columnar store."""
+    return _event_store().to_frame()
+
+
+def _load_snapshot() -> PriceSnapshot:
+    return load_price_snapshot(str(PRICES_PATH))
+
+
+def _percent_change(before_avg: Any, after_avg: Any) -> Any:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (after_avg - before_avg) / before_avg * 100.0
+
+
+def _rounded(value: float) -> Optional[float]:
+    return round(float(value), 2) if np.isfinite(value) and value else None
+
+
+def _event_columns(df: pd.DataFrame, date_col: Optional[str]) -> Dict[str, np.ndarray]:
+    """Event list as columns, newest first; undated events keep their order at the end."""
+    if date_col is None:
+        dates = np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+    else:
+        dates = df[date_col].to_numpy(dtype="datetime64[ns]")
+    # Stable descending sort (NaT is the smallest key, so it goes last).
+    order = len(dates) - 1 - np.argsort(dates.view(np.int64)[::-1], kind="stable")[::-1]
+    return {
+        "date": dates[order],
+        "title": event_titles(df)[order],
+        "description": text_column(df, "description")[order],
+        "category": text_column(df, "category")[order],
+    }
+
+
+def _json_list(values: np.ndarray) -> list:
+    """NaN-safe JSON list."""
+    values = np.asarray(values, dtype=float)
+    return [value if ok else None for value, ok in zip(values.tolist(), np.isfinite(values).tolist())]
+
+
+def _parse_windows(value: Optional[str]) -> tuple:
+    if not value:
+        return tuple(DEFAULT_EVENT_WINDOWS)
+    return tuple(int(part) for part in value.split(",") if part.strip())
 
 
 @events_bp.route("/", methods=["GET"])
 def get_events() -> Any:
     try:
-        df = pd.read_csv(EVENTS_PATH)
+        df = _load_events()
         start_date = request.args.get("start_date")
         end_date = request.args.get("end_date")
         category = request.args.get("category")
 
-        date_col = _event_date_column(df)
+        date_col = event_date_column(df)
         if date_col is not None:
-            df["_date"] = pd.to_datetime(df[date_col], errors="coerce")
             if start_date:
-                df = df[df["_date"] >= datetime.strptime(start_date, "%Y-%m-%d")]
+                df = df[df[date_col] >= datetime.strptime(start_date, "%Y-%m-%d")]
             if end_date:
-                df = df[df["_date"] <= datetime.strptime(end_date, "%Y-%m-%d")]
+                df = df[df[date_col] <= datetime.strptime(end_date, "%Y-%m-%d")]
 
         if category and "category" in df.columns:
             df = df[df["category"] == category]
 
-        events: list[Dict[str, Any]] = []
-        for _, row in df.iterrows():
-            events.append(
-                {
-                    "date": str(row.get(date_col, "")) if date_col else None,
-                    "title": row.get("event_name") or row.get("title") or row.get("event") or "",
-                    "description": row.get("description") or "",
-                    "category": row.get("category") or "",
-                }
+        columns = _event_columns(df, date_col)
+        mimetype = negotiate()
+        if mimetype != JSON_MIMETYPE:
+            return columnar_response(columns, {"count": len(df)}, mimetype)
+
+        if date_col is None:
+            dates: list = [None] * len(df)
+        else:
+            dates = np.datetime_as_string(columns["date"], unit="D").tolist()
+            dates = ["" if date == "NaT" else date for date in dates]
+        events = [
+            {"date": date, "title": title, "description": description, "category": category}
+            for date, title, description, category in zip(
+                dates,
+                columns["title"].tolist(),
+                columns["description"].tolist(),
+                columns["category"].tolist(),
             )
-        events.sort(key=lambda item: item["date"] or "", reverse=True)
+        ]
         return jsonify({"events": events, "count": len(events)})
     except FileNotFoundError:
         return jsonify({"events": [], "count": 0})
@@ -65,83 +135,160 @@ def get_event_correlation() -> Any:
         window = int(request.args.get("window", 30))
         if not event_date:
             return jsonify({"error": "event_date parameter required"}), 400
+        try:
+            event_day = datetime.strptime(event_date, "%Y-%m-%d")
+        except ValueError:
+            return jsonify({"error": "event_date must be YYYY-MM-DD"}), 400
 
-        events_df = pd.read_csv(EVENTS_PATH)
-        prices_df = pd.read_csv(PRICES_PATH)
-        prices_df["Date"] = pd.to_datetime(prices_df["Date"], errors="coerce")
-        date_col = _event_date_column(events_df)
+        events_df = _load_events()
+        snapshot = _load_snapshot()
+        date_col = event_date_column(events_df)
         if date_col is None:
             return jsonify({"error": "No date column found in events"}), 400
 
-        event_rows = events_df[events_df[date_col].astype(str) == event_date]
+        event_rows = events_df[events_df[date_col] == pd.Timestamp(event_day)]
         if event_rows.empty:
             return jsonify({"error": "Event not found"}), 404
-        event_row = event_rows.iloc[0]
-        event_title = event_row.get("event_name") or event_row.get("title") or event_row.get("event", "")
-
-        event_dt = datetime.strptime(event_date, "%Y-%m-%d")
-        before_start = event_dt - timedelta(days=window)
-        after_end = event_dt + timedelta(days=window)
-        before = prices_df[(prices_df["Date"] >= before_start) & (prices_df["Date"] < event_dt)]
-        after = prices_df[(prices_df["Date"] > event_dt) & (prices_df["Date"] <= after_end)]
-        before_avg = before["Price"].mean() if not before.empty else None
-        after_avg = after["Price"].mean() if not after.empty else None
-        pct = ((after_avg - before_avg) / before_avg * 100.0) if before_avg and after_avg else None
-
-        nearby = prices_df[(prices_df["Date"] >= before_start) & (prices_df["Date"] <= after_end)].copy()
-        nearby["Date"] = nearby["Date"].dt.strftime("%Y-%m-%d")
+        event_title = event_titles(event_rows.iloc[:1])[0]
+
+        index = snapshot.index
+        event_dt = np.datetime64(event_day, "ns")
+        span = np.timedelta64(window, "D")
+        before_lo, before_hi = index.bounds(event_dt - span, event_dt, closed="left")
+        after_lo, after_hi = index.bounds(event_dt, event_dt + span, closed="right")
+        before_avg = float(index.window_mean("Price", before_lo, before_hi))
+        after_avg = float(index.window_mean("Price", after_lo, after_hi))
+        pct = _percent_change(before_avg, after_avg)
+
+        nearby = slice(int(before_lo), int(after_hi))
+        chart_data = [
+            {"Date": date, "Price": price}
+            for date, price in zip(
+                np.datetime_as_string(snapshot.dates[nearby], unit="D").tolist(),
+                snapshot.price[nearby].tolist(),
+            )
+        ]
         return jsonify(
             {
                 "event": {"date": event_date, "title": event_title},
                 "analysis": {
                     "window_days": window,
-                    "before_avg_price": round(float(before_avg), 2) if before_avg else None,
-                    "after_avg_price": round(float(after_avg), 2) if after_avg else None,
-                    "price_change_percent": round(float(pct), 2) if pct else None,
+                    "before_avg_price": _rounded(before_avg),
+                    "after_avg_price": _rounded(after_avg),
+                    "price_change_percent": _rounded(pct),
                 },
-                "chart_data": nearby[["Date", "Price"]].to_dict(orient="records"),
+                "chart_data": chart_data,
             }
         )
     except FileNotFoundError:
         return jsonify({"error": "Data file not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     except Exception as exc:  # pragma: no cover
         return jsonify({"error": str(exc)}), 500
 
 
+# Per-window impact statistics: (output name, batch_event_impact key, decimals).
+_IMPACT_STATS = (
+    ("before_avg_price", "before_mean", 2),
+    ("after_avg_price", "after_mean", 2),
+    ("price_change_percent", "percent_change", 2),
+    ("volatility_change", "volatility_change", None),
+    ("abnormal_return", "abnormal_return", None),
+)
+
+
+def _impact_columns(events: ColumnarTable, index: Any, windows: tuple) -> Dict[str, np.ndarray]:
+    """
+    Event impact as flat columns, largest absolute first-window move first.
+
+    Statistics are named ``<stat>_<days>d``; rounded statistics are NaN where
+    the record payload shows ``None`` (missing or exactly zero).
+    """
+    events_df = events.to_frame()
+    date_col = event_date_column(events_df)
+    if date_col is None:
+        event_dates = np.array([], dtype="datetime64[ns]")
+        events_df = events_df.iloc[:0]
+    else:
+        event_dates = events_df[date_col].to_numpy(dtype="datetime64[ns]")
+        dated = ~np.isnat(event_dates)
+        events_df = events_df[dated]
+        event_dates = event_dates[dated]
+    impact = batch_event_impact(index, event_dates, windows)
+    # Largest absolute move in the first window first, as before.
+    order = np.argsort(-np.nan_to_num(np.abs(impact["percent_change"][:, 0])), kind="stable")
+
+    columns = {
+        "date": event_dates[order],
+        "title": event_titles(events_df)[order],
+        "category": text_column(events_df, "category")[order],
+    }
+    for col, days in enumerate(windows):
+        for name, key, decimals in _IMPACT_STATS:
+            values = impact[key][order, col]
+            if decimals is not None:
+                values = np.where(values != 0, np.round(values, decimals), np.nan)
+            columns[f"{name}_{days}d"] = values
+    return columns
+
+
+def _impact_payload(columns: Dict[str, np.ndarray], windows: tuple) -> Dict[str, Any]:
+    """Record-oriented ``/impact`` JSON built from ``_impact_columns``."""
+    per_window = [
+        {name: _json_list(columns[f"{name}_{days}d"]) for name, _, _ in _IMPACT_STATS}
+        for days in windows
+    ]
+    dates = np.datetime_as_string(columns["date"], unit="D").tolist()
+    impacts: list[Dict[str, Any]] = []
+    for row, (date, title, category) in enumerate(
+        zip(dates, columns["title"].tolist(), columns["category"].tolist())
+    ):
+        impacts.append(
+            {
+                "date": date,
+                "title": title,
+                "category": category,
+                "price_change_percent": per_window[0]["price_change_percent"][row],
+                "windows": {
+                    str(days): {name: values[row] for name, values in stats.items()}
+                    for days, stats in zip(windows, per_window)
+                },
+            }
+        )
+    return {"impacts": impacts, "count": len(impacts), "windows": list(windows)}
+
+
 @events_bp.route("/impact", methods=["GET"])
 def get_event_impact() -> Any:
-    try:
-        events_df = pd.read_csv(EVENTS_PATH)
-        prices_df = pd.read_csv(PRICES_PATH)
-        prices_df["Date"] = pd.to_datetime(prices_df["Date"], errors="coerce")
-        date_col = _event_date_column(events_df)
-        if date_col is None:
-            return jsonify({"impacts": [], "count": 0})
-
-        impacts: list[Dict[str, Any]] = []
-        for _, event in events_df.iterrows():
-            if not event.get(date_col):
-                continue
-            event_dt = pd.to_datetime(event.get(date_col), errors="coerce")
-            if pd.isna(event_dt):
-                continue
-            before = prices_df[(prices_df["Date"] >= event_dt - timedelta(days=30)) & (prices_df["Date"] < event_dt)]
-            after = prices_df[(prices_df["Date"] > event_dt) & (prices_df["Date"] <= event_dt + timedelta(days=30))]
-            before_avg = before["Price"].mean() if not before.empty else None
-            after_avg = after["Price"].mean() if not after.empty else None
-            pct = ((after_avg - before_avg) / before_avg * 100.0) if before_avg and after_avg else None
-            impacts.append(
-                {
-                    "date": str(event.get(date_col)),
-                    "title": event.get("event_name") or event.get("title") or event.get("event", ""),
-                    "category": event.get("category") or "",
-                    "price_change_percent": round(float(pct), 2) if pct else None,
-                }
-            )
+    """
+    Before/after impact of every event for each of ``windows`` (comma-separated days).
 
-        impacts.sort(key=lambda item: abs(item["price_change_percent"] or 0.0), reverse=True)
-        return jsonify({"impacts": impacts, "count": len(impacts)})
+    Computed in one vectorized pass and cached as the serialized body per
+    events file, price snapshot, window list and negotiated format.
+    """
+    try:
+        windows = _parse_windows(request.args.get("windows"))
+        mimetype = negotiate()
+        events = _event_store()
+        snapshot = _load_snapshot()
+        cache = current_app.config.get("CACHE")
+        cache_key = f"event_impact:{events.digest}:{snapshot.digest}:{windows}:{mimetype}"
+        body = cache.get(cache_key) if cache is not None else None
+        if body is None:
+            columns = _impact_columns(events, snapshot.index, windows)
+            if mimetype == JSON_MIMETYPE:
+                body = current_app.json.dumps(_impact_payload(columns, windows))
+            else:
+                meta = {"count": len(columns["date"]), "windows": list(windows)}
+                body = columnar_body(columns, meta, mimetype)
+                body = body if isinstance(body, bytes) else "".join(body)
+            if cache is not None:
+                cache.set(cache_key, body)
+        return Response(body, mimetype=mimetype)
     except FileNotFoundError:
         return jsonify({"impacts": [], "count": 0})
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     except Exception as exc:  # pragma: no cover
         return jsonify({"error": str(exc)}), 500
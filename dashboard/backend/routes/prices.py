@@ -6,37 +6,35 @@ from typing import Any, Dict, Optional
 
 import numpy as np
 import pandas as pd
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 
-from src.constants import DEFAULT_VOLATILITY_WINDOW
+from src.analysis.downsample import downsample_indices
+from src.constants import (
+    DEFAULT_DOWNSAMPLE_METHOD,
+    DEFAULT_EWMA_LAMBDA,
+    DEFAULT_VOLATILITY_WINDOW,
+)
+from src.data.columnar_store import price_table
 from src.data.macro_loader import load_macro_data
+from src.data.price_snapshot import PriceSnapshot, load_price_snapshot
+from streaming import iter_json_document, iter_ndjson
+from wire_formats import JSON_MIMETYPE, columnar_response, negotiate, vary_on_accept
 
 prices_bp = Blueprint("prices", __name__)
+prices_bp.after_request(vary_on_accept)
 
 BASE_DIR = Path(__file__).resolve().parents[3]
 DATA_PATH = BASE_DIR / "data" / "processed" / "brentoilprices_processed.csv"
 
 
-def _get_cache() -> Any:
-    return current_app.config.get("CACHE")
+def _load_prices() -> pd.DataFrame:
+    """Preprocessed prices as views of the memory-mapped columnar store."""
+    return price_table(str(DATA_PATH)).to_frame()
 
 
-def _load_prices() -> pd.DataFrame:
-    cache = _get_cache()
-    cache_key = "prices_df"
-    if cache is not None:
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached.copy()
-
-    df = pd.read_csv(DATA_PATH)
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
-    if "log_return" in df.columns:
-        df["log_return"] = pd.to_numeric(df["log_return"], errors="coerce")
-    if cache is not None:
-        cache.set(cache_key, df.copy())
-    return df
+def _load_snapshot() -> PriceSnapshot:
+    """Shared read-only price/return/volatility arrays (no per-request copies)."""
+    return load_price_snapshot(str(DATA_PATH))
 
 
 def _parse_date(value: Optional[str]) -> Optional[datetime]:
@@ -45,46 +43,124 @@ def _parse_date(value: Optional[str]) -> Optional[datetime]:
     return datetime.strptime(value, "%Y-%m-%d")
 
 
+def _parse_limit(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return limit
+
+
+def _parse_max_points(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    max_points = int(value)
+    if max_points < 4:
+        raise ValueError("max_points must be at least 4")
+    return max_points
+
+
+def _downsampled(
+    key: str,
+    dates: np.ndarray,
+    values: np.ndarray,
+    max_points: int,
+    method: str,
+) -> np.ndarray:
+    """
+    Positions of the points to plot, cached per data version, series and date range.
+
+    ``key`` must identify the data version, series and range; repeated zooms
+    into the same range reuse the selection instead of re-bucketing it.
+    """
+    cache = current_app.config["CACHE"]
+    cache_key = f"downsample:{key}:{max_points}:{method}"
+    rows = cache.get(cache_key)
+    if rows is None:
+        rows = downsample_indices(dates.view(np.int64), values, max_points, method)
+        cache.set(cache_key, rows)
+    return rows
+
+
 @prices_bp.route("/", methods=["GET"])
 def get_prices() -> Any:
+    """
+    Price rows between ``start_date`` and ``end_date``, streamed from the mapped columns.
+
+    ``limit`` caps the page size and ``cursor`` (the ``next_cursor`` date of
+    the previous page) resumes after it. ``format=ndjson`` sends one row per
+    line with the page metadata in ``X-Total-Count``/``X-Next-Cursor`` headers.
+    ``max_points`` downsamples the page by price (``downsample=lttb|minmax``).
+    Other ``Accept`` types get the same page column by column (see ``wire_formats``).
+    """
     try:
-        df = _load_prices()
         start_date = _parse_date(request.args.get("start_date"))
         end_date = _parse_date(request.args.get("end_date"))
+        cursor = _parse_date(request.args.get("cursor"))
+        limit = _parse_limit(request.args.get("limit"))
+        max_points = _parse_max_points(request.args.get("max_points"))
+        method = request.args.get("downsample", DEFAULT_DOWNSAMPLE_METHOD)
+        output = request.args.get("format", "json")
+        if output not in ("json", "ndjson"):
+            return jsonify({"error": f"Unknown format '{output}'"}), 400
 
-        if start_date is not None:
-            df = df[df["Date"] >= start_date]
-        if end_date is not None:
-            df = df[df["Date"] <= end_date]
-
-        df = df.sort_values("Date")
-        df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-
-        records = df.to_dict(orient="records")
-        normalized: list[Dict[str, Any]] = []
-        for record in records:
-            item: Dict[str, Any] = {}
-            for key, value in record.items():
-                if pd.isna(value):
-                    item[key] = None
-                elif isinstance(value, (np.integer, np.floating)):
-                    item[key] = float(value)
-                else:
-                    item[key] = value
-            normalized.append(item)
-
-        return jsonify(
-            {
-                "data": normalized,
-                "count": len(normalized),
-                "filters": {
-                    "start_date": request.args.get("start_date"),
-                    "end_date": request.args.get("end_date"),
-                },
-            }
+        table = price_table(str(DATA_PATH))
+        index = _load_snapshot().index
+        rows = index.slice(max(filter(None, (start_date, cursor)), default=None), end_date)
+        lo, hi = rows.start, rows.stop
+        if limit is not None and hi - lo > limit:
+            hi = lo + limit
+            next_cursor = str(np.datetime_as_string(index.dates[hi], unit="D"))
+        else:
+            next_cursor = None
+
+        columns = table.columns
+        downsample = None
+        if max_points is not None:
+            picks = lo + _downsampled(
+                f"{table.digest}:Price:{lo}:{hi}",
+                table["Date"][lo:hi],
+                table["Price"][lo:hi],
+                max_points,
+                method,
+            )
+            columns = {name: values[picks] for name, values in columns.items()}
+            downsample = {"method": method, "max_points": max_points, "source_count": hi - lo}
+            lo, hi = 0, len(picks)
+
+        if output == "ndjson":
+            headers = {"X-Total-Count": str(hi - lo)}
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+            return Response(
+                iter_ndjson(columns, lo, hi),
+                mimetype="application/x-ndjson",
+                headers=headers,
+            )
+        meta = {
+            "count": hi - lo,
+            "next_cursor": next_cursor,
+            "filters": {
+                "start_date": request.args.get("start_date"),
+                "end_date": request.args.get("end_date"),
+            },
+        }
+        if downsample is not None:
+            meta["downsample"] = downsample
+        mimetype = negotiate()
+        if mimetype != JSON_MIMETYPE:
+            return columnar_response(
+                {name: values[lo:hi] for name, values in columns.items()}, meta, mimetype
+            )
+        return Response(
+            iter_json_document(columns, lo, hi, meta),
+            mimetype="application/json",
         )
     except FileNotFoundError:
         return jsonify({"error": "Data file not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     except Exception as exc:  # pragma: no cover
         return jsonify({"error": str(exc)}), 500
 
@@ -92,17 +168,18 @@ def get_prices() -> Any:
 @prices_bp.route("/statistics", methods=["GET"])
 def get_statistics() -> Any:
     try:
-        df = _load_prices()
+        snapshot = _load_snapshot()
+        price = snapshot.price[~np.isnan(snapshot.price)]
         stats: Dict[str, Any] = {
-            "min_price": float(df["Price"].min()),
-            "max_price": float(df["Price"].max()),
-            "mean_price": float(df["Price"].mean()),
-            "std_price": float(df["Price"].std()),
-            "median_price": float(df["Price"].median()),
-            "count": int(df["Price"].count()),
+            "min_price": float(price.min()),
+            "max_price": float(price.max()),
+            "mean_price": float(price.mean()),
+            "std_price": float(price.std(ddof=1)),
+            "median_price": float(np.median(price)),
+            "count": int(len(price)),
             "date_range": {
-                "start": df["Date"].min().strftime("%Y-%m-%d"),
-                "end": df["Date"].max().strftime("%Y-%m-%d"),
+                "start": str(np.datetime_as_string(snapshot.dates[0], unit="D")),
+                "end": str(np.datetime_as_string(snapshot.dates[-1], unit="D")),
             },
         }
         return jsonify(stats)
@@ -114,44 +191,113 @@ def get_statistics() -> Any:
 
 @prices_bp.route("/volatility", methods=["GET"])
 def get_volatility() -> Any:
+    """
+    Rolling (default), ``ewma`` or ``realized`` volatility of log returns.
+
+    ``max_points`` downsamples the series (``downsample=lttb|minmax``);
+    ``avg_volatility`` is always over the full series.
+    """
     try:
         window = int(request.args.get("window", DEFAULT_VOLATILITY_WINDOW))
-        df = _load_prices().sort_values("Date")
-        if "log_return" not in df.columns:
-            df["log_return"] = np.log(df["Price"]).diff()
-        df["Volatility"] = df["log_return"].rolling(window=window).std()
-        df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-
-        records = (
-            df[["Date", "Price", "Volatility"]]
-            .dropna(subset=["Volatility"])
-            .to_dict(orient="records")
-        )
-        return jsonify(
-            {
-                "data": records,
-                "window": window,
-                "avg_volatility": float(pd.DataFrame(records)["Volatility"].mean())
-                if records
-                else 0.0,
+        method = request.args.get("method", "rolling")
+        decay = float(request.args.get("decay", DEFAULT_EWMA_LAMBDA))
+        max_points = _parse_max_points(request.args.get("max_points"))
+        snapshot = _load_snapshot()
+        engine = snapshot.volatility_engine
+        if method == "rolling":
+            volatility = (
+                snapshot.volatility if window == snapshot.window else engine.rolling_std(window)
+            )
+        elif method == "ewma":
+            volatility = engine.ewma(decay)
+        elif method == "realized":
+            volatility = engine.realized(window)
+        else:
+            return jsonify({"error": f"Unknown volatility method '{method}'"}), 400
+        keep = np.flatnonzero(~np.isnan(volatility))
+        avg_volatility = float(volatility[keep].mean()) if len(keep) else 0.0
+        payload: Dict[str, Any] = {"window": window, "method": method}
+        if max_points is not None:
+            downsample = request.args.get("downsample", DEFAULT_DOWNSAMPLE_METHOD)
+            series = f"{method}:{window}:{decay if method == 'ewma' else ''}"
+            keep = keep[
+                _downsampled(
+                    f"{snapshot.digest}:volatility:{series}",
+                    snapshot.dates[keep],
+                    volatility[keep],
+                    max_points,
+                    downsample,
+                )
+            ]
+            payload["downsample"] = {
+                "method": downsample,
+                "max_points": max_points,
+                "source_count": int(np.count_nonzero(~np.isnan(volatility))),
             }
-        )
+        payload["avg_volatility"] = avg_volatility
+        mimetype = negotiate()
+        if mimetype != JSON_MIMETYPE:
+            columns = {
+                "Date": snapshot.dates[keep],
+                "Price": snapshot.price[keep],
+                "Volatility": volatility[keep],
+            }
+            return columnar_response(columns, {"count": len(keep), **payload}, mimetype)
+        dates = np.datetime_as_string(snapshot.dates[keep], unit="D").tolist()
+        payload["data"] = [
+            {"Date": date, "Price": price, "Volatility": vol}
+            for date, price, vol in zip(
+                dates, snapshot.price[keep].tolist(), volatility[keep].tolist()
+            )
+        ]
+        return jsonify(payload)
     except FileNotFoundError:
         return jsonify({"error": "Data file not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     except Exception as exc:  # pragma: no cover
         return jsonify({"error": str(exc)}), 500
 
 
 @prices_bp.route("/macro-overlay", methods=["GET"])
 def get_macro_overlay() -> Any:
-    """Return oil prices merged with GDP, inflation, and FX series."""
+    """Return oil prices merged with GDP, inflation, and FX series (``max_points`` downsamples)."""
     try:
-        df = _load_prices()
-        merged = load_macro_data(df)
-        merged["Date"] = merged["Date"].dt.strftime("%Y-%m-%d")
+        max_points = _parse_max_points(request.args.get("max_points"))
+        digest = price_table(str(DATA_PATH)).digest
+        cache = current_app.config["CACHE"]
+        merged = cache.get(f"macro_overlay:{digest}")
+        if merged is None:
+            merged = load_macro_data(_load_prices())
+            cache.set(f"macro_overlay:{digest}", merged)
+        source_count = len(merged)
+        if max_points is not None:
+            method = request.args.get("downsample", DEFAULT_DOWNSAMPLE_METHOD)
+            rows = _downsampled(
+                f"{digest}:macro:{source_count}",
+                merged["Date"].to_numpy(dtype="datetime64[ns]"),
+                merged["Price"].to_numpy(dtype=float),
+                max_points,
+                method,
+            )
+            merged = merged.iloc[rows]
         out_cols = ["Date", "Price", "GDP", "Inflation", "ExchangeRate"]
-        return jsonify({"data": merged[out_cols].to_dict(orient="records"), "count": len(merged)})
+        payload: Dict[str, Any] = {"count": len(merged)}
+        if max_points is not None:
+            payload["downsample"] = {
+                "method": method,
+                "max_points": max_points,
+                "source_count": source_count,
+            }
+        mimetype = negotiate()
+        if mimetype != JSON_MIMETYPE:
+            columns = {name: merged[name].to_numpy() for name in out_cols}
+            return columnar_response(columns, payload, mimetype)
+        out = merged[out_cols].assign(Date=merged["Date"].dt.strftime("%Y-%m-%d"))
+        return jsonify({"data": out.to_dict(orient="records"), **payload})
     except FileNotFoundError:
         return jsonify({"error": "Data file not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
     except Exception as exc:  # pragma: no cover
         return jsonify({"error": str(exc)}), 500
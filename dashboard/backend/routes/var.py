@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+from flask import Blueprint, current_app, jsonify, request
+
+from src.constants import DEFAULT_VAR_MAXLAGS, VAR_ARTIFACT_DIR
+from src.data.columnar_store import price_table
+from src.data.macro_loader import load_macro_data
+from src.models.var_service import (
+    VarArtifacts,
+    VarArtifactStore,
+    fevd_payload,
+    forecast_payload,
+    irf_payload,
+    var_artifact_version,
+)
+
+var_bp = Blueprint("var", __name__)
+
+BASE_DIR = Path(__file__).resolve().parents[3]
+PRICES_PATH = BASE_DIR / "data" / "processed" / "brentoilprices_processed.csv"
+VAR_ARTIFACT_PATH = BASE_DIR / VAR_ARTIFACT_DIR
+
+_var_store = VarArtifactStore(str(VAR_ARTIFACT_PATH))
+
+
+def _load_frame() -> pd.DataFrame:
+    return load_macro_data(price_table(str(PRICES_PATH)).to_frame())
+
+
+def _artifacts() -> VarArtifacts:
+    """The VAR artifacts of the current price data, fitted on the first miss only."""
+    version = var_artifact_version(price_table(str(PRICES_PATH)).digest, DEFAULT_VAR_MAXLAGS)
+    return _var_store.get_or_build(version, _load_frame, DEFAULT_VAR_MAXLAGS)
+
+
+def _cached_response(name: str, build: Callable[[VarArtifacts], Dict[str, Any]]) -> Any:
+    """``build(artifacts)`` as JSON, cached per artifact version and query string."""
+    try:
+        artifacts = _artifacts()
+        cache = current_app.config.get("CACHE")
+        key = f"var:{artifacts.version}:{name}:{request.query_string.decode('utf-8')}"
+        payload = cache.get(key) if cache else None
+        if payload is None:
+            payload = {"version": artifacts.version, **build(artifacts)}
+            if cache:
+                cache.set(key, payload)
+        return jsonify(payload)
+    except FileNotFoundError:
+        return jsonify({"error": "Data file not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as exc:  # pragma: no cover
+        return jsonify({"error": str(exc)}), 500
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+
+@var_bp.route("/", methods=["GET"])
+def get_var_summary() -> Any:
+    """Lag order, fit statistics and coefficients of the current VAR."""
+    keys = ("mode", "variables", "lag_order", "nobs", "aic", "bic", "hqic", "params", "last_date")
+    return _cached_response("summary", lambda artifacts: {k: artifacts.meta[k] for k in keys})
+
+
+@var_bp.route("/lag-order", methods=["GET"])
+def get_var_lag_order() -> Any:
+    """AIC/BIC/HQIC/FPE of every lag order on the grid and each criterion's choice."""
+    return _cached_response("lag-order", lambda artifacts: artifacts.meta["lag_selection"])
+
+
+@var_bp.route("/forecast", methods=["GET"])
+def get_var_forecast() -> Any:
+    """Forecast means and interval bounds for the next ``steps`` business days."""
+    return _cached_response(
+        "forecast",
+        lambda artifacts: forecast_payload(artifacts, _optional_int("steps")),
+    )
+
+
+@var_bp.route("/irf", methods=["GET"])
+def get_var_irf() -> Any:
+    """
+    Impulse responses, orthogonalized unless ``orth=false``.
+
+    ``impulse`` and ``response`` narrow the result to one shock and/or one
+    responding variable; ``periods`` truncates the horizon.
+    """
+
+    def build(artifacts: VarArtifacts) -> Dict[str, Any]:
+        response = request.args.get("response")
+        return irf_payload(
+            artifacts,
+            impulse=request.args.get("impulse"),
+            responses=[response] if response else None,
+            orthogonalized=request.args.get("orth", "true").lower() != "false",
+            periods=_optional_int("periods"),
+        )
+
+    return _cached_response("irf", build)
+
+
+@var_bp.route("/fevd", methods=["GET"])
+def get_var_fevd() -> Any:
+    """Forecast error variance decomposition, per ``variable`` (all by default)."""
+    return _cached_response(
+        "fevd",
+        lambda artifacts: fevd_payload(
+            artifacts, request.args.get("variable"), _optional_int("periods")
+        ),
+    )
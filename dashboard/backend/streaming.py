@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterator, Mapping
+
+import numpy as np
+
+STREAM_CHUNK_ROWS = 4096
+
+
+def json_tokens(values: np.ndarray) -> list:
+    """
+    JSON text of every element of one column, NaN/NaT as ``null``.
+
+    Numbers use Python's shortest round-trip repr and dates are ISO days;
+    missing values are found with one array mask instead of per-cell checks.
+    """
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        text = np.char.add(np.char.add('"', np.datetime_as_string(values, unit="D")), '"')
+        return np.where(np.isnat(values), "null", text).tolist()
+    if values.dtype == bool:
+        return np.where(values, "true", "false").tolist()
+    if np.issubdtype(values.dtype, np.number):
+        tokens = list(map(repr, values.tolist()))
+        for position in np.flatnonzero(~np.isfinite(values)).tolist():
+            tokens[position] = "null"
+        return tokens
+    return [json.dumps(None if value != value else value) for value in values.tolist()]
+
+
+def iter_json_rows(
+    columns: Mapping[str, np.ndarray],
+    start: int,
+    stop: int,
+    separator: str = ",",
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> Iterator[str]:
+    """
+    Encode rows ``[start, stop)`` of ``columns`` as JSON objects, ``chunk_rows`` at a time.
+
+    Rows are joined by ``separator`` (``","`` inside a JSON array, ``"\\n"`` for
+    NDJSON); each yielded chunk ends without one. Only one chunk of text
+    exists at a time, so memory does not grow with the range.
+    """
+    names = list(columns)
+    keys = [json.dumps(name).replace("{", "{{").replace("}", "}}") for name in names]
+    template = "{{" + ",".join(f"{key}:{{}}" for key in keys) + "}}"
+    for lo in range(start, stop, chunk_rows):
+        hi = min(lo + chunk_rows, stop)
+        tokens = [json_tokens(columns[name][lo:hi]) for name in names]
+        yield separator.join(map(template.format, *tokens))
+
+
+def iter_json_document(
+    columns: Mapping[str, np.ndarray],
+    start: int,
+    stop: int,
+    meta: Dict[str, Any],
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> Iterator[str]:
+    """``{"data": [...rows...], **meta}`` streamed chunk by chunk."""
+    yield '{"data":['
+    for position, chunk in enumerate(iter_json_rows(columns, start, stop, ",", chunk_rows)):
+        yield chunk if position == 0 else "," + chunk
+    tail = json.dumps(meta, separators=(",", ":"))
+    yield "]" + ("," + tail[1:] if len(tail) > 2 else "}")
+
+
+def iter_ndjson(
+    columns: Mapping[str, np.ndarray],
+    start: int,
+    stop: int,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> Iterator[str]:
+    """One JSON object per line."""
+    for chunk in iter_json_rows(columns, start, stop, "\n", chunk_rows):
+        yield chunk + "\n"
+
+
+def iter_columns_json(
+    columns: Mapping[str, np.ndarray],
+    meta: Dict[str, Any],
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+) -> Iterator[str]:
+    """``{"columns": {name: [...values...]}, **meta}``: one array per column, no per-row keys."""
+    yield '{"columns":{'
+    for position, (name, values) in enumerate(columns.items()):
+        yield ("," if position else "") + json.dumps(name) + ":["
+        for lo in range(0, len(values), chunk_rows):
+            yield ("," if lo else "") + ",".join(json_tokens(values[lo : lo + chunk_rows]))
+        yield "]"
+    tail = json.dumps(meta, separators=(",", ":"))
+    yield "}" + ("," + tail[1:] if len(tail) > 2 else "}")
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterator, Mapping, Union
+
+import msgpack
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc
+from flask import Response, request
+
+from streaming import iter_columns_json
+
+JSON_MIMETYPE = "application/json"
+COLUMNS_MIMETYPE = "application/vnd.columns+json"
+MSGPACK_MIMETYPE = "application/msgpack"
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+# Aliases clients commonly send for the same encodings.
+_ALIASES = {"application/x-msgpack": MSGPACK_MIMETYPE}
+
+
+def offered_mimetypes() -> list:
+    """Response types this process can produce; record-oriented JSON first (the default)."""
+    return [
+        JSON_MIMETYPE,
+        COLUMNS_MIMETYPE,
+        MSGPACK_MIMETYPE,
+        "application/x-msgpack",
+        ARROW_MIMETYPE,
+    ]
+
+
+def negotiate() -> str:
+    """
+    Best response type for the request's ``Accept`` header.
+
+    A missing ``Accept`` header, a wildcard, or only types not offered here
+    get the default JSON.
+    """
+    best = request.accept_mimetypes.best_match(offered_mimetypes(), default=JSON_MIMETYPE)
+    return _ALIASES.get(best, best)
+
+
+def vary_on_accept(response: Response) -> Response:
+    """``after_request`` hook: responses of negotiated routes depend on ``Accept``."""
+    response.vary.add("Accept")
+    return response
+
+
+def _plain_list(values: np.ndarray) -> list:
+    """Column as plain Python values: ISO dates, ``None`` for NaN/NaT."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        missing = np.isnat(values)
+        values = np.datetime_as_string(values, unit="D").astype(object)
+    elif np.issubdtype(values.dtype, np.number):
+        missing = ~np.isfinite(values)
+        values = values.astype(object)
+    else:
+        values = values.astype(object)
+        missing = values != values
+    values[missing] = None
+    return values.tolist()
+
+
+def _arrow_column(values: np.ndarray) -> Any:
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype("datetime64[D]")
+    return pa.array(values, from_pandas=True)
+
+
+def columnar_body(
+    columns: Mapping[str, np.ndarray],
+    meta: Dict[str, Any],
+    mimetype: str,
+) -> Union[Iterator[str], bytes]:
+    """
+    Encode equal-length column arrays (plus scalar ``meta``) as ``mimetype``.
+
+    Built straight from the arrays: column JSON and MessagePack carry one
+    list per column, Arrow IPC one record batch with ``meta`` as JSON in the
+    schema metadata. Column JSON is a chunked iterator; the others are bytes.
+    """
+    if mimetype == COLUMNS_MIMETYPE:
+        return iter_columns_json(columns, meta)
+    if mimetype == MSGPACK_MIMETYPE:
+        payload = {"columns": {name: _plain_list(values) for name, values in columns.items()}}
+        return msgpack.packb({**payload, **meta})
+    if mimetype == ARROW_MIMETYPE:
+        table = pa.table({name: _arrow_column(values) for name, values in columns.items()})
+        table = table.replace_schema_metadata({"meta": json.dumps(meta)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    raise ValueError(f"Unsupported columnar format '{mimetype}'")
+
+
+def columnar_response(
+    columns: Mapping[str, np.ndarray],
+    meta: Dict[str, Any],
+    mimetype: str,
+) -> Response:
+    return Response(columnar_body(columns, meta, mimetype), mimetype=mimetype)
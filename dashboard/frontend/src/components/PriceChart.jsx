@@ -11,6 +11,9 @@ import {
 import { useEffect, useMemo, useState } from "react";
 import API from "../services/api";
 
+// About one point per horizontal pixel; the backend downsamples longer series.
+const CHART_MAX_POINTS = 1500;
+
 const PriceChart = ({
   changePoints = [],
   highlightedDate = null,
@@ -30,8 +33,8 @@ const PriceChart = ({
       try {
         setLoading(true);
         const [pricesRes, macroRes] = await Promise.all([
-          API.get("/prices"),
-          API.get("/prices/macro-overlay")
+          API.get("/prices", { params: { max_points: CHART_MAX_POINTS } }),
+          API.get("/prices/macro-overlay", { params: { max_points: CHART_MAX_POINTS } })
         ]);
         setData(pricesRes.data.data || []);
         setMacroData(macroRes.data.data || []);
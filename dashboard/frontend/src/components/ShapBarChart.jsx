@@ -0,0 +1,37 @@
+import { Bar, BarChart, CartesianGrid, Cell, ResponsiveContainer, Tooltip, XAxis, YAxis } from "recharts";
+import API from "../services/api";
+
+// Plot URLs are absolute paths on the API host ("/api/...").
+const apiOrigin = API.defaults.baseURL.replace(/\/api\/?$/, "");
+
+// Draws a backend bar chart payload ({ title, labels, values, signed });
+// falls back to the PNG at imageUrl when only an image is available.
+const ShapBarChart = ({ chart, imageUrl, emptyText }) => {
+  if (chart?.labels?.length) {
+    const rows = chart.labels.map((label, i) => ({ label, value: chart.values[i] }));
+    return (
+      <ResponsiveContainer width="100%" height={300}>
+        <BarChart data={rows}>
+          <CartesianGrid strokeDasharray="3 3" />
+          <XAxis dataKey="label" />
+          <YAxis />
+          <Tooltip formatter={(value) => Number(value).toPrecision(4)} />
+          <Bar dataKey="value" name={chart.title}>
+            {rows.map((row) => (
+              <Cell
+                key={row.label}
+                fill={chart.signed ? (row.value >= 0 ? "#2E8B57" : "#B22222") : "#4C72B0"}
+              />
+            ))}
+          </Bar>
+        </BarChart>
+      </ResponsiveContainer>
+    );
+  }
+  if (imageUrl) {
+    return <img alt={emptyText} style={{ width: "100%" }} src={`${apiOrigin}${imageUrl}`} />;
+  }
+  return <p>{emptyText}</p>;
+};
+
+export default ShapBarChart;
@@ -3,6 +3,7 @@ import ChangePointChart from "../components/ChangePointChart";
 import EventTimeline from "../components/EventTimeline";
 import Filters from "../components/Filters";
 import PriceChart from "../components/PriceChart";
+import ShapBarChart from "../components/ShapBarChart";
 import API from "../services/api";
 
 const Dashboard = ({ theme = "light" }) => {
@@ -24,7 +25,7 @@ const Dashboard = ({ theme = "light" }) => {
     ExchangeRate: false,
     Causes: false
   });
-  const [shapData, setShapData] = useState({ global_plot_b64: null, local_plot_b64: null });
+  const [shapData, setShapData] = useState({});
 
   useEffect(() => {
     const fetchInitialData = async () => {
@@ -60,14 +61,20 @@ const Dashboard = ({ theme = "light" }) => {
 
   useEffect(() => {
     const selectedDate = selectedEvent?.date || clickedDate;
+    let retryTimer = null;
     const fetchShap = async () => {
       const query = selectedDate ? `?selected_date=${encodeURIComponent(selectedDate)}` : "";
       const shapRes = await API.get(`/change-points/shap${query}`);
       setShapData(shapRes.data || {});
+      if (shapRes.status === 202) {
+        // The backend is still building artifacts for this data version.
+        retryTimer = setTimeout(() => fetchShap().catch(() => {}), 3000);
+      }
     };
     fetchShap().catch(() => {
-      setShapData({ global_plot_b64: null, local_plot_b64: null });
+      setShapData({});
     });
+    return () => clearTimeout(retryTimer);
   }, [selectedEvent, clickedDate]);
 
   const handleFilterChange = async (filters) => {
@@ -210,17 +217,21 @@ const Dashboard = ({ theme = "light" }) => {
           <div className="card">
             <div className="card-header"><h3>SHAP Summary</h3></div>
             <div className="card-body">
-              {shapData.global_plot_b64 ? (
-                <img alt="SHAP global" style={{ width: "100%" }} src={`data:image/png;base64,${shapData.global_plot_b64}`} />
-              ) : <p>No global SHAP artifact found.</p>}
+              <ShapBarChart
+                chart={shapData.global_chart}
+                imageUrl={shapData.global_plot_url}
+                emptyText="No global SHAP artifact found."
+              />
             </div>
           </div>
           <div className="card">
             <div className="card-header"><h3>Why this prediction?</h3></div>
             <div className="card-body">
-              {shapData.local_plot_b64 ? (
-                <img alt="SHAP local" style={{ width: "100%" }} src={`data:image/png;base64,${shapData.local_plot_b64}`} />
-              ) : <p>No local SHAP artifact found.</p>}
+              <ShapBarChart
+                chart={shapData.local_chart}
+                imageUrl={shapData.local_plot_url}
+                emptyText="No local SHAP artifact found."
+              />
             </div>
           </div>
         </div>
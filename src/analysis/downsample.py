@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from src.constants import DEFAULT_DOWNSAMPLE_METHOD
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def _lttb_numpy(
+    x: np.ndarray,
+    y: np.ndarray,
+    edges: np.ndarray,
+    avg_x: np.ndarray,
+    avg_y: np.ndarray,
+) -> np.ndarray:
+    picks = np.empty(len(edges) - 1, dtype=np.int64)
+    anchor = 0
+    for bucket in range(len(picks)):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        area = np.abs(
+            (x[anchor] - avg_x[bucket]) * (y[lo:hi] - y[anchor])
+            - (x[anchor] - x[lo:hi]) * (avg_y[bucket] - y[anchor])
+        )
+        anchor = lo + int(np.argmax(area))
+        picks[bucket] = anchor
+    return picks
+
+
+def _lttb_loop(
+    x: np.ndarray,
+    y: np.ndarray,
+    edges: np.ndarray,
+    avg_x: np.ndarray,
+    avg_y: np.ndarray,
+) -> np.ndarray:  # pragma: no cover - compiled
+    picks = np.empty(len(edges) - 1, dtype=np.int64)
+    anchor = 0
+    for bucket in range(len(picks)):
+        best_area = -1.0
+        best = edges[bucket]
+        for idx in range(edges[bucket], edges[bucket + 1]):
+            area = abs(
+                (x[anchor] - avg_x[bucket]) * (y[idx] - y[anchor])
+                - (x[anchor] - x[idx]) * (avg_y[bucket] - y[anchor])
+            )
+            if area > best_area:
+                best_area = area
+                best = idx
+        anchor = best
+        picks[bucket] = anchor
+    return picks
+
+
+# Compiled on first use: importing numba costs more than the whole API's startup.
+_lttb_kernel: Optional[Callable[..., np.ndarray]] = None
+
+
+def _load_lttb_kernel() -> Callable[..., np.ndarray]:
+    global _lttb_kernel
+    if _lttb_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:  # pragma: no cover
+            _lttb_kernel = _lttb_numpy
+        else:
+            _lttb_kernel = njit(cache=True)(_lttb_loop)
+    return _lttb_kernel
+
+
+def lttb_indices(x: Any, y: Any, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection of at most ``max_points`` positions.
+
+    The first and last points are always kept. Bucket bounds and the
+    next-bucket centroids come from prefix sums in one vectorized pass; only
+    the choice of each bucket's point, which depends on the previous choice,
+    runs bucket by bucket (compiled with numba when available).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_obs = len(y)
+    if max_points >= n_obs or n_obs < 3:
+        return np.arange(n_obs)
+    if max_points < 3:
+        raise ValueError("LTTB needs max_points >= 3")
+    n_buckets = max_points - 2
+    # Interior points 1..n-2 split into n_buckets; bucket b is [edges[b], edges[b + 1]).
+    edges = (np.arange(n_buckets + 1) * (n_obs - 2) // n_buckets + 1).astype(np.int64)
+    # The centroid that bucket b aims at is that of bucket b + 1 (the last point for the last).
+    next_lo = edges[1:]
+    next_hi = np.append(edges[2:], n_obs)
+    sum_x = np.concatenate([[0.0], np.cumsum(x)])
+    sum_y = np.concatenate([[0.0], np.cumsum(y)])
+    width = next_hi - next_lo
+    avg_x = (sum_x[next_hi] - sum_x[next_lo]) / width
+    avg_y = (sum_y[next_hi] - sum_y[next_lo]) / width
+    picks = _load_lttb_kernel()(x, y, edges, avg_x, avg_y)
+    return np.concatenate([[0], picks, [n_obs - 1]])
+
+
+def minmax_indices(y: Any, max_points: int) -> np.ndarray:
+    """
+    Min/max decimation: the lowest and highest point of each of ``max_points // 2`` buckets.
+
+    Fully vectorized (one lexsort); keeps every local extreme a chart of that
+    resolution could show, plus the first and last point.
+    """
+    y = np.asarray(y, dtype=float)
+    n_obs = len(y)
+    if max_points >= n_obs or n_obs < 3:
+        return np.arange(n_obs)
+    if max_points < 4:
+        raise ValueError("Min/max decimation needs max_points >= 4")
+    n_buckets = (max_points - 2) // 2
+    interior = np.arange(1, n_obs - 1)
+    bucket = (interior - 1) * n_buckets // (n_obs - 2)
+    order = interior[np.lexsort((y[interior], bucket))]
+    starts = np.searchsorted(bucket, np.arange(n_buckets), side="left")
+    ends = np.searchsorted(bucket, np.arange(n_buckets), side="right")
+    return np.unique(np.concatenate([[0], order[starts], order[ends - 1], [n_obs - 1]]))
+
+
+def downsample_indices(
+    x: Any,
+    y: Any,
+    max_points: Optional[int],
+    method: str = DEFAULT_DOWNSAMPLE_METHOD,
+) -> np.ndarray:
+    """
+    Sorted positions of at most ``max_points`` points that preserve the shape of ``y``.
+
+    Missing values in ``y`` are never selected. Without ``max_points``, or
+    when the series is already short enough, every finite position is kept.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}'")
+    y = np.asarray(y, dtype=float)
+    finite = np.flatnonzero(np.isfinite(y))
+    if max_points is None or len(finite) <= max_points:
+        return finite
+    if method == "lttb":
+        picks = lttb_indices(np.asarray(x, dtype=float)[finite], y[finite], int(max_points))
+    else:
+        picks = minmax_indices(y[finite], int(max_points))
+    return finite[picks]
@@ -1,18 +1,79 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Any, Iterable, List, Tuple
 
+import numpy as np
 import pandas as pd
 
+from src.constants import DEFAULT_EVENT_MATCH_LIMIT, DEFAULT_EVENT_TOLERANCE_DAYS
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def map_tau_samples_to_dates(df: pd.DataFrame, tau_samples: Any) -> np.ndarray:
+    """
+    Calendar dates of change-point indices, as ``datetime64[ns]`` of the same shape.
+
+    ``tau_samples`` may be any array of indices (e.g. draws x change points);
+    indices outside the series are clipped to its ends. One gather over the
+    date column, so mapping S samples costs O(S) instead of a lookup each.
+    """
+    dates = pd.to_datetime(df["Date"]).to_numpy(dtype="datetime64[ns]")
+    taus = np.asarray(tau_samples, dtype=np.int64)
+    return dates[np.clip(taus, 0, len(dates) - 1)]
+
 
 def map_tau_to_date(df: pd.DataFrame, tau_index: int) -> pd.Timestamp:
     """Map a change-point index to a calendar date."""
-    data = df.reset_index(drop=True)
-    idx = max(0, min(int(tau_index), len(data) - 1))
-    return pd.to_datetime(data.iloc[idx]["Date"])
+    return pd.Timestamp(map_tau_samples_to_dates(df, tau_index))
 
 
 def map_taus_to_dates(df: pd.DataFrame, tau_indices: Iterable[int]) -> List[str]:
     """Map multiple change-point indices to yyyy-mm-dd dates."""
-    return [map_tau_to_date(df, tau).strftime("%Y-%m-%d") for tau in tau_indices]
+    dates = map_tau_samples_to_dates(df, np.fromiter(tau_indices, dtype=np.int64))
+    return np.datetime_as_string(dates, unit="D").tolist()
+
+
+def nearest_events(
+    change_point_dates: Any,
+    event_dates: Any,
+    tolerance_days: int = DEFAULT_EVENT_TOLERANCE_DAYS,
+    limit: int = DEFAULT_EVENT_MATCH_LIMIT,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The ``limit`` events nearest each change point within ``tolerance_days`` either side.
+
+    A ``merge_asof(direction="nearest", tolerance=...)`` that keeps several
+    matches: events are sorted once and each change point's candidates are
+    the contiguous run between two ``searchsorted`` bounds, so the join costs
+    O((C + E) log E + M) for M candidates. Undated events never match.
+
+    Returns flat arrays of change-point position, event position (into
+    ``event_dates``) and signed offset in days (event minus change point),
+    ordered by change point and then by distance (earlier event on ties).
+    """
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    if tolerance_days < 0:
+        raise ValueError("tolerance_days must be >= 0")
+    cps = np.asarray(pd.to_datetime(change_point_dates), dtype="datetime64[ns]").ravel()
+    events = np.asarray(pd.to_datetime(event_dates), dtype="datetime64[ns]").ravel()
+    dated = np.flatnonzero(~np.isnat(events))
+    order = dated[np.argsort(events[dated], kind="stable")]
+    keys = events[order].view(np.int64)
+
+    tolerance = int(tolerance_days) * _NS_PER_DAY
+    centres = cps.view(np.int64)
+    lo = np.searchsorted(keys, centres - tolerance, side="left")
+    hi = np.searchsorted(keys, centres + tolerance, side="right")
+    lo[np.isnat(cps)] = hi[np.isnat(cps)] = 0
+    counts = hi - lo
+    owner = np.repeat(np.arange(len(cps)), counts)
+    starts = np.cumsum(counts) - counts
+    candidate = np.arange(counts.sum()) - np.repeat(starts, counts) + np.repeat(lo, counts)
+    offset = (keys[candidate] - centres[owner]) / _NS_PER_DAY
 
+    ranked = np.lexsort((candidate, np.abs(offset), owner))
+    owner, candidate, offset = owner[ranked], candidate[ranked], offset[ranked]
+    keep = np.arange(len(owner)) - np.repeat(starts, counts) < limit
+    return owner[keep], order[candidate[keep]], offset[keep]
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# (start side, end side) for np.searchsorted per interval closure.
+_CLOSED_SIDES = {
+    "both": ("left", "right"),
+    "left": ("left", "left"),
+    "right": ("right", "right"),
+    "neither": ("right", "left"),
+}
+
+
+def _as_datetime64(values: Any) -> np.ndarray:
+    if isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]", copy=False)
+    return np.asarray(pd.to_datetime(values), dtype="datetime64[ns]")
+
+
+class TimeIndex:
+    """
+    Sorted date index with prefix sums for O(log N) slicing and O(1) window stats.
+
+    ``values`` columns get NaN-aware prefix sums, sums of squares and counts,
+    so the sum, count, mean and standard deviation over any ``[lo, hi)``
+    position range cost a few lookups. Bounds and statistics are vectorized
+    over arrays of windows.
+    """
+
+    def __init__(self, dates: Any, values: Optional[Mapping[str, Any]] = None) -> None:
+        self.dates = _as_datetime64(dates)
+        if len(self.dates) > 1 and np.any(self.dates[1:] < self.dates[:-1]):
+            raise ValueError("TimeIndex dates must be sorted ascending")
+        # Integer keys take NumPy's fast searchsorted path.
+        self._keys = self.dates.view(np.int64)
+        self._sums: Dict[str, np.ndarray] = {}
+        self._sumsqs: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, np.ndarray] = {}
+        for name, column in (values or {}).items():
+            column = np.asarray(column, dtype=float)
+            finite = np.isfinite(column)
+            clean = np.where(finite, column, 0.0)
+            self._sums[name] = np.concatenate([[0.0], np.cumsum(clean)])
+            self._sumsqs[name] = np.concatenate([[0.0], np.cumsum(clean**2)])
+            self._counts[name] = np.concatenate([[0], np.cumsum(finite)])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Tuple[str, ...] = ("Price",)) -> "TimeIndex":
+        return cls(df["Date"], {name: df[name] for name in columns if name in df.columns})
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def positions(self, dates: Any, side: str = "left") -> Any:
+        """``np.searchsorted`` of ``dates`` (scalar or any-shaped array) into the index."""
+        return np.searchsorted(self._keys, _as_datetime64(dates).view(np.int64), side=side)
+
+    def bounds(self, start: Any = None, end: Any = None, closed: str = "both") -> Tuple[Any, Any]:
+        """Position range ``[lo, hi)`` of dates between ``start`` and ``end`` (``None`` = open)."""
+        start_side, end_side = _CLOSED_SIDES[closed]
+        lo: Any = 0 if start is None else self.positions(start, start_side)
+        hi: Any = len(self.dates) if end is None else self.positions(end, end_side)
+        return lo, np.maximum(hi, lo)
+
+    def slice(self, start: Any = None, end: Any = None, closed: str = "both") -> slice:
+        lo, hi = self.bounds(start, end, closed)
+        return slice(int(lo), int(hi))
+
+    def window_sum(self, name: str, lo: Any, hi: Any) -> Any:
+        sums = self._sums[name]
+        return sums[hi] - sums[lo]
+
+    def window_count(self, name: str, lo: Any, hi: Any) -> Any:
+        counts = self._counts[name]
+        return counts[hi] - counts[lo]
+
+    def window_mean(self, name: str, lo: Any, hi: Any) -> Any:
+        """Mean of the finite values in ``[lo, hi)``; NaN for empty windows."""
+        count = self.window_count(name, lo, hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(count > 0, self.window_sum(name, lo, hi) / count, np.nan)
+
+    def window_std(self, name: str, lo: Any, hi: Any, ddof: int = 1) -> Any:
+        """Standard deviation of the finite values in ``[lo, hi)``; NaN below ``ddof + 1`` values."""
+        count = self.window_count(name, lo, hi)
+        total = self.window_sum(name, lo, hi)
+        sumsqs = self._sumsqs[name]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = (sumsqs[hi] - sumsqs[lo] - total**2 / count) / (count - ddof)
+            return np.where(count > ddof, np.sqrt(np.maximum(var, 0.0)), np.nan)
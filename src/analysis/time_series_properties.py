@@ -1,17 +1,30 @@
 from __future__ import annotations
 
-from typing import Dict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
+from src.analysis.downsample import downsample_indices
+from src.analysis.volatility import VolatilityEngine
+from src.constants import DEFAULT_DOWNSAMPLE_METHOD, DEFAULT_EWMA_LAMBDA
 
-def compute_volatility_metrics(df: pd.DataFrame, window: int = 30) -> pd.DataFrame:
-    """Compute rolling volatility metrics from log returns."""
+
+def compute_volatility_metrics(
+    df: pd.DataFrame,
+    window: int = 30,
+    ewma_decay: float = DEFAULT_EWMA_LAMBDA,
+) -> pd.DataFrame:
+    """Compute rolling, EWMA and realized volatility metrics from log returns."""
     data = df.copy()
     data["Date"] = pd.to_datetime(data["Date"], errors="coerce")
     data = data.sort_values("Date")
-    data["rolling_volatility"] = data["log_return"].rolling(window=window).std()
+    engine = VolatilityEngine(data["log_return"])
+    # The engine's memoized arrays are read-only; the frame gets its own copies.
+    data["rolling_volatility"] = engine.rolling_std(window).copy()
+    data["ewma_volatility"] = engine.ewma(ewma_decay).copy()
+    data["realized_volatility"] = engine.realized(window).copy()
     return data
 
 
@@ -26,12 +39,67 @@ def summarize_series(df: pd.DataFrame) -> Dict[str, float]:
     }
 
 
-def plot_price_and_returns(df: pd.DataFrame) -> None:
-    """Plot price and log return series."""
-    fig, axes = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
+def price_and_returns_data(
+    df: pd.DataFrame,
+    max_points: Optional[int] = None,
+    method: str = DEFAULT_DOWNSAMPLE_METHOD,
+) -> Dict[str, Any]:
+    """
+    Plot-ready price and log-return panels, as plain JSON values.
+
+    Each panel is downsampled to at most ``max_points`` points on its own
+    (see ``downsample_indices``); missing values are dropped.
+    """
+    dates = pd.to_datetime(df["Date"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    panels = []
+    for column, title in (("Price", "Brent Oil Price"), ("log_return", "Log Returns")):
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+        keep = downsample_indices(dates.astype(np.int64), values, max_points, method)
+        panels.append(
+            {
+                "title": title,
+                "dates": np.datetime_as_string(dates[keep], unit="D").tolist(),
+                "values": values[keep].tolist(),
+            }
+        )
+    return {"kind": "line", "sharex": True, "panels": panels}
+
+
+def plot_price_and_returns(
+    df: pd.DataFrame,
+    path: Optional[str] = None,
+    render: bool = True,
+) -> Union[None, Path, Dict[str, Any]]:
+    """
+    Plot price and log return series.
+
+    With ``path`` the chart is rendered to that PNG through matplotlib's
+    object-oriented Agg API (no pyplot state) and the path is returned;
+    without it the figure is shown interactively. ``render=False`` returns
+    ``price_and_returns_data(df)`` instead of drawing anything.
+    """
+    if not render:
+        return price_and_returns_data(df)
+    if path is None:
+        import matplotlib.pyplot as plt
+
+        fig = plt.figure(figsize=(12, 8))
+    else:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(12, 8))
+        FigureCanvasAgg(fig)
+    axes = fig.subplots(2, 1, sharex=True)
     axes[0].plot(df["Date"], df["Price"])
     axes[0].set_title("Brent Oil Price")
     axes[1].plot(df["Date"], df["log_return"])
     axes[1].set_title("Log Returns")
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    if path is None:
+        plt.show()
+        return None
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(out)
+    return out
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.constants import (
+    DEFAULT_EWMA_LAMBDA,
+    DEFAULT_VOLATILITY_WINDOW,
+    VOLATILITY_CACHE_SIZE,
+)
+
+
+class VolatilityEngine:
+    """
+    Rolling, EWMA and realized volatility of one log-return series.
+
+    Cumulative sums of the (centred) returns, their squares and the finite
+    count are built once, so the rolling standard deviation for any window is
+    an O(N) vectorized difference. Results for the most recently used windows
+    are memoized and returned as read-only arrays.
+
+    Rolling statistics follow pandas ``rolling(window).std()``: a window with a
+    missing return gives NaN.
+    """
+
+    def __init__(self, log_returns: Any, cache_size: int = VOLATILITY_CACHE_SIZE) -> None:
+        returns = np.asarray(log_returns, dtype=float)
+        self._finite = np.isfinite(returns)
+        self.n_obs = len(returns)
+        # Centring keeps the prefix-sum variance free of cancellation.
+        shift = float(returns[self._finite].mean()) if self._finite.any() else 0.0
+        centred = np.where(self._finite, returns - shift, 0.0)
+        self._returns = np.where(self._finite, returns, np.nan)
+        self._sum = np.concatenate([[0.0], np.cumsum(centred)])
+        self._sumsq = np.concatenate([[0.0], np.cumsum(centred**2)])
+        raw = np.where(self._finite, returns, 0.0)
+        self._raw_sumsq = np.concatenate([[0.0], np.cumsum(raw**2)])
+        self._count = np.concatenate([[0], np.cumsum(self._finite)])
+        self._cache_size = max(0, int(cache_size))
+        self._cache: "OrderedDict[Tuple[Any, ...], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _memoized(self, key: Tuple[Any, ...], compute: Any) -> np.ndarray:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        values = compute()
+        values.flags.writeable = False
+        with self._lock:
+            self._cache[key] = values
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return values
+
+    def _window_diff(self, prefix: np.ndarray, window: int) -> np.ndarray:
+        out = np.full(self.n_obs, np.nan)
+        if window <= self.n_obs:
+            out[window - 1 :] = prefix[window:] - prefix[:-window]
+        return out
+
+    def _full_windows(self, window: int) -> np.ndarray:
+        return self._window_diff(self._count.astype(float), window) == window
+
+    def rolling_std(self, window: int = DEFAULT_VOLATILITY_WINDOW, ddof: int = 1) -> np.ndarray:
+        """Rolling standard deviation of returns over ``window`` observations."""
+        window = int(window)
+        if window < 1:
+            raise ValueError("window must be >= 1")
+
+        def compute() -> np.ndarray:
+            total = self._window_diff(self._sum, window)
+            sumsq = self._window_diff(self._sumsq, window)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                var = (sumsq - total**2 / window) / (window - ddof)
+            return np.where(
+                self._full_windows(window) & (window > ddof), np.sqrt(np.maximum(var, 0.0)), np.nan
+            )
+
+        return self._memoized(("rolling", window, ddof), compute)
+
+    def realized(
+        self,
+        window: int = DEFAULT_VOLATILITY_WINDOW,
+        periods_per_year: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Realized volatility ``sqrt(sum r**2)`` over ``window`` observations.
+
+        With ``periods_per_year`` it is annualized as ``sqrt(periods / window * sum r**2)``.
+        """
+        window = int(window)
+        if window < 1:
+            raise ValueError("window must be >= 1")
+
+        def compute() -> np.ndarray:
+            scale = 1.0 if periods_per_year is None else periods_per_year / window
+            sumsq = self._window_diff(self._raw_sumsq, window)
+            realized = np.sqrt(scale * np.maximum(sumsq, 0.0))
+            return np.where(self._full_windows(window), realized, np.nan)
+
+        return self._memoized(("realized", window, periods_per_year), compute)
+
+    def ewma(self, decay: float = DEFAULT_EWMA_LAMBDA) -> np.ndarray:
+        """
+        RiskMetrics EWMA volatility, ``s2[t] = decay * s2[t-1] + (1 - decay) * r[t]**2``.
+
+        The recursion is seeded with the mean squared return of the first
+        ``DEFAULT_VOLATILITY_WINDOW`` observations and skips missing returns.
+        """
+        decay = float(decay)
+        if not 0.0 < decay < 1.0:
+            raise ValueError("decay must be in (0, 1)")
+
+        def compute() -> np.ndarray:
+            from scipy.signal import lfilter
+
+            out = np.full(self.n_obs, np.nan)
+            squared = self._returns[self._finite] ** 2
+            if len(squared):
+                seed = float(squared[:DEFAULT_VOLATILITY_WINDOW].mean())
+                variance, _ = lfilter([1.0 - decay], [1.0, -decay], squared, zi=[decay * seed])
+                out[self._finite] = np.sqrt(variance)
+            return out
+
+        return self._memoized(("ewma", decay), compute)
+
+    def cache_info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._cache), "capacity": self._cache_size}
@@ -11,6 +11,7 @@ from src.constants import (
     DEFAULT_DRAWS,
     DEFAULT_N_CHANGE_POINTS,
     DEFAULT_TUNE,
+    DEFAULT_WARM_START_TUNE,
     MODEL_V1_CONFIG_PATH,
 )
 
@@ -22,6 +23,10 @@ class ModelConfig:
     tune: int = DEFAULT_TUNE
     chains: int = 4
     target_accept: float = 0.9
+    marginalize_tau: bool = False
+    pelt_seed_margin: int = 0
+    warm_start: bool = False
+    warm_start_tune: int = DEFAULT_WARM_START_TUNE
 
 
 def _to_int(data: Dict[str, Any], key: str, default: int) -> int:
@@ -40,6 +45,17 @@ def _to_float(data: Dict[str, Any], key: str, default: float) -> float:
         return default
 
 
+def _to_bool(data: Dict[str, Any], key: str, default: bool) -> bool:
+    value = data.get(key, default)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() in {"1", "true", "yes", "on"}
+    if isinstance(value, (int, float)):
+        return bool(value)
+    return default
+
+
 def load_model_config(path: str = MODEL_V1_CONFIG_PATH) -> ModelConfig:
     """Load model config from JSON with safe fallbacks."""
     config_path = Path(path)
@@ -55,4 +71,8 @@ def load_model_config(path: str = MODEL_V1_CONFIG_PATH) -> ModelConfig:
         tune=_to_int(raw, "tune", DEFAULT_TUNE),
         chains=_to_int(raw, "chains", 4),
         target_accept=_to_float(raw, "target_accept", 0.9),
+        marginalize_tau=_to_bool(raw, "marginalize_tau", False),
+        pelt_seed_margin=_to_int(raw, "pelt_seed_margin", 0),
+        warm_start=_to_bool(raw, "warm_start", False),
+        warm_start_tune=_to_int(raw, "warm_start_tune", DEFAULT_WARM_START_TUNE),
     )
@@ -5,11 +5,52 @@ DEFAULT_TUNE: int = 1000
 DEFAULT_TARGET_ACCEPT: float = 0.9
 DEFAULT_CHAINS: int = 4
 DEFAULT_N_CHANGE_POINTS: int = 2
+DEFAULT_HDI_PROB: float = 0.94
 DEFAULT_VOLATILITY_WINDOW: int = 30
+DEFAULT_EVENT_WINDOWS: tuple = (30,)
+DEFAULT_EVENT_TOLERANCE_DAYS: int = 90
+DEFAULT_EVENT_MATCH_LIMIT: int = 3
+DEFAULT_EWMA_LAMBDA: float = 0.94
+VOLATILITY_CACHE_SIZE: int = 8
+DEFAULT_DOWNSAMPLE_METHOD: str = "lttb"
+DEFAULT_PELT_MIN_SIZE: int = 30
+DEFAULT_PELT_MAX_GRID: int = 5000
+DEFAULT_BOCPD_HAZARD: float = 1.0 / 250.0
+DEFAULT_BOCPD_MAX_RUN_LENGTH: int = 1000
+DEFAULT_BOCPD_MIN_REGIME: int = 30
+DEFAULT_POSTERIOR_CACHE_MAX_BYTES: int = 2 * 1024**3
+DEFAULT_WARM_START_TUNE: int = 100
+WARM_START_MASS_WEIGHT: int = 200
+WARM_START_MAX_DIVERGENCE_RATE: float = 0.01
+WARM_START_MAX_RHAT: float = 1.05
+SHAP_ARTIFACT_KEEP: int = 3
+DEFAULT_SHAP_METHOD: str = "exact"
+DEFAULT_SHAP_SAMPLE_SIZE: int = 500
+DEFAULT_SHAP_BACKGROUND_SIZE: int = 100
+DEFAULT_BACKTEST_WINDOW: int = 2520
+DEFAULT_BACKTEST_STEP: int = 252
+DEFAULT_BACKTEST_HORIZON: int = 21
+DEFAULT_BACKTEST_TOLERANCE_DAYS: int = 60
+DEFAULT_VAR_MAXLAGS: int = 3
+DEFAULT_VAR_ALPHA: float = 0.05
+VAR_FORECAST_STEPS: int = 20
+VAR_IRF_PERIODS: int = 20
+VAR_ARTIFACT_KEEP: int = 3
 
+PROCESSED_PRICES_PATH: str = "data/processed/brentoilprices_processed.csv"
+COLUMNAR_STORE_DIR: str = "data/cache/columns"
 MODEL_V1_CONFIG_PATH: str = "models/brent_cp_model_v1/model_config.json"
 MODEL_V2_POSTERIOR_PATH: str = "models/brent_cp_model_v2/posterior.nc"
+MODEL_V2_SWEEP_DIR: str = "models/brent_cp_model_v2/sweep"
+MODEL_V2_CACHE_DIR: str = "models/brent_cp_model_v2/cache"
+ONLINE_CP_STATE_PATH: str = "models/brent_cp_online/bocpd_state.npz"
 CHANGE_POINT_RESULTS_PATH: str = "reports/change_point_results.json"
+CHANGE_POINT_SWEEP_PATH: str = "reports/change_point_sweep.json"
 VAR_RESULTS_PATH: str = "reports/var_results.json"
+REGIME_VAR_RESULTS_PATH: str = "reports/regime_var_results.json"
+BACKTEST_RESULTS_PATH: str = "reports/backtest_results.json"
+BACKTEST_CHECKPOINT_DIR: str = "models/backtest"
 SHAP_GLOBAL_PNG: str = "reports/shap_global.png"
 SHAP_LOCAL_PNG: str = "reports/shap_local.png"
+SHAP_ARTIFACT_DIR: str = "models/shap"
+VAR_ARTIFACT_DIR: str = "models/var"
@@ -0,0 +1,285 @@
+"""Typed columnar copies of the processed CSVs, memory-mapped read-only."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.constants import COLUMNAR_STORE_DIR
+from src.data.preprocess import preprocess_prices
+
+# Bump when a converter or the on-disk layout changes.
+STORE_FORMAT_VERSION = 2
+STORE_DIR = Path(__file__).resolve().parents[2] / COLUMNAR_STORE_DIR
+EVENT_DATE_COLUMNS = ("start_date", "date", "event_date")
+
+_open_lock = threading.Lock()
+_open_tables: Dict[str, "ColumnarTable"] = {}
+
+
+@dataclass(frozen=True)
+class ColumnarTable:
+    """Read-only memory-mapped columns of one converted CSV."""
+
+    source: Path
+    directory: Path
+    digest: str
+    stat: tuple
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def to_frame(self, columns: Optional[Iterable[str]] = None, copy: bool = False) -> pd.DataFrame:
+        """
+        DataFrame over the mapped columns.
+
+        Without ``copy`` numeric and date columns are views of the read-only
+        maps: replacing a column is fine, writing into one raises.
+        """
+        names = list(self.columns) if columns is None else list(columns)
+        return pd.DataFrame({name: self.columns[name] for name in names}, copy=copy)
+
+
+def _store_root(source: Path, kind: str) -> Path:
+    """``STORE_DIR/<csv name>-<path hash>/<kind>``: one store per source file."""
+    key = hashlib.sha256(str(source).encode("utf-8")).hexdigest()[:12]
+    return STORE_DIR / f"{source.name}-{key}" / kind
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat_key(path: Path) -> tuple:
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _column_array(series: pd.Series) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Storable array of ``series`` and, for text with gaps, its missing-value mask."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy(dtype="datetime64[ns]"), None
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(), None
+    # Fixed-width unicode keeps text columns mappable; the mask keeps NaN apart from "".
+    missing = series.isna().to_numpy()
+    values = series.fillna("").astype(str).to_numpy(dtype=str)
+    return values, missing if missing.any() else None
+
+
+def _with_missing(values: np.ndarray, missing: Optional[np.ndarray]) -> np.ndarray:
+    """Text column as read by pandas: an object array with NaN where the CSV had no value."""
+    if missing is None:
+        return values
+    restored = values.astype(object)
+    restored[missing] = np.nan
+    return restored
+
+
+def _write_store(frame: pd.DataFrame, root: Path, digest: str, stat: tuple) -> Path:
+    directory = root / digest[:16]
+    arrays = {str(name): _column_array(frame[name]) for name in frame.columns}
+    if not directory.exists():
+        partial = root / f"{digest[:16]}.partial-{os.getpid()}"
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+        for idx, (values, missing) in enumerate(arrays.values()):
+            np.save(partial / f"col_{idx}.npy", values)
+            if missing is not None:
+                np.save(partial / f"col_{idx}.missing.npy", missing)
+        try:
+            os.replace(partial, directory)
+        except OSError:
+            # Another worker published the same content first.
+            shutil.rmtree(partial, ignore_errors=True)
+    manifest = {
+        "format_version": STORE_FORMAT_VERSION,
+        "sha256": digest,
+        "mtime_ns": stat[0],
+        "size": stat[1],
+        "directory": directory.name,
+        "columns": list(arrays),
+        "missing": [name for name, (_, missing) in arrays.items() if missing is not None],
+    }
+    _write_manifest(root, manifest)
+    for stale in root.iterdir():
+        if stale.is_dir() and stale != directory and ".partial-" not in stale.name:
+            # Workers still mapping old files keep them until they reopen.
+            shutil.rmtree(stale, ignore_errors=True)
+    return directory
+
+
+def _write_manifest(root: Path, manifest: Dict[str, object]) -> None:
+    partial = root / f"manifest.json.partial-{os.getpid()}"
+    with partial.open("w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(partial, root / "manifest.json")
+
+
+def _read_manifest(root: Path) -> Optional[Dict[str, object]]:
+    try:
+        with (root / "manifest.json").open("r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != STORE_FORMAT_VERSION:
+        return None
+    if not (root / str(manifest["directory"])).is_dir():
+        return None
+    return manifest
+
+
+def _map_columns(
+    directory: Path, names: Iterable[str], missing: List[str]
+) -> Dict[str, np.ndarray]:
+    """Mapped columns; text columns listed in ``missing`` are restored to objects with NaN."""
+    columns = {}
+    for idx, name in enumerate(names):
+        values = np.load(directory / f"col_{idx}.npy", mmap_mode="r")
+        if name in missing:
+            values = _with_missing(values, np.load(directory / f"col_{idx}.missing.npy"))
+        columns[name] = values
+    return columns
+
+
+def open_table(
+    csv_path: str,
+    kind: str,
+    convert: Callable[[pd.DataFrame], pd.DataFrame],
+) -> ColumnarTable:
+    """
+    Memory-map the ``kind`` conversion of ``csv_path``, converting it if needed.
+
+    The store lives in the cache directory ``STORE_DIR``, under the CSV's
+    name and a hash of its path, so no files are written next to the data.
+    It is reused while the CSV's mtime and size are unchanged; otherwise the
+    CSV is hashed and only a content change triggers a rebuild. Opened tables
+    are shared within the process, so repeated calls cost one ``stat``.
+    Missing text stays NaN, as with ``pd.read_csv``.
+    """
+    source = Path(csv_path).resolve()
+    if not source.exists():
+        raise FileNotFoundError(f"Data file not found at {csv_path}")
+    stat = _stat_key(source)
+    cache_key = f"{source}::{kind}"
+    table = _open_tables.get(cache_key)
+    if table is not None and table.stat == stat:
+        return table
+
+    with _open_lock:
+        table = _open_tables.get(cache_key)
+        if table is not None and table.stat == stat:
+            return table
+        root = _store_root(source, kind)
+        manifest = _read_manifest(root)
+        if manifest is not None and (manifest["mtime_ns"], manifest["size"]) != stat:
+            digest = _file_digest(source)
+            if manifest["sha256"] == digest:
+                # Touched but unchanged: keep the converted columns.
+                manifest.update(mtime_ns=stat[0], size=stat[1])
+                try:
+                    _write_manifest(root, manifest)
+                except OSError:
+                    pass
+            else:
+                manifest = None
+        if manifest is None:
+            digest = _file_digest(source)
+            frame = convert(pd.read_csv(source))
+            try:
+                root.mkdir(parents=True, exist_ok=True)
+                _write_store(frame, root, digest, stat)
+                manifest = _read_manifest(root)
+            except OSError:
+                manifest = None
+            if manifest is None:
+                # Read-only data directory: serve the conversion from memory.
+                table = ColumnarTable(
+                    source=source,
+                    directory=root,
+                    digest=digest,
+                    stat=stat,
+                    columns={
+                        str(name): _with_missing(*_column_array(frame[name]))
+                        for name in frame.columns
+                    },
+                )
+                _open_tables[cache_key] = table
+                return table
+        directory = root / str(manifest["directory"])
+        table = ColumnarTable(
+            source=source,
+            directory=directory,
+            digest=str(manifest["sha256"]),
+            stat=stat,
+            columns=_map_columns(
+                directory, manifest["columns"], manifest["missing"]  # type: ignore[arg-type]
+            ),
+        )
+        _open_tables[cache_key] = table
+        return table
+
+
+def convert_prices(df: pd.DataFrame) -> pd.DataFrame:
+    if "Date" not in df.columns or "Price" not in df.columns:
+        raise ValueError("Dataset must contain 'Date' and 'Price' columns")
+    return preprocess_prices(df)
+
+
+def convert_events(df: pd.DataFrame) -> pd.DataFrame:
+    events = df.copy()
+    for column in EVENT_DATE_COLUMNS:
+        if column in events.columns:
+            events[column] = pd.to_datetime(events[column], errors="coerce")
+    return events
+
+
+def event_date_column(df: pd.DataFrame) -> Optional[str]:
+    """First of ``EVENT_DATE_COLUMNS`` present in ``df``, or None."""
+    for column in EVENT_DATE_COLUMNS:
+        if column in df.columns:
+            return column
+    return None
+
+
+def text_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """``column`` as an object array of strings, ``""`` where missing or absent."""
+    if column not in df.columns:
+        return np.full(len(df), "", dtype=object)
+    return df[column].fillna("").astype(str).to_numpy(dtype=object)
+
+
+def event_titles(df: pd.DataFrame) -> np.ndarray:
+    """First non-empty of event_name, title, event per row; missing text counts as empty."""
+    titles = np.full(len(df), "", dtype=object)
+    for column in ("event", "title", "event_name"):
+        values = text_column(df, column)
+        titles = np.where(values != "", values, titles)
+    return titles
+
+
+def price_table(csv_path: str) -> ColumnarTable:
+    """Preprocessed prices (``Date`` as datetime64, ``log_price``, ``log_return``)."""
+    return open_table(csv_path, "prices", convert_prices)
+
+
+def event_table(csv_path: str) -> ColumnarTable:
+    """Events with their date columns parsed to datetime64."""
+    return open_table(csv_path, "events", convert_events)
@@ -0,0 +1,30 @@
+"""JSON-ready lists of the float32 arrays kept by the artifact stores."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+# About the decimal precision of a float32; more digits only show binary noise.
+FLOAT32_DIGITS = 7
+
+
+def float32_list(values: Any) -> list:
+    """
+    float32 values as JSON numbers at about float32 precision (no float64 noise digits).
+
+    Each value is rounded to ``FLOAT32_DIGITS`` significant digits in one
+    vectorized pass over the array: the value is scaled by an exact power of
+    ten, rounded, and scaled back. So ``0.1f`` becomes ``0.1``, not
+    ``0.10000000149011612``. NaN and infinities pass through unchanged.
+    """
+    values = np.asarray(values, dtype=np.float32).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponent = np.floor(np.log10(np.abs(values)))
+    decimals = np.where(np.isfinite(exponent), FLOAT32_DIGITS - 1 - exponent, 0.0)
+    # Multiply up for fractional digits and divide down for large magnitudes,
+    # so the factor applied last is always a power of ten, never its inexact inverse.
+    up = 10.0 ** np.maximum(decimals, 0.0)
+    down = 10.0 ** np.maximum(-decimals, 0.0)
+    return (np.round(values * up / down) / up * down).tolist()
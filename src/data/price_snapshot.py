@@ -0,0 +1,88 @@
+"""Read-only price, log-return and volatility arrays shared by every worker process."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.time_index import TimeIndex
+from src.analysis.volatility import VolatilityEngine
+from src.constants import DEFAULT_VOLATILITY_WINDOW
+from src.data.columnar_store import convert_prices, open_table
+
+_snapshots: Dict[Tuple[str, int], "PriceSnapshot"] = {}
+
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    """
+    Views of one memory-mapped snapshot file.
+
+    The arrays are read-only and backed by the page cache, so processes that
+    attach to the same snapshot share one physical copy.
+    """
+
+    dates: np.ndarray
+    price: np.ndarray
+    log_return: np.ndarray
+    volatility: np.ndarray
+    window: int
+    digest: str
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @cached_property
+    def index(self) -> TimeIndex:
+        """Date index with prefix sums over prices and log returns, built once per snapshot."""
+        return TimeIndex(self.dates, {"Price": self.price, "log_return": self.log_return})
+
+    @cached_property
+    def volatility_engine(self) -> VolatilityEngine:
+        """Prefix-sum volatility engine over the log returns, with memoized windows."""
+        return VolatilityEngine(self.log_return)
+
+
+def _snapshot_converter(window: int):
+    def convert(df: pd.DataFrame) -> pd.DataFrame:
+        prices = convert_prices(df)
+        return pd.DataFrame(
+            {
+                "Date": prices["Date"],
+                "Price": prices["Price"],
+                "log_return": prices["log_return"],
+                "volatility": VolatilityEngine(prices["log_return"]).rolling_std(window),
+            }
+        )
+
+    return convert
+
+
+def load_price_snapshot(
+    csv_path: str,
+    window: int = DEFAULT_VOLATILITY_WINDOW,
+) -> PriceSnapshot:
+    """
+    Attach to (publishing first if stale) the snapshot of ``csv_path``.
+
+    The first caller converts the CSV and atomically publishes the snapshot
+    next to it; later callers, in any process, only map it.
+    """
+    table = open_table(csv_path, f"snapshot_w{int(window)}", _snapshot_converter(int(window)))
+    key = (str(table.source), int(window))
+    snapshot = _snapshots.get(key)
+    if snapshot is None or snapshot.digest != table.digest:
+        snapshot = PriceSnapshot(
+            dates=table["Date"],
+            price=table["Price"],
+            log_return=table["log_return"],
+            volatility=table["volatility"],
+            window=int(window),
+            digest=table.digest,
+        )
+        _snapshots[key] = snapshot
+    return snapshot
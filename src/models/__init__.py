@@ -2,7 +2,17 @@
 
 __all__ = [
     "bayesian_change_point",
+    "pelt_change_point",
+    "online_change_point",
     "model_utils",
+    "change_point_summary",
+    "model_sweep",
+    "backtest",
+    "posterior_cache",
     "var_model",
+    "var_service",
+    "regime_var",
     "explainability",
+    "shap_artifacts",
+    "job_state",
 ]
@@ -0,0 +1,393 @@
+"""Rolling-origin backtests of change-point detection and VAR forecasts, in parallel."""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.event_mapping import nearest_events
+from src.config import ModelConfig, load_model_config
+from src.constants import (
+    BACKTEST_CHECKPOINT_DIR,
+    BACKTEST_RESULTS_PATH,
+    DEFAULT_BACKTEST_HORIZON,
+    DEFAULT_BACKTEST_STEP,
+    DEFAULT_BACKTEST_TOLERANCE_DAYS,
+    DEFAULT_BACKTEST_WINDOW,
+    PROCESSED_PRICES_PATH,
+)
+from src.data.load_data import load_prices
+from src.data.macro_loader import load_macro_data
+from src.models.var_model import VAR_COLUMNS, fit_var_model
+
+BACKTEST_SCHEMES = ("expanding", "rolling")
+BACKTEST_DETECTORS = ("pelt", "bayesian")
+
+
+def backtest_windows(
+    n_obs: int,
+    scheme: str = "expanding",
+    window: int = DEFAULT_BACKTEST_WINDOW,
+    step: int = DEFAULT_BACKTEST_STEP,
+    horizon: int = DEFAULT_BACKTEST_HORIZON,
+) -> List[Tuple[int, int, int]]:
+    """
+    ``(train_start, train_end, test_end)`` row ranges of each backtest origin.
+
+    Origins advance by ``step`` rows; each trains on ``[train_start, train_end)``
+    and is scored on the next ``horizon`` rows ``[train_end, test_end)``.
+    ``expanding`` windows all start at row 0 (the first one ``window`` rows
+    long); ``rolling`` windows keep ``window`` rows.
+    """
+    if scheme not in BACKTEST_SCHEMES:
+        raise ValueError(f"Unknown backtest scheme '{scheme}'")
+    if window < 2 or step < 1 or horizon < 1:
+        raise ValueError("window must be >= 2, step and horizon >= 1")
+    origins = np.arange(window, n_obs - horizon + 1, step)
+    starts = np.zeros_like(origins) if scheme == "expanding" else origins - window
+    return [(int(lo), int(mid), int(mid + horizon)) for lo, mid in zip(starts, origins)]
+
+
+def _run_key(frame: pd.DataFrame, options: Dict[str, Any]) -> str:
+    """Checkpoints are only reused for the same data and the same backtest options."""
+    digest = hashlib.sha256()
+    digest.update(frame["Date"].to_numpy(dtype="datetime64[ns]").tobytes())
+    digest.update(frame[list(VAR_COLUMNS)].to_numpy(dtype=float).tobytes())
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _detect(
+    train: pd.DataFrame,
+    detector: str,
+    n_change_points: Optional[int],
+    config: Optional[ModelConfig],
+    posterior_path: str,
+    cores: int,
+) -> Dict[str, Any]:
+    # Imported in the worker: both detectors pull in the PyMC helpers.
+    if detector == "bayesian":
+        from dataclasses import replace
+
+        from src.models.bayesian_change_point import run_change_point_pipeline
+
+        cfg = config or load_model_config()
+        if n_change_points is not None:
+            cfg = replace(cfg, n_change_points=n_change_points)
+        results_path = Path(posterior_path).with_suffix(".summary.json")
+        # No shared posterior cache: windows run concurrently and write only
+        # to their own paths under the run directory.
+        return run_change_point_pipeline(
+            train,
+            config=cfg,
+            posterior_path=posterior_path,
+            results_path=str(results_path),
+            use_cache=False,
+            cores=cores,
+        )
+    from src.models.pelt_change_point import run_pelt_pipeline
+
+    return run_pelt_pipeline(train, n_change_points=n_change_points, results_path=None)
+
+
+def _forecast_errors(train: pd.DataFrame, test: pd.DataFrame) -> Dict[str, Any]:
+    """VAR forecast of ``log_return`` over ``test``, against the zero-return forecast."""
+    result = fit_var_model(train)
+    actual = test["log_return"].to_numpy(dtype=float)
+    history = train[list(VAR_COLUMNS)].dropna().to_numpy(dtype=float)
+    predicted = result.forecast(history, steps=len(actual))[:, 0]
+    errors = predicted - actual
+    return {
+        "lag_order": result.k_ar,
+        "rmse": float(np.sqrt(np.mean(errors**2))),
+        "mae": float(np.mean(np.abs(errors))),
+        "naive_rmse": float(np.sqrt(np.mean(actual**2))),
+    }
+
+
+def _run_window(
+    window_id: int,
+    bounds: Tuple[int, int, int],
+    frame: pd.DataFrame,
+    detector: str,
+    n_change_points: Optional[int],
+    config: Optional[ModelConfig],
+    posterior_path: str,
+    cores: int,
+) -> Dict[str, Any]:
+    """Worker: detect breaks on one training window and score its VAR forecast."""
+    start = time.perf_counter()
+    lo, mid, hi = bounds
+    train, test = frame.iloc[lo:mid], frame.iloc[mid:hi]
+    summary = _detect(train, detector, n_change_points, config, posterior_path, cores)
+    return {
+        "window": window_id,
+        "train_start": str(train["Date"].iloc[0].date()),
+        "train_end": str(train["Date"].iloc[-1].date()),
+        "test_end": str(test["Date"].iloc[-1].date()),
+        "n_train": int(len(train)),
+        "change_point_dates": [cp["tau_date"] for cp in summary.get("change_points", [])],
+        "forecast": _forecast_errors(train, test),
+        "runtime_seconds": time.perf_counter() - start,
+    }
+
+
+def _failed_window(
+    window_id: int, bounds: Tuple[int, int, int], frame: pd.DataFrame, exc: Exception
+) -> Dict[str, Any]:
+    """Result of a window whose detection or VAR fit raised."""
+    lo, mid, hi = bounds
+    dates = frame["Date"]
+    return {
+        "window": window_id,
+        "train_start": str(dates.iloc[lo].date()),
+        "train_end": str(dates.iloc[mid - 1].date()),
+        "test_end": str(dates.iloc[hi - 1].date()),
+        "n_train": mid - lo,
+        "error": f"{type(exc).__name__}: {exc}",
+    }
+
+
+def _write_checkpoint(result: Dict[str, Any], path: Path) -> None:
+    partial = path.with_name(f"{path.stem}.partial-{os.getpid()}.json")
+    with partial.open("w", encoding="utf-8") as handle:
+        json.dump(result, handle)
+    os.replace(partial, path)
+
+
+def _load_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def break_stability(
+    windows: Sequence[Dict[str, Any]],
+    tolerance_days: int = DEFAULT_BACKTEST_TOLERANCE_DAYS,
+) -> List[Dict[str, Any]]:
+    """
+    How consistently each break of the latest window is found by earlier windows.
+
+    For every reference break (those of the last window), only the earlier
+    windows whose training range contains it count; the last window always
+    finds its own breaks, so it is not one of them. Reported: the share of
+    them that detect a break within ``tolerance_days``, and the mean and
+    standard deviation of the nearest such break's offset in days. Failed
+    windows are left out.
+    """
+    windows = [window for window in windows if "error" not in window]
+    if not windows:
+        return []
+    reference = np.asarray(windows[-1]["change_point_dates"], dtype="datetime64[ns]")
+    offsets: List[List[float]] = [[] for _ in reference]
+    covering = np.zeros(len(reference), dtype=int)
+    for window in windows[:-1]:
+        inside = (reference >= np.datetime64(window["train_start"])) & (
+            reference <= np.datetime64(window["train_end"])
+        )
+        covering += inside
+        owner, _, offset = nearest_events(
+            reference, window["change_point_dates"], tolerance_days, limit=1
+        )
+        for row, days in zip(owner.tolist(), offset.tolist()):
+            if inside[row]:
+                offsets[row].append(days)
+    stability = []
+    for row, date in enumerate(np.datetime_as_string(reference, unit="D").tolist()):
+        found = np.asarray(offsets[row], dtype=float)
+        stability.append(
+            {
+                "tau_date": date,
+                "windows_covering": int(covering[row]),
+                "detection_rate": float(len(found) / covering[row]) if covering[row] else None,
+                "mean_offset_days": float(found.mean()) if len(found) else None,
+                "std_offset_days": float(found.std()) if len(found) else None,
+            }
+        )
+    return stability
+
+
+def forecast_summary(windows: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mean VAR forecast errors over the windows that did not fail."""
+    scored = [window["forecast"] for window in windows if "error" not in window]
+    if not scored:
+        return {"windows_scored": 0}
+    rmse = np.array([row["rmse"] for row in scored])
+    naive = np.array([row["naive_rmse"] for row in scored])
+    return {
+        "windows_scored": len(scored),
+        "mean_rmse": float(rmse.mean()),
+        "mean_mae": float(np.mean([row["mae"] for row in scored])),
+        "mean_naive_rmse": float(naive.mean()),
+        # Below 1 means the VAR beats forecasting a zero return.
+        "relative_rmse": float(rmse.mean() / naive.mean()) if naive.mean() else None,
+        "share_beating_naive": float(np.mean(rmse < naive)),
+    }
+
+
+def run_backtest(
+    prices: pd.DataFrame,
+    scheme: str = "expanding",
+    window: int = DEFAULT_BACKTEST_WINDOW,
+    step: int = DEFAULT_BACKTEST_STEP,
+    horizon: int = DEFAULT_BACKTEST_HORIZON,
+    detector: str = "pelt",
+    n_change_points: Optional[int] = None,
+    config: Optional[ModelConfig] = None,
+    max_workers: Optional[int] = None,
+    tolerance_days: int = DEFAULT_BACKTEST_TOLERANCE_DAYS,
+    checkpoint_dir: str = BACKTEST_CHECKPOINT_DIR,
+    report_path: Optional[str] = BACKTEST_RESULTS_PATH,
+) -> Dict[str, Any]:
+    """
+    Detect change points and score VAR forecasts on every backtest window.
+
+    Windows (see ``backtest_windows``) run in a spawned process pool of
+    ``max_workers`` (default: all cores; the Bayesian detector's chains share
+    that budget, each fit sampling on its own slice of it and without the
+    shared posterior cache). Each finished window is checkpointed under
+    ``checkpoint_dir/<run key>/``, so re-running the same backtest after an
+    interruption only computes the missing windows. A window that raises is
+    recorded with its ``error`` and not checkpointed, so a re-run retries it.
+    The report holds every window, ``break_stability`` and ``forecast_summary``.
+    """
+    if detector not in BACKTEST_DETECTORS:
+        raise ValueError(f"Unknown change-point detector '{detector}'")
+    frame = load_macro_data(prices).dropna(subset=list(VAR_COLUMNS)).reset_index(drop=True)
+    bounds = backtest_windows(len(frame), scheme, window, step, horizon)
+    if not bounds:
+        raise ValueError(f"{len(frame)} rows are too few for window={window}, horizon={horizon}")
+    options = {
+        "scheme": scheme,
+        "window": window,
+        "step": step,
+        "horizon": horizon,
+        "detector": detector,
+        "n_change_points": n_change_points,
+        "config": config,
+    }
+    run_dir = Path(checkpoint_dir) / _run_key(frame, options)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    paths = [run_dir / f"window_{window_id:04d}.json" for window_id in range(len(bounds))]
+    results: Dict[int, Dict[str, Any]] = {}
+    for window_id, path in enumerate(paths):
+        checkpoint = _load_checkpoint(path)
+        if checkpoint is not None:
+            results[window_id] = checkpoint
+    resumed = len(results)
+    pending = [window_id for window_id in range(len(bounds)) if window_id not in results]
+
+    budget = max_workers or os.cpu_count() or 1
+    if detector == "bayesian":
+        from src.models.model_sweep import plan_sweep_workers
+
+        n_workers, cores_per_fit = plan_sweep_workers(
+            len(pending) or 1, (config or load_model_config()).chains, budget
+        )
+    else:
+        n_workers, cores_per_fit = max(1, min(budget, len(pending) or 1)), 1
+    started = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = {
+                pool.submit(
+                    _run_window,
+                    window_id,
+                    # Only the rows this window touches are sent, with the bounds rebased.
+                    tuple(bound - bounds[window_id][0] for bound in bounds[window_id]),
+                    frame.iloc[bounds[window_id][0] : bounds[window_id][2]],
+                    detector,
+                    n_change_points,
+                    config,
+                    str(run_dir / f"window_{window_id:04d}.nc"),
+                    cores_per_fit,
+                ): window_id
+                for window_id in pending
+            }
+            for future in as_completed(futures):
+                window_id = futures[future]
+                try:
+                    results[window_id] = future.result()
+                except Exception as exc:
+                    results[window_id] = _failed_window(window_id, bounds[window_id], frame, exc)
+                    continue
+                _write_checkpoint(results[window_id], paths[window_id])
+
+    windows = [results[window_id] for window_id in range(len(bounds))]
+    report = {
+        **{key: value for key, value in options.items() if key != "config"},
+        "n_windows": len(windows),
+        "resumed_windows": resumed,
+        "failed_windows": sum("error" in window for window in windows),
+        "workers": n_workers,
+        "cores_per_fit": cores_per_fit,
+        "wall_seconds": time.perf_counter() - started,
+        "checkpoint_dir": str(run_dir),
+        "tolerance_days": tolerance_days,
+        "break_stability": break_stability(windows, tolerance_days),
+        "forecast": forecast_summary(windows),
+        "windows": windows,
+    }
+    if report_path is not None:
+        out = Path(report_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with out.open("w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scheme", choices=BACKTEST_SCHEMES, default="expanding")
+    parser.add_argument("--window", type=int, default=DEFAULT_BACKTEST_WINDOW)
+    parser.add_argument("--step", type=int, default=DEFAULT_BACKTEST_STEP)
+    parser.add_argument("--horizon", type=int, default=DEFAULT_BACKTEST_HORIZON)
+    parser.add_argument("--detector", choices=BACKTEST_DETECTORS, default="pelt")
+    parser.add_argument("--n-change-points", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--data", default=PROCESSED_PRICES_PATH)
+    args = parser.parse_args()
+
+    report = run_backtest(
+        load_prices(args.data),
+        scheme=args.scheme,
+        window=args.window,
+        step=args.step,
+        horizon=args.horizon,
+        detector=args.detector,
+        n_change_points=args.n_change_points,
+        max_workers=args.workers,
+    )
+    print(
+        f"{report['n_windows']} windows ({report['resumed_windows']} resumed) "
+        f"on {report['workers']} workers in {report['wall_seconds']:.1f}s"
+    )
+    for window in report["windows"]:
+        if "error" in window:
+            print(f"window {window['window']} ({window['train_end']}) failed: {window['error']}")
+    for row in report["break_stability"]:
+        print(
+            f"{row['tau_date']}  found in {row['detection_rate'] or 0:.0%} "
+            f"of {row['windows_covering']} windows"
+        )
+    forecast = report["forecast"]
+    if forecast.get("relative_rmse") is not None:
+        print(f"VAR RMSE / zero-return RMSE: {forecast['relative_rmse']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,75 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from dataclasses import asdict
+import math
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
 import arviz as az
 import numpy as np
 import pandas as pd
 import pymc as pm
 import pytensor.tensor as pt
+from pytensor.graph.basic import Apply
+from pytensor.graph.op import Op
+from pymc.exceptions import SamplingError
+from pymc.logprob.transforms import Transform
+import xarray as xr
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    njit = None  # type: ignore
 
 from src.config import ModelConfig, load_model_config
 from src.constants import CHANGE_POINT_RESULTS_PATH, MODEL_V2_POSTERIOR_PATH
 from src.models.model_utils import (
+    passes_convergence_checks,
     run_mcmc,
     save_inference_data,
     summarize_change_points,
+    warm_start_sampler,
     write_json,
 )
+from src.models.pelt_change_point import pelt_fixed_change_points, tau_prior_bounds
+from src.models.posterior_cache import (
+    PosteriorCache,
+    dates_digest,
+    fit_cache_key,
+    model_code_version,
+)
 
 
-def build_change_point_model(log_returns: np.ndarray, n_change_points: int = 1) -> pm.Model:
-    """Build a Bayesian change-point model with configurable structural breaks."""
+def _clean_returns(log_returns: np.ndarray, n_change_points: int) -> np.ndarray:
     if n_change_points < 1:
         raise ValueError("n_change_points must be >= 1")
-
     clean_returns = np.asarray(log_returns, dtype=float)
     clean_returns = clean_returns[~np.isnan(clean_returns)]
-    t_size = len(clean_returns)
-    if t_size <= (n_change_points + 1):
+    if len(clean_returns) <= (n_change_points + 1):
         raise ValueError("Insufficient data points for selected number of change points.")
+    return clean_returns
+
+
+def build_change_point_model(
+    log_returns: np.ndarray,
+    n_change_points: int = 1,
+    tau_bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> pm.Model:
+    """
+    Build a Bayesian change-point model with configurable structural breaks.
+
+    ``tau_bounds`` optionally narrows each ``tau_raw`` coordinate to its own
+    ``(lower, upper)`` window, e.g. from ``pelt_change_point.tau_prior_bounds``.
+    """
+    clean_returns = _clean_returns(log_returns, n_change_points)
+    t_size = len(clean_returns)
+    tau_kwargs: Dict[str, Any] = {"lower": 1, "upper": t_size - 2}
+    if tau_bounds is not None:
+        lower, upper = (np.asarray(bound, dtype=np.int64) for bound in tau_bounds)
+        tau_kwargs = {"lower": lower, "upper": upper, "initval": (lower + upper) // 2}
 
     with pm.Model() as model:
-        tau_raw = pm.DiscreteUniform(
-            "tau_raw",
-            lower=1,
-            upper=t_size - 2,
-            shape=n_change_points,
-        )
+        tau_raw = pm.DiscreteUniform("tau_raw", shape=n_change_points, **tau_kwargs)
         tau = pm.Deterministic("tau", pt.sort(tau_raw))
 
         mu_regimes = pm.Normal("mu_regimes", mu=0.0, sigma=1.0, shape=n_change_points + 1)
@@ -51,34 +85,652 @@ def build_change_point_model(log_returns: np.ndarray, n_change_points: int = 1)
     return model
 
 
+def _prefix_stats(clean_returns: np.ndarray) -> np.ndarray:
+    """Inclusive prefix count, sum and sum of squares of the returns, shape (3, T)."""
+    return np.stack(
+        [
+            np.arange(1, len(clean_returns) + 1, dtype=float),
+            np.cumsum(clean_returns),
+            np.cumsum(clean_returns**2),
+        ]
+    )
+
+
+def _log_prior_norm(n_positions: int, n_change_points: int) -> float:
+    """
+    Log normalizer of the tau prior in the tie-weighted sum over sorted tuples.
+
+    ``tau`` is the sorted draw of ``n_change_points`` iid uniform locations,
+    so a sorted tuple has prior mass ``K! / prod(m!) / n_positions**K`` with
+    ``m`` the multiplicities of its tied locations. The recursions below
+    carry the ``1 / prod(m!)`` factor; this returns the rest.
+    """
+    return n_change_points * math.log(n_positions) - math.lgamma(n_change_points + 1)
+
+
+def _reverse_logcumsumexp(values: np.ndarray) -> np.ndarray:
+    return np.flip(np.logaddexp.accumulate(np.flip(values, -1), axis=-1), -1)
+
+
+def _shift_exclusive(cumulative: np.ndarray, reverse: bool = False) -> np.ndarray:
+    """Turn an inclusive cumulative log-sum along the last axis into an exclusive one."""
+    empty = np.full(cumulative.shape[:-1] + (1,), -np.inf)
+    if reverse:
+        return np.concatenate([cumulative[..., 1:], empty], axis=-1)
+    return np.concatenate([empty, cumulative[..., :-1]], axis=-1)
+
+
+def _forward_messages(
+    prefix: np.ndarray,
+    mu: np.ndarray,
+    sigma: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Switch gains and forward messages over candidate tau locations 1..T-2.
+
+    ``mu``/``sigma`` may carry leading batch axes. The switch gain is the
+    log-likelihood change from moving every point up to tau from regime k to
+    regime k+1. ``forward[..., k, r, p]`` is the log-weight of the sorted
+    prefix ``tau_0..tau_k`` ending at location ``p`` with its last ``r + 1``
+    entries tied there; a tie run of length ``m`` is weighted ``1 / m!``, as
+    in the sorted iid uniform prior.
+    """
+    counts, sums, squares = prefix
+    mu = mu[..., None]
+    sigma = sigma[..., None]
+    cum_loglik = -counts * np.log(sigma) - (squares - 2.0 * mu * sums + counts * mu**2) / (
+        2.0 * sigma**2
+    )
+    switch_gain = cum_loglik[..., :-1, 1:-1] - cum_loglik[..., 1:, 1:-1]
+    n_change_points = switch_gain.shape[-2]
+    forward = np.full(
+        switch_gain.shape[:-2] + (n_change_points,) + switch_gain.shape[-2:], -np.inf
+    )
+    forward[..., 0, 0, :] = switch_gain[..., 0, :]
+    for k in range(1, n_change_points):
+        previous = np.logaddexp.reduce(forward[..., k - 1, :k, :], axis=-2)
+        forward[..., k, 0, :] = switch_gain[..., k, :] + _shift_exclusive(
+            np.logaddexp.accumulate(previous, axis=-1)
+        )
+        forward[..., k, 1 : k + 1, :] = (
+            switch_gain[..., k, None, :]
+            + forward[..., k - 1, :k, :]
+            - np.log(np.arange(2, k + 2))[:, None]
+        )
+    return switch_gain, forward
+
+
+def _expected_regime_stats_numpy(
+    prefix: np.ndarray,
+    mu: np.ndarray,
+    sigma: np.ndarray,
+) -> Tuple[float, np.ndarray]:
+    """Log evidence over tau tuples and expected (count, sum, sum sq) per regime."""
+    switch_gain, forward = _forward_messages(prefix, mu, sigma)
+    log_evidence = np.logaddexp.reduce(forward[-1].ravel())
+
+    n_change_points = len(forward)
+    backward = np.zeros_like(forward)
+    for k in range(n_change_points - 2, -1, -1):
+        start_run = _shift_exclusive(
+            _reverse_logcumsumexp(switch_gain[k + 1] + backward[k + 1, 0]), reverse=True
+        )
+        extend_run = (
+            switch_gain[k + 1]
+            + backward[k + 1, 1 : k + 2]
+            - np.log(np.arange(2, k + 3))[:, None]
+        )
+        backward[k, : k + 1] = np.logaddexp(start_run, extend_run)
+    tau_probs = np.exp(forward + backward - log_evidence).sum(axis=1)
+
+    # Expected prefix statistics at each tau_k, differenced into the
+    # expected count, sum and sum of squares of every regime.
+    at_tau = tau_probs @ prefix[:, 1:-1].T
+    bounds = np.vstack([np.zeros(3), at_tau, prefix[:, -1]])
+    return float(log_evidence), np.diff(bounds, axis=0).T
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _accumulate_logsumexp(
+        values: np.ndarray,
+        offset: np.ndarray,
+        out: np.ndarray,
+        reverse: bool,
+    ) -> float:  # pragma: no cover - compiled
+        """out[i] = offset[i] + log-sum-exp of values up to i (from i if reverse)."""
+        n_values = len(values)
+        peak = -np.inf
+        running = 0.0
+        for step in range(n_values):
+            pos = n_values - 1 - step if reverse else step
+            value = values[pos]
+            # Keep the running sum scaled by its maximum so that only a
+            # new maximum needs a rescale; the log stays off the hot chain.
+            if value > peak:
+                running = running * np.exp(peak - value) + 1.0
+                peak = value
+            elif value > -np.inf:
+                running += np.exp(value - peak)
+            out[pos] = offset[pos] + peak + np.log(running)
+        return peak + np.log(running)
+
+    @njit(cache=True)
+    def _logaddexp(left: float, right: float) -> float:  # pragma: no cover - compiled
+        if left < right:
+            left, right = right, left
+        if right == -np.inf:
+            return left
+        return left + np.log1p(np.exp(right - left))
+
+    @njit(cache=True)
+    def _expected_regime_stats(
+        prefix: np.ndarray,
+        mu: np.ndarray,
+        sigma: np.ndarray,
+    ) -> Tuple[float, np.ndarray]:  # pragma: no cover - compiled
+        n_regimes = len(mu)
+        n_change_points = n_regimes - 1
+        n_positions = prefix.shape[1] - 2
+        log_sigma = np.log(sigma)
+
+        cum_loglik = np.empty((n_regimes, n_positions))
+        for regime in range(n_regimes):
+            m = mu[regime]
+            inv_var = 0.5 / (sigma[regime] * sigma[regime])
+            for pos in range(n_positions):
+                count = prefix[0, pos + 1]
+                cum_loglik[regime, pos] = -count * log_sigma[regime] - inv_var * (
+                    prefix[2, pos + 1] - 2.0 * m * prefix[1, pos + 1] + count * m * m
+                )
+        gain = cum_loglik[:-1] - cum_loglik[1:]
+
+        # forward[k, r, pos]: tau_k at pos with its last r + 1 entries tied
+        # (see _forward_messages).
+        zeros = np.zeros(n_positions)
+        merged = np.empty(n_positions)
+        cumulative = np.empty(n_positions)
+        forward = np.full((n_change_points, n_change_points, n_positions), -np.inf)
+        forward[0, 0] = gain[0]
+        for k in range(1, n_change_points):
+            for pos in range(n_positions):
+                total = -np.inf
+                for run in range(k):
+                    total = _logaddexp(total, forward[k - 1, run, pos])
+                merged[pos] = total
+            _accumulate_logsumexp(merged, zeros, cumulative, False)
+            for pos in range(1, n_positions):
+                forward[k, 0, pos] = gain[k, pos] + cumulative[pos - 1]
+            for run in range(1, k + 1):
+                penalty = np.log(run + 1.0)
+                for pos in range(n_positions):
+                    forward[k, run, pos] = gain[k, pos] + forward[k - 1, run - 1, pos] - penalty
+        # Only the total is needed here, so no per-location logs; the scaled
+        # weights are the last tau's marginal up to the normalizer.
+        peak = forward[-1].max()
+        last_weights = np.zeros(n_positions)
+        for run in range(n_change_points):
+            for pos in range(n_positions):
+                last_weights[pos] += np.exp(forward[-1, run, pos] - peak)
+        running = last_weights.sum()
+        log_evidence = peak + np.log(running)
+
+        backward = np.zeros((n_change_points, n_change_points, n_positions))
+        for k in range(n_change_points - 2, -1, -1):
+            for pos in range(n_positions):
+                merged[pos] = gain[k + 1, pos] + backward[k + 1, 0, pos]
+            _accumulate_logsumexp(merged, zeros, cumulative, True)
+            for run in range(k + 1):
+                penalty = np.log(run + 2.0)
+                for pos in range(n_positions):
+                    start_run = cumulative[pos + 1] if pos + 1 < n_positions else -np.inf
+                    extend_run = gain[k + 1, pos] + backward[k + 1, run + 1, pos] - penalty
+                    backward[k, run, pos] = _logaddexp(start_run, extend_run)
+
+        bounds = np.zeros((n_change_points + 2, 3))
+        for k in range(n_change_points):
+            count = 0.0
+            total = 0.0
+            square = 0.0
+            for pos in range(n_positions):
+                if k == n_change_points - 1:
+                    weight = last_weights[pos] / running
+                else:
+                    weight = 0.0
+                    for run in range(k + 1):
+                        weight += np.exp(
+                            forward[k, run, pos] + backward[k, run, pos] - log_evidence
+                        )
+                count += weight * prefix[0, pos + 1]
+                total += weight * prefix[1, pos + 1]
+                square += weight * prefix[2, pos + 1]
+            bounds[k + 1, 0] = count
+            bounds[k + 1, 1] = total
+            bounds[k + 1, 2] = square
+        bounds[-1] = prefix[:, -1]
+
+        stats = np.empty((3, n_regimes))
+        for regime in range(n_regimes):
+            for stat in range(3):
+                stats[stat, regime] = bounds[regime + 1, stat] - bounds[regime, stat]
+        return log_evidence, stats
+
+else:  # pragma: no cover
+    _expected_regime_stats = _expected_regime_stats_numpy
+
+
+class _MarginalChangePointLogLik(Op):
+    """
+    Change-point log-likelihood with the sorted tau tuple summed out under its prior.
+
+    Outputs the log-likelihood and its gradient w.r.t. ``mu`` and ``sigma``.
+    The gradient is the Gaussian score evaluated at the expected per-regime
+    sufficient statistics, obtained from forward-backward tau marginals, so a
+    logp+dlogp evaluation is a single O(K^2*T) pass (K for the tie runs of the
+    prior; compiled when numba is installed).
+    """
+
+    def __init__(self, clean_returns: np.ndarray, n_change_points: int) -> None:
+        self.prefix = _prefix_stats(clean_returns)
+        t_size = len(clean_returns)
+        self.log_norm = 0.5 * t_size * np.log(2.0 * np.pi) + _log_prior_norm(
+            t_size - 2, n_change_points
+        )
+
+    def make_node(self, mu: Any, sigma: Any) -> Apply:
+        mu = pt.as_tensor_variable(mu)
+        sigma = pt.as_tensor_variable(sigma)
+        return Apply(self, [mu, sigma], [pt.dscalar(), mu.type(), sigma.type()])
+
+    def perform(self, node: Apply, inputs: Any, outputs: Any) -> None:
+        mu, sigma = (np.asarray(value, dtype=float) for value in inputs)
+        log_evidence, (counts, sums, squares) = _expected_regime_stats(self.prefix, mu, sigma)
+        n_obs, total, square = self.prefix[:, -1]
+        last_regime_loglik = -n_obs * np.log(sigma[-1]) - (
+            square - 2.0 * mu[-1] * total + n_obs * mu[-1] ** 2
+        ) / (2.0 * sigma[-1] ** 2)
+
+        outputs[0][0] = np.asarray(last_regime_loglik + log_evidence - self.log_norm)
+        outputs[1][0] = ((sums - counts * mu) / sigma**2).astype(node.outputs[1].dtype)
+        outputs[2][0] = (
+            -counts / sigma + (squares - 2.0 * mu * sums + counts * mu**2) / sigma**3
+        ).astype(node.outputs[2].dtype)
+
+    def grad(self, inputs: Any, output_grads: Any) -> Any:
+        _, grad_mu, grad_sigma = self(*inputs)
+        return [output_grads[0] * grad_mu, output_grads[0] * grad_sigma]
+
+
+def marginal_change_point_loglik(
+    log_returns: np.ndarray,
+    mu_regimes: Any,
+    sigma_regimes: Any,
+    n_change_points: int,
+) -> Any:
+    """
+    Log-likelihood of the returns with the change-point locations summed out.
+
+    The prior is the discrete model's: ``tau`` is the sorted draw of iid
+    uniform locations. Regime log-likelihoods are built from prefix sums of
+    the returns, so each candidate location costs O(1) and the sum over all
+    sorted tau tuples is a forward recursion of ``n_change_points``
+    cumulative log-sum-exp passes (tracking tie runs for the prior weight).
+    """
+    clean_returns = _clean_returns(log_returns, n_change_points)
+    return _MarginalChangePointLogLik(clean_returns, n_change_points)(
+        mu_regimes, sigma_regimes
+    )[0]
+
+
+class _StandardizingTransform(Transform):
+    """
+    Affine map, optionally of the log value, onto a unit-scale sampling space.
+
+    With thousands of observations the regime parameters have posterior
+    widths of order 1e-4, so NUTS would spend most of warm-up growing
+    trajectories against an identity mass matrix.
+    """
+
+    name = "standardized"
+
+    def __init__(self, loc: np.ndarray, scale: Any, log_scale: bool = False) -> None:
+        self.loc = np.asarray(loc, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.log_scale = log_scale
+
+    def forward(self, value: Any, *inputs: Any) -> Any:
+        base = pt.log(value) if self.log_scale else value
+        return (base - self.loc) / self.scale
+
+    def backward(self, value: Any, *inputs: Any) -> Any:
+        base = self.loc + self.scale * value
+        return pt.exp(base) if self.log_scale else base
+
+    def log_jac_det(self, value: Any, *inputs: Any) -> Any:
+        log_jac = pt.log(self.scale) + pt.zeros_like(value)
+        if self.log_scale:
+            log_jac = log_jac + self.loc + self.scale * value
+        return log_jac
+
+
+def build_marginalized_change_point_model(
+    log_returns: np.ndarray,
+    n_change_points: int = 1,
+    initial_taus: Optional[np.ndarray] = None,
+) -> pm.Model:
+    """
+    Build a change-point model with tau marginalized out of the likelihood.
+
+    Only the continuous regime parameters are sampled, so NUTS runs without a
+    compound step. Sample with ``init="adapt_diag"`` so chains start from the
+    initvals, and recover ``tau`` afterwards with ``attach_tau_posterior``.
+    ``initial_taus`` (e.g. a PELT segmentation) replaces the equal-length
+    chunks used to set those initvals.
+    """
+    clean_returns = _clean_returns(log_returns, n_change_points)
+    n_regimes = n_change_points + 1
+    # Start each regime from the moments of an equal-length chunk: the
+    # summed-out likelihood has local modes where a regime is empty, and a
+    # symmetric start drifts into them.
+    if initial_taus is None:
+        chunks = np.array_split(clean_returns, n_regimes)
+    else:
+        chunks = np.split(clean_returns, np.sort(np.asarray(initial_taus, dtype=np.int64)) + 1)
+    mu_init = np.array([chunk.mean() for chunk in chunks])
+    sigma_init = np.array([chunk.std() for chunk in chunks])
+    regime_size = len(clean_returns) / n_regimes
+
+    with pm.Model() as model:
+        mu_regimes = pm.Normal(
+            "mu_regimes",
+            mu=0.0,
+            sigma=1.0,
+            shape=n_regimes,
+            initval=mu_init,
+            transform=_StandardizingTransform(
+                mu_init, clean_returns.std() / np.sqrt(regime_size)
+            ),
+        )
+        sigma_regimes = pm.HalfNormal(
+            "sigma_regimes",
+            sigma=1.0,
+            shape=n_regimes,
+            initval=sigma_init,
+            default_transform=None,
+            transform=_StandardizingTransform(
+                np.log(sigma_init), 1.0 / np.sqrt(2.0 * regime_size), log_scale=True
+            ),
+        )
+        pm.Potential(
+            "obs",
+            marginal_change_point_loglik(
+                clean_returns, mu_regimes, sigma_regimes, n_change_points
+            ),
+        )
+
+    return model
+
+
+def sample_change_point_locations(
+    log_returns: np.ndarray,
+    mu_samples: np.ndarray,
+    sigma_samples: np.ndarray,
+    random_seed: Optional[int] = None,
+    batch_size: int = 256,
+) -> np.ndarray:
+    """
+    Draw sorted tau indices conditional on each regime-parameter draw.
+
+    Uses forward filtering over prefix-sum regime log-likelihoods and backward
+    sampling with the Gumbel-max trick, batched over posterior draws.
+    """
+    mu_samples = np.atleast_2d(np.asarray(mu_samples, dtype=float))
+    sigma_samples = np.atleast_2d(np.asarray(sigma_samples, dtype=float))
+    n_change_points = mu_samples.shape[1] - 1
+    prefix = _prefix_stats(_clean_returns(log_returns, n_change_points))
+    rng = np.random.default_rng(random_seed)
+    positions = np.arange(prefix.shape[1] - 2)
+
+    tau_samples = np.empty((len(mu_samples), n_change_points), dtype=np.int64)
+    for start in range(0, len(mu_samples), batch_size):
+        stop = start + batch_size
+        _, forward = _forward_messages(
+            prefix, mu_samples[start:stop], sigma_samples[start:stop]
+        )
+        n_batch, _, _, n_positions = forward.shape
+        # Sample the (tie run, location) state of the last tau, then walk back:
+        # inside a tie run the previous tau sits at the same location, after
+        # a run start it is drawn from the strictly earlier locations.
+        scores = forward[:, -1].reshape(n_batch, -1)
+        state = np.argmax(scores + rng.gumbel(size=scores.shape), axis=-1)
+        run, pos = np.divmod(state, n_positions)
+        tau_samples[start:stop, -1] = pos + 1
+        for k in range(n_change_points - 2, -1, -1):
+            masked = np.where(positions < pos[:, None, None], forward[:, k], -np.inf)
+            scores = masked.reshape(n_batch, -1)
+            drawn_run, drawn_pos = np.divmod(
+                np.argmax(scores + rng.gumbel(size=scores.shape), axis=-1), n_positions
+            )
+            tied = run > 0
+            run = np.where(tied, run - 1, drawn_run)
+            pos = np.where(tied, pos, drawn_pos)
+            tau_samples[start:stop, k] = pos + 1
+
+    return tau_samples
+
+
+def attach_tau_posterior(
+    trace: az.InferenceData,
+    log_returns: np.ndarray,
+    random_seed: Optional[int] = None,
+) -> az.InferenceData:
+    """Add a ``tau`` variable to a marginalized-model trace, in place."""
+    posterior = trace.posterior
+    n_chains = posterior.sizes["chain"]
+    n_draws = posterior.sizes["draw"]
+    n_regimes = posterior["mu_regimes"].shape[-1]
+    tau = sample_change_point_locations(
+        log_returns,
+        posterior["mu_regimes"].values.reshape(-1, n_regimes),
+        posterior["sigma_regimes"].values.reshape(-1, n_regimes),
+        random_seed=random_seed,
+    )
+    trace.posterior["tau"] = xr.DataArray(
+        tau.reshape(n_chains, n_draws, n_regimes - 1),
+        dims=("chain", "draw", "tau_dim_0"),
+        coords={"chain": posterior["chain"], "draw": posterior["draw"]},
+    )
+    return trace
+
+
+def fit_change_point_model(
+    log_returns: np.ndarray,
+    config: ModelConfig,
+    cores: Optional[int] = None,
+    previous: Optional[az.InferenceData] = None,
+) -> az.InferenceData:
+    """
+    Build the configured change-point model and sample it; ``tau`` is always in the posterior.
+
+    With ``config.warm_start`` and a ``previous`` posterior of the same
+    model, chains resume from its last draws with its mass matrix and step
+    size and only ``config.warm_start_tune`` tuning steps. A warm fit that
+    cannot start or fails the divergence/R-hat checks is redone cold. The
+    outcome is recorded in ``posterior.attrs["warm_start"]``.
+    """
+    seed_taus = None
+    if config.pelt_seed_margin > 0:
+        seed_taus = pelt_fixed_change_points(log_returns, config.n_change_points)
+    if config.marginalize_tau:
+        model = build_marginalized_change_point_model(
+            log_returns, config.n_change_points, initial_taus=seed_taus
+        )
+    else:
+        tau_bounds = None
+        if seed_taus is not None:
+            tau_bounds = tau_prior_bounds(seed_taus, len(log_returns), config.pelt_seed_margin)
+        model = build_change_point_model(log_returns, config.n_change_points, tau_bounds=tau_bounds)
+
+    warm = None
+    if config.warm_start and previous is not None:
+        warm = warm_start_sampler(model, previous, config.chains, config.target_accept)
+    outcome = "cold"
+    if warm is not None:
+        step, initvals = warm
+        try:
+            trace = run_mcmc(
+                model,
+                draws=config.draws,
+                tune=config.warm_start_tune,
+                chains=config.chains,
+                target_accept=config.target_accept,
+                cores=cores,
+                step=step,
+                initvals=initvals,
+            )
+        except SamplingError:
+            outcome = "warm-failed"
+        else:
+            outcome = "warm"
+            if not passes_convergence_checks(trace, ["mu_regimes", "sigma_regimes"]):
+                outcome = "warm-rejected"
+    if outcome != "warm":
+        trace = run_mcmc(
+            model,
+            draws=config.draws,
+            tune=config.tune,
+            chains=config.chains,
+            target_accept=config.target_accept,
+            # Jitter would push chains off the data-driven initvals.
+            init="adapt_diag" if config.marginalize_tau else "auto",
+            cores=cores,
+        )
+    trace.posterior.attrs["warm_start"] = outcome
+    if config.marginalize_tau:
+        attach_tau_posterior(trace, log_returns)
+    return trace
+
+
+def load_or_fit_change_point_model(
+    log_returns: np.ndarray,
+    config: ModelConfig,
+    cache: Optional[PosteriorCache] = None,
+    cores: Optional[int] = None,
+    previous: Optional[az.InferenceData] = None,
+) -> az.InferenceData:
+    """``fit_change_point_model`` behind a content-addressed posterior cache."""
+    if cache is None:
+        return fit_change_point_model(log_returns, config, cores=cores, previous=previous)
+    key = fit_cache_key(log_returns, config)
+    trace = cache.get(key)
+    if trace is None:
+        trace = fit_change_point_model(log_returns, config, cores=cores, previous=previous)
+        cache.put(
+            key,
+            trace,
+            {
+                "config": asdict(config),
+                "n_obs": int(np.count_nonzero(~np.isnan(log_returns))),
+                "code_version": model_code_version(),
+            },
+        )
+    return trace
+
+
+def add_pointwise_log_likelihood(
+    trace: az.InferenceData,
+    log_returns: np.ndarray,
+    batch_size: int = 256,
+) -> az.InferenceData:
+    """
+    Add ``log_likelihood["obs"]`` (per draw and observation) for LOO/WAIC, in place.
+
+    Evaluated from the sampled ``tau`` and regime parameters, so it works for
+    both engines (the marginalized model has no pointwise observed node).
+    """
+    posterior = trace.posterior
+    n_chains = posterior.sizes["chain"]
+    n_draws = posterior.sizes["draw"]
+    n_regimes = posterior["mu_regimes"].shape[-1]
+    clean_returns = _clean_returns(log_returns, n_regimes - 1)
+    tau = posterior["tau"].values.reshape(-1, n_regimes - 1)
+    mu = posterior["mu_regimes"].values.reshape(-1, n_regimes)
+    sigma = posterior["sigma_regimes"].values.reshape(-1, n_regimes)
+    t_index = np.arange(len(clean_returns))
+
+    loglik = np.empty((len(tau), len(clean_returns)), dtype=np.float32)
+    for start in range(0, len(tau), batch_size):
+        stop = start + batch_size
+        regime = (t_index[None, None, :] > tau[start:stop, :, None]).sum(axis=1)
+        mu_t = np.take_along_axis(mu[start:stop], regime, axis=1)
+        sigma_t = np.take_along_axis(sigma[start:stop], regime, axis=1)
+        loglik[start:stop] = (
+            -0.5 * ((clean_returns - mu_t) / sigma_t) ** 2
+            - np.log(sigma_t)
+            - 0.5 * np.log(2.0 * np.pi)
+        )
+    trace.add_groups(
+        log_likelihood={
+            "obs": xr.DataArray(
+                loglik.reshape(n_chains, n_draws, -1),
+                dims=("chain", "draw", "obs_dim_0"),
+                coords={"chain": posterior["chain"], "draw": posterior["draw"]},
+            )
+        }
+    )
+    return trace
+
+
+def summarize_change_point_trace(trace: az.InferenceData, dates: pd.Series) -> Dict[str, Any]:
+    """``summarize_change_points`` applied to a fitted trace."""
+    n_regimes = trace.posterior["mu_regimes"].shape[-1]
+    return summarize_change_points(
+        dates=dates,
+        tau_samples=trace.posterior["tau"].values.reshape(-1, n_regimes - 1),
+        mu_samples=trace.posterior["mu_regimes"].values.reshape(-1, n_regimes),
+        sigma_samples=trace.posterior["sigma_regimes"].values.reshape(-1, n_regimes),
+    )
+
+
 def run_change_point_pipeline(
     df: pd.DataFrame,
     config: Optional[ModelConfig] = None,
     posterior_path: str = MODEL_V2_POSTERIOR_PATH,
     results_path: str = CHANGE_POINT_RESULTS_PATH,
+    use_cache: bool = True,
+    cores: Optional[int] = None,
 ) -> Dict[str, Any]:
-    """Train model, persist posterior, and write structured results JSON."""
+    """
+    Train model, persist posterior, and write structured results JSON.
+
+    With ``use_cache`` an unchanged series, config and model code reuse the
+    cached posterior instead of resampling; the summary is kept alongside it.
+    ``cores`` caps the sampler's processes (default: one per chain).
+    """
     cfg = config or load_model_config()
-    model = build_change_point_model(df["log_return"].dropna().to_numpy(), cfg.n_change_points)
-    trace = run_mcmc(
-        model,
-        draws=cfg.draws,
-        tune=cfg.tune,
-        chains=cfg.chains,
-        target_accept=cfg.target_accept,
+    log_returns = df["log_return"].dropna().to_numpy()
+    dates = df["Date"].reset_index(drop=True)
+    cache = PosteriorCache() if use_cache else None
+    if cache is not None:
+        key = fit_cache_key(log_returns, cfg)
+        cached = cache.lookup(key)
+        if cached is not None and cached.get("dates_digest") == dates_digest(dates):
+            cache.copy_to(key, posterior_path)
+            write_json(cached["summary"], results_path)
+            return cached["summary"]
+
+    previous = None
+    if cfg.warm_start and Path(posterior_path).exists():
+        previous = load_posterior(posterior_path)
+    trace = load_or_fit_change_point_model(
+        log_returns, cfg, cache=cache, cores=cores, previous=previous
     )
     save_inference_data(trace, posterior_path)
 
-    tau_samples = trace.posterior["tau"].values.reshape(-1, cfg.n_change_points)
-    mu_samples = trace.posterior["mu_regimes"].values.reshape(-1, cfg.n_change_points + 1)
-    sigma_samples = trace.posterior["sigma_regimes"].values.reshape(-1, cfg.n_change_points + 1)
-
-    summary = summarize_change_points(
-        dates=df["Date"].reset_index(drop=True),
-        tau_samples=tau_samples,
-        mu_samples=mu_samples,
-        sigma_samples=sigma_samples,
-    )
+    summary = summarize_change_point_trace(trace, dates)
+    if cache is not None:
+        cache.annotate(key, {"dates_digest": dates_digest(dates), "summary": summary})
     write_json(summary, results_path)
     return summary
 
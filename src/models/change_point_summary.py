@@ -0,0 +1,193 @@
+"""PyMC-free change-point report helpers shared by the Bayesian, PELT and online models."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.constants import CHANGE_POINT_RESULTS_PATH, DEFAULT_HDI_PROB
+
+
+def write_json(payload: Dict[str, Any], path: str = CHANGE_POINT_RESULTS_PATH) -> Path:
+    """Write JSON report to disk."""
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2)
+    return output
+
+
+def hdi_bounds(
+    samples: np.ndarray,
+    hdi_prob: float = DEFAULT_HDI_PROB,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Narrowest ``hdi_prob`` interval of every column of ``samples`` (draws on axis 0)."""
+    ordered = np.sort(np.asarray(samples, dtype=float), axis=0)
+    n_draws = ordered.shape[0]
+    width = int(np.floor(hdi_prob * n_draws))
+    widths = ordered[width:] - ordered[: n_draws - width]
+    start = np.argmin(widths, axis=0)[None]
+    lower = np.take_along_axis(ordered, start, axis=0)[0]
+    upper = np.take_along_axis(ordered, start + width, axis=0)[0]
+    return lower, upper
+
+
+def _posterior_mass(
+    flat_index: np.ndarray,
+    n_dates: int,
+    n_draws: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sparse (group, date index, probability) counts of ``group * n_dates + date`` samples."""
+    keys, counts = np.unique(flat_index, return_counts=True)
+    return keys // n_dates, keys % n_dates, counts / n_draws
+
+
+def summarize_change_points(
+    dates: pd.Series,
+    tau_samples: np.ndarray,
+    mu_samples: np.ndarray,
+    sigma_samples: np.ndarray,
+    hdi_prob: float = DEFAULT_HDI_PROB,
+    date_index: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """
+    Build structured JSON output for multi-change-point analysis.
+
+    Samples have draws on the first axis. Point locations are the median
+    taus as before; each change point also carries its posterior mean, HDI
+    and probability mass per date, and regimes and transitions carry HDIs of
+    the per-draw parameters and shifts. Everything is computed for all
+    change points at once.
+
+    ``date_index`` gives the sorted positions of ``dates`` in the full series
+    when only the referenced dates are passed (the first, the last and every
+    sampled tau); by default ``dates`` is the full series.
+    """
+    date_values = pd.to_datetime(dates).reset_index(drop=True)
+    positions = None if date_index is None else np.asarray(date_index, dtype=np.int64)
+    n_dates = len(date_values) if positions is None else int(positions[-1]) + 1
+    taus = np.asarray(tau_samples, dtype=np.int64)
+    taus = np.sort(np.clip(taus.reshape(len(taus), -1), 0, n_dates - 1), axis=1)
+    n_draws, n_cps = taus.shape
+    mu = np.asarray(mu_samples, dtype=float).reshape(n_draws, n_cps + 1)
+    sigma = np.asarray(sigma_samples, dtype=float).reshape(n_draws, n_cps + 1)
+
+    def labels(index: np.ndarray) -> List[str]:
+        rows = np.asarray(index, dtype=np.int64)
+        if positions is not None:
+            rows = np.searchsorted(positions, rows)
+        return date_values.iloc[rows].dt.strftime("%Y-%m-%d").tolist()
+
+    tau_index = np.median(taus, axis=0).astype(np.int64)
+    tau_lower, tau_upper = hdi_bounds(taus, hdi_prob)
+    cp_group, cp_date, cp_prob = _posterior_mass(
+        (taus + n_dates * np.arange(n_cps)).ravel(), n_dates, n_draws
+    )
+    cp_splits = np.searchsorted(cp_group, np.arange(1, n_cps))
+    cp_labels = labels(cp_date)
+    # A date counts once per draw even if several change points land on it.
+    distinct = np.ones_like(taus, dtype=bool)
+    distinct[:, 1:] = taus[:, 1:] != taus[:, :-1]
+    _, any_date, any_prob = _posterior_mass(taus[distinct], n_dates, n_draws)
+
+    tau_dates = labels(tau_index)
+    tau_means = taus.mean(axis=0)
+    lower_dates = labels(tau_lower)
+    upper_dates = labels(tau_upper)
+    mass_rows = np.split(np.arange(len(cp_date)), cp_splits)
+    change_points: List[Dict[str, Any]] = []
+    for idx in range(n_cps):
+        change_points.append(
+            {
+                "name": f"cp_{idx + 1}",
+                "tau_index": int(tau_index[idx]),
+                "tau_date": tau_dates[idx],
+                "posterior_mean": float(tau_means[idx]),
+                "hdi_lower": int(tau_lower[idx]),
+                "hdi_upper": int(tau_upper[idx]),
+                "hdi_lower_date": lower_dates[idx],
+                "hdi_upper_date": upper_dates[idx],
+                "posterior_mass": [
+                    {"date": cp_labels[row], "probability": float(cp_prob[row])}
+                    for row in mass_rows[idx]
+                ],
+            }
+        )
+
+    boundaries = np.concatenate([[0], tau_index, [n_dates - 1]])
+    durations = np.maximum(1, np.diff(boundaries) + 1)
+    draw_bounds = np.concatenate(
+        [np.zeros((n_draws, 1), dtype=np.int64), taus, np.full((n_draws, 1), n_dates - 1)], axis=1
+    )
+    expected_durations = np.maximum(1, np.diff(draw_bounds, axis=1) + 1).mean(axis=0)
+    mu_mean = mu.mean(axis=0)
+    sigma_mean = sigma.mean(axis=0)
+    mu_lower, mu_upper = hdi_bounds(mu, hdi_prob)
+    sigma_lower, sigma_upper = hdi_bounds(sigma, hdi_prob)
+
+    start_dates = labels(boundaries[:-1])
+    end_dates = labels(boundaries[1:])
+    regimes: List[Dict[str, Any]] = []
+    for idx in range(n_cps + 1):
+        regimes.append(
+            {
+                "name": f"regime_{idx + 1}",
+                "start_date": start_dates[idx],
+                "end_date": end_dates[idx],
+                "duration": int(durations[idx]),
+                "expected_duration": float(expected_durations[idx]),
+                "mu": float(mu_mean[idx]),
+                "sigma": float(sigma_mean[idx]),
+                "mu_hdi": [float(mu_lower[idx]), float(mu_upper[idx])],
+                "sigma_hdi": [float(sigma_lower[idx]), float(sigma_upper[idx])],
+            }
+        )
+
+    mean_shift_draws = np.diff(mu, axis=1)
+    volatility_shift_draws = np.diff(sigma, axis=1)
+    mean_shift = np.diff(mu_mean)
+    before_mu = np.abs(mu_mean[:-1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift_percent = np.where(before_mu != 0, mean_shift / before_mu * 100.0, np.nan)
+    shift_lower, shift_upper = hdi_bounds(mean_shift_draws, hdi_prob)
+    vol_lower, vol_upper = hdi_bounds(volatility_shift_draws, hdi_prob)
+    prob_mean_up = (mean_shift_draws > 0).mean(axis=0)
+    prob_vol_up = (volatility_shift_draws > 0).mean(axis=0)
+
+    business_impact: List[Dict[str, Any]] = []
+    for idx in range(n_cps):
+        before = regimes[idx]
+        after = regimes[idx + 1]
+        business_impact.append(
+            {
+                "transition": f"{before['name']} -> {after['name']}",
+                "mean_shift": float(mean_shift[idx]),
+                "mean_shift_percent": (
+                    None if np.isnan(shift_percent[idx]) else float(shift_percent[idx])
+                ),
+                "volatility_shift": float(sigma_mean[idx + 1] - sigma_mean[idx]),
+                "mean_shift_hdi": [float(shift_lower[idx]), float(shift_upper[idx])],
+                "volatility_shift_hdi": [float(vol_lower[idx]), float(vol_upper[idx])],
+                "prob_mean_increase": float(prob_mean_up[idx]),
+                "prob_volatility_increase": float(prob_vol_up[idx]),
+                "duration_before": before["duration"],
+                "duration_after": after["duration"],
+            }
+        )
+
+    return {
+        "n_change_points": len(change_points),
+        "n_draws": int(n_draws),
+        "hdi_prob": hdi_prob,
+        "change_points": change_points,
+        "change_point_probability": [
+            {"date": date, "probability": float(prob)}
+            for date, prob in zip(labels(any_date), any_prob)
+        ],
+        "regimes": regimes,
+        "business_impact": business_impact,
+    }
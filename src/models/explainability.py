@@ -1,24 +1,68 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import importlib
+import importlib.util
+import multiprocessing
+import os
 from pathlib import Path
-from typing import Dict, Optional
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
 import warnings
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
-from src.constants import SHAP_GLOBAL_PNG, SHAP_LOCAL_PNG
+from src.constants import (
+    DEFAULT_SHAP_BACKGROUND_SIZE,
+    DEFAULT_SHAP_METHOD,
+    DEFAULT_SHAP_SAMPLE_SIZE,
+    SHAP_GLOBAL_PNG,
+    SHAP_LOCAL_PNG,
+)
 
-try:
-    import shap  # type: ignore
-except ImportError:  # pragma: no cover
-    shap = None  # type: ignore
+SHAP_FEATURES: Tuple[str, ...] = ("GDP", "Inflation", "ExchangeRate")
+SHAP_METHODS: Tuple[str, ...] = ("exact", "parallel", "approximate")
 
-try:
-    from sklearn.ensemble import RandomForestRegressor
-except ImportError:  # pragma: no cover
-    RandomForestRegressor = None  # type: ignore
+
+@dataclass
+class ShapExplanation:
+    """Per-row feature attributions of log returns to the macro features."""
+
+    dates: np.ndarray
+    features: np.ndarray
+    values: np.ndarray
+    feature_names: Tuple[str, ...]
+    base_value: float
+    global_importance: np.ndarray
+    mode: str
+    model: Any = None
+    diagnostics: Dict[str, Any] = field(default_factory=dict)
+
+    def row_for_date(self, selected_date: Optional[str] = None) -> int:
+        """Row of ``selected_date``; the latest row when absent or not found."""
+        if selected_date is not None:
+            target = pd.to_datetime(selected_date, errors="coerce")
+            if not pd.isna(target):
+                target = np.datetime64(target, "ns")
+                row = int(np.searchsorted(self.dates, target))
+                if row < len(self.dates) and self.dates[row] == target:
+                    return row
+        return len(self.dates) - 1
+
+
+def _optional_import(name: str) -> Any:
+    """
+    ``name`` imported on first use, ``None`` when it is not installed.
+
+    shap, scikit-learn and matplotlib take seconds to import, so they are only
+    loaded by the code paths that explain or plot, not by importing this module.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:  # pragma: no cover
+        return None
 
 
 def _ensure_output(path: str) -> Path:
@@ -27,94 +71,311 @@ def _ensure_output(path: str) -> Path:
     return out
 
 
-def run_shap_analysis(
+def stratified_rows(n_rows: int, size: int, seed: int = 42) -> np.ndarray:
+    """
+    ``size`` sorted row positions, one drawn uniformly from each of ``size`` equal time strata.
+
+    Every period of the (date-sorted) history is represented, unlike a plain
+    random sample that can leave whole regimes out.
+    """
+    if size >= n_rows:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(seed)
+    return np.floor((np.arange(size) + rng.random(size)) * n_rows / size).astype(np.int64)
+
+
+_worker_explainer: Any = None
+
+
+def _init_shap_worker(model: Any) -> None:
+    global _worker_explainer
+    _worker_explainer = importlib.import_module("shap").TreeExplainer(model)
+
+
+def _explain_chunk(chunk: np.ndarray) -> np.ndarray:
+    return np.asarray(_worker_explainer.shap_values(chunk), dtype=float)
+
+
+def _parallel_shap_values(
+    explainer: Any, model: Any, x: np.ndarray, n_jobs: Optional[int]
+) -> np.ndarray:
+    """``explainer``'s exact values, computed in row chunks over a process pool."""
+    n_workers = max(1, min(n_jobs or os.cpu_count() or 1, len(x)))
+    if n_workers == 1:
+        return np.asarray(explainer.shap_values(x), dtype=float)
+    # A few chunks per worker keeps the pool busy when chunks run unevenly.
+    chunks = np.array_split(x, n_workers * 4)
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_shap_worker,
+        initargs=(model,),
+    ) as pool:
+        return np.vstack(list(pool.map(_explain_chunk, chunks)))
+
+
+def explain_macro_drivers(
     df: pd.DataFrame,
-    global_path: str = SHAP_GLOBAL_PNG,
-    local_path: str = SHAP_LOCAL_PNG,
-    selected_date: Optional[str] = None,
-) -> Dict[str, str]:
+    method: str = DEFAULT_SHAP_METHOD,
+    n_jobs: Optional[int] = None,
+    sample_size: int = DEFAULT_SHAP_SAMPLE_SIZE,
+    background_size: int = DEFAULT_SHAP_BACKGROUND_SIZE,
+) -> ShapExplanation:
     """
-    Compute SHAP explanations over macro features.
-    Falls back to model feature importances when SHAP is unavailable.
+    Fit the macro-feature model once and attribute its rows.
+
+    ``method`` picks how SHAP values are computed:
+
+    - ``exact``: path-dependent TreeExplainer over every row, in this process.
+    - ``parallel``: the same values, with rows split into chunks over ``n_jobs``
+      spawned processes (default: all cores).
+    - ``approximate``: only ``sample_size`` stratified rows are explained,
+      with interventional TreeExplainer against ``background_size`` stratified
+      background rows. The returned rows are that sample.
+
+    Without SHAP the values fall back to centred features scaled by the
+    model's feature importances (or by the absolute correlation with the
+    target when scikit-learn is missing too). ``diagnostics`` records the
+    method, the rows explained and the seconds spent explaining.
     """
-    data = df[["Date", "GDP", "Inflation", "ExchangeRate", "log_return"]].dropna().copy()
-    x = data[["GDP", "Inflation", "ExchangeRate"]]
+    if method not in SHAP_METHODS:
+        raise ValueError(f"Unknown SHAP method '{method}'")
+    data = df[["Date", *SHAP_FEATURES, "log_return"]].dropna().sort_values("Date")
+    x = data[list(SHAP_FEATURES)]
     y = data["log_return"]
+    shap = _optional_import("shap")
+    ensemble = _optional_import("sklearn.ensemble")
 
-    if RandomForestRegressor is not None:
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
+    if ensemble is not None:
+        model = ensemble.RandomForestRegressor(n_estimators=100, random_state=42)
         model.fit(x, y)
     else:
         model = None
 
-    global_out = _ensure_output(global_path)
-    local_out = _ensure_output(local_path)
-
+    rows = np.arange(len(data))
+    started = time.perf_counter()
+    diagnostics: Dict[str, Any] = {"method": method}
     if shap is not None and model is not None:
-        explainer = shap.TreeExplainer(model)
-        shap_values = explainer.shap_values(x)
-
-        # Global plot
-        mean_abs = np.mean(np.abs(shap_values), axis=0)
-        plt.figure(figsize=(8, 4))
-        plt.bar(x.columns, mean_abs)
-        plt.title("Global SHAP Feature Importance")
-        plt.tight_layout()
-        plt.savefig(global_out, dpi=140)
-        plt.close()
-
-        # Local plot
-        if selected_date is not None:
-            target_date = pd.to_datetime(selected_date, errors="coerce")
-            row_idx = data.index[data["Date"] == target_date]
-            idx = int(row_idx[0]) if len(row_idx) > 0 else int(len(data) - 1)
+        if method == "approximate":
+            rows = stratified_rows(len(data), sample_size)
+            background = x.values[stratified_rows(len(data), background_size, seed=7)]
+            explainer = shap.TreeExplainer(
+                model, data=background, feature_perturbation="interventional"
+            )
+            values = np.asarray(
+                explainer.shap_values(x.values[rows], check_additivity=False), dtype=float
+            )
+            diagnostics.update(sample_size=len(rows), background_size=len(background))
+        elif method == "parallel":
+            explainer = shap.TreeExplainer(model)
+            values = _parallel_shap_values(explainer, model, x.values, n_jobs)
+            diagnostics["n_jobs"] = n_jobs or os.cpu_count() or 1
         else:
-            idx = int(len(data) - 1)
-        local_vals = shap_values[idx]
-        plt.figure(figsize=(8, 4))
-        colors = ["#2E8B57" if val >= 0 else "#B22222" for val in local_vals]
-        plt.bar(x.columns, local_vals, color=colors)
-        plt.title("Local SHAP Explanation")
-        plt.tight_layout()
-        plt.savefig(local_out, dpi=140)
-        plt.close()
+            explainer = shap.TreeExplainer(model)
+            values = np.asarray(explainer.shap_values(x.values), dtype=float)
+        base_value = float(np.ravel(explainer.expected_value)[0])
+        importance = np.mean(np.abs(values), axis=0)
+        mode = "full"
     else:
-        warnings.warn(
-            "Full SHAP unavailable. Using fallback explainability mode.",
-            RuntimeWarning,
-        )
-        # Degraded mode: still provide explainability artifacts for dashboard/CI.
         if model is not None and hasattr(model, "feature_importances_"):
-            importances = model.feature_importances_
+            importance = np.asarray(model.feature_importances_, dtype=float)
         else:
             # Pure-numpy fallback importance: absolute correlation to target.
             corr = np.nan_to_num(np.corrcoef(np.column_stack([x.values.T, y.values]))[-1, :-1])
-            importances = np.abs(corr)
-        plt.figure(figsize=(8, 4))
-        plt.bar(x.columns, importances)
-        plt.title("Global Feature Importance (Fallback)")
-        plt.tight_layout()
-        plt.savefig(global_out, dpi=140)
-        plt.close()
-
-        sample = x.iloc[-1]
-        centered = sample - x.mean()
-        signed = centered.values * importances
-        plt.figure(figsize=(8, 4))
-        colors = ["#2E8B57" if val >= 0 else "#B22222" for val in signed]
-        plt.bar(x.columns, signed, color=colors)
-        plt.title("Local Explanation (Fallback)")
-        plt.tight_layout()
-        plt.savefig(local_out, dpi=140)
-        plt.close()
+            importance = np.abs(corr)
+        values = (x.values - x.values.mean(axis=0)) * importance
+        base_value = float(y.mean())
+        mode = "fallback"
+    diagnostics.update(rows_explained=len(rows), seconds=time.perf_counter() - started)
+
+    return ShapExplanation(
+        dates=data["Date"].to_numpy(dtype="datetime64[ns]")[rows],
+        features=x.to_numpy(dtype=float)[rows],
+        values=values,
+        feature_names=SHAP_FEATURES,
+        base_value=base_value,
+        global_importance=importance,
+        mode=mode,
+        model=model,
+        diagnostics=diagnostics,
+    )
+
+
+def compare_shap_methods(
+    df: pd.DataFrame,
+    methods: Sequence[str] = ("parallel", "approximate"),
+    **options: Any,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Time each of ``methods`` against ``exact`` and measure how far its values drift.
+
+    For every method: seconds, speed-up over exact, the max and mean absolute
+    error of the local values on the rows it explained, the relative L1 error
+    of the global importance and whether the feature ranking is unchanged.
+    """
+    exact = explain_macro_drivers(df, method="exact")
+    exact_seconds = exact.diagnostics["seconds"]
+    exact_rank = np.argsort(-exact.global_importance)
+    report: Dict[str, Dict[str, Any]] = {"exact": dict(exact.diagnostics)}
+    for method in methods:
+        result = explain_macro_drivers(df, method=method, **options)
+        rows = np.searchsorted(exact.dates, result.dates)
+        error = np.abs(result.values - exact.values[rows])
+        seconds = result.diagnostics["seconds"]
+        report[method] = {
+            **result.diagnostics,
+            "speedup": exact_seconds / seconds if seconds else None,
+            "max_abs_error": float(error.max()) if error.size else 0.0,
+            "mean_abs_error": float(error.mean()) if error.size else 0.0,
+            "global_importance_rel_error": float(
+                np.abs(result.global_importance - exact.global_importance).sum()
+                / max(exact.global_importance.sum(), np.finfo(float).tiny)
+            ),
+            "same_feature_ranking": bool(
+                np.array_equal(np.argsort(-result.global_importance), exact_rank)
+            ),
+        }
+    return report
+
+
+def bar_chart_data(
+    names: Sequence[str], heights: Any, title: str, signed: bool = False
+) -> Dict[str, Any]:
+    """Plot-ready bar chart: everything the frontend needs to draw it, as plain JSON values."""
+    return {
+        "kind": "bar",
+        "title": title,
+        "labels": list(names),
+        "values": [float(value) for value in np.asarray(heights, dtype=float)],
+        "signed": signed,
+    }
+
+
+def render_bar_chart(chart: Dict[str, Any], path: str) -> Path:
+    """Render ``bar_chart_data`` output to a PNG with matplotlib's object-oriented Agg API."""
+    # Figure + Agg canvas, never pyplot: no global state, safe in threaded workers.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    out = _ensure_output(path)
+    fig = Figure(figsize=(8, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    values = chart["values"]
+    colors = ["#2E8B57" if val >= 0 else "#B22222" for val in values] if chart["signed"] else None
+    ax.bar(chart["labels"], values, color=colors)
+    ax.set_title(chart["title"])
+    fig.tight_layout()
+    fig.savefig(out, dpi=140)
+    return out
 
+
+def global_importance_data(explanation: ShapExplanation) -> Dict[str, Any]:
+    title = (
+        "Global SHAP Feature Importance"
+        if explanation.mode == "full"
+        else "Global Feature Importance (Fallback)"
+    )
+    return bar_chart_data(explanation.feature_names, explanation.global_importance, title)
+
+
+def local_explanation_data(explanation: ShapExplanation, row: int) -> Dict[str, Any]:
+    title = "Local SHAP Explanation" if explanation.mode == "full" else "Local Explanation (Fallback)"
+    chart = bar_chart_data(explanation.feature_names, explanation.values[row], title, signed=True)
+    chart["date"] = str(np.datetime_as_string(explanation.dates[row], unit="D"))
+    chart["base_value"] = explanation.base_value
+    return chart
+
+
+def plot_global_importance(explanation: ShapExplanation, path: str) -> Path:
+    return render_bar_chart(global_importance_data(explanation), path)
+
+
+def plot_local_explanation(explanation: ShapExplanation, row: int, path: str) -> Path:
+    return render_bar_chart(local_explanation_data(explanation, row), path)
+
+
+def run_shap_analysis(
+    df: pd.DataFrame,
+    global_path: str = SHAP_GLOBAL_PNG,
+    local_path: str = SHAP_LOCAL_PNG,
+    selected_date: Optional[str] = None,
+    method: str = DEFAULT_SHAP_METHOD,
+    n_jobs: Optional[int] = None,
+    sample_size: int = DEFAULT_SHAP_SAMPLE_SIZE,
+    background_size: int = DEFAULT_SHAP_BACKGROUND_SIZE,
+    render: bool = True,
+) -> Dict[str, Any]:
+    """
+    Compute SHAP explanations over macro features.
+    Falls back to model feature importances when SHAP is unavailable.
+    The method options are passed to ``explain_macro_drivers``.
+
+    With ``render=False`` nothing is drawn: the plot-ready ``global`` and
+    ``local`` bar chart payloads are returned instead of PNG paths.
+    """
+    explanation = explain_macro_drivers(
+        df,
+        method=method,
+        n_jobs=n_jobs,
+        sample_size=sample_size,
+        background_size=background_size,
+    )
+    if explanation.mode != "full":
+        warnings.warn(
+            "Full SHAP unavailable. Using fallback explainability mode.",
+            RuntimeWarning,
+        )
+    global_chart = global_importance_data(explanation)
+    local_chart = local_explanation_data(explanation, explanation.row_for_date(selected_date))
+    if not render:
+        return {"global": global_chart, "local": local_chart}
+    global_out = render_bar_chart(global_chart, global_path)
+    local_out = render_bar_chart(local_chart, local_path)
     return {"global_plot": str(global_out), "local_plot": str(local_out)}
 
 
 def shap_runtime_status() -> Dict[str, object]:
-    """Return SHAP runtime availability and active mode."""
-    shap_available = shap is not None and RandomForestRegressor is not None
+    """Return SHAP runtime availability and active mode (without importing SHAP)."""
+    shap_available = all(
+        importlib.util.find_spec(name) is not None for name in ("shap", "sklearn")
+    )
     return {
         "shap_available": bool(shap_available),
         "mode": "full" if shap_available else "fallback",
     }
+
+
+def main() -> None:
+    import argparse
+
+    from src.constants import PROCESSED_PRICES_PATH
+    from src.data.load_data import load_prices
+    from src.data.macro_loader import load_macro_data
+
+    parser = argparse.ArgumentParser(description="Time SHAP computation modes against exact.")
+    parser.add_argument("--data", default=PROCESSED_PRICES_PATH)
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--sample-size", type=int, default=DEFAULT_SHAP_SAMPLE_SIZE)
+    parser.add_argument("--background-size", type=int, default=DEFAULT_SHAP_BACKGROUND_SIZE)
+    args = parser.parse_args()
+
+    report = compare_shap_methods(
+        load_macro_data(load_prices(args.data)),
+        n_jobs=args.n_jobs,
+        sample_size=args.sample_size,
+        background_size=args.background_size,
+    )
+    for method, result in report.items():
+        line = f"{method:<12} {result['rows_explained']:>6} rows  {result['seconds']:.2f}s"
+        if "speedup" in result:
+            line += (
+                f"  x{result['speedup'] or 0:.1f}  max|err|={result['max_abs_error']:.2e}"
+                f"  importance err={result['global_importance_rel_error']:.1%}"
+                f"  same ranking={result['same_feature_ranking']}"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
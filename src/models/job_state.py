@@ -0,0 +1,174 @@
+"""Background job status kept in a file, so every server process sees the same job."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import socket
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+try:  # POSIX only; the Windows dev server runs a single process.
+    import fcntl
+except ImportError:  # pragma: no cover - exercised on Windows
+    fcntl = None
+
+# Statuses of a job that is still waiting or running.
+ACTIVE_STATUSES = ("queued", "running")
+
+# Fields that identify the owning process; kept in the file, not reported.
+_OWNER_FIELDS = ("pid", "host")
+
+# A marker still empty after this long was left by a process that died creating it.
+_EMPTY_MARKER_GRACE_S = 60.0
+
+_local_lock = threading.Lock()
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobMarker:
+    """
+    The status of one background job, as a JSON file shared by all processes.
+
+    ``claim`` creates the file with ``O_CREAT | O_EXCL``, so when several
+    workers claim the same job exactly one of them wins and runs it; the
+    others get the winner's status. The owner records progress with
+    ``update`` (atomic replace). A finished job (a status listed in
+    ``replace``), or an active one whose process has died, may be claimed
+    again; that takeover is serialized by a lock file next to the marker.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """The job's status, or None when no job was ever claimed."""
+        state = self._read()
+        return None if state is None else self._public(state)
+
+    def claim(self, replace: Sequence[str] = ()) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Create the job as ``queued``; return ``(claimed, status)``.
+
+        ``claimed`` is True only for the caller that must run the job. An
+        existing job is left alone unless its status is in ``replace`` or
+        its owner process is gone.
+        """
+        state = self._create()
+        if state is not None:
+            return True, self._public(state)
+        with self._takeover_lock():
+            current = self._read()
+            if current is None or current["status"] in replace or self._orphaned(current):
+                self.discard()
+                state = self._create()
+                if state is not None:
+                    return True, self._public(state)
+                current = self._read()
+        return False, self._public(current or {"status": "queued"})
+
+    def update(self, **fields: Any) -> Dict[str, Any]:
+        """Record the owner's progress (``status``, timestamps, ``error``)."""
+        state = self._read() or {}
+        state.update(fields)
+        partial = self.path.with_name(
+            f"{self.path.name}.partial-{os.getpid()}-{threading.get_ident()}"
+        )
+        with partial.open("w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+        os.replace(partial, self.path)
+        return self._public(state)
+
+    def discard(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def remove(self) -> None:
+        """Delete the marker and its lock file, for a job that is no longer needed."""
+        self.discard()
+        try:
+            os.unlink(f"{self.path}.lock")
+        except FileNotFoundError:
+            pass
+
+    def _create(self) -> Optional[Dict[str, Any]]:
+        state = {
+            "status": "queued",
+            "submitted_at": utc_now(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return None
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+        return state
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                text = handle.read()
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(text)
+        except ValueError:
+            # Claimed a moment ago; the winner has not written the status yet.
+            return {"status": "queued", "empty": True}
+
+    def _orphaned(self, state: Dict[str, Any]) -> bool:
+        """Whether an active job's process died before finishing it."""
+        if state["status"] not in ACTIVE_STATUSES:
+            return False
+        if state.get("empty"):
+            try:
+                age = time.time() - self.path.stat().st_mtime
+            except FileNotFoundError:
+                return True
+            return age > _EMPTY_MARKER_GRACE_S
+        if os.name != "posix" or state.get("host") != socket.gethostname():
+            return False  # cannot tell; trust the owner
+        try:
+            os.kill(int(state["pid"]), 0)
+        except ProcessLookupError:
+            return True
+        except (PermissionError, KeyError, TypeError, ValueError):
+            return False
+        return False
+
+    @staticmethod
+    def _public(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: value
+            for key, value in state.items()
+            if key not in _OWNER_FIELDS and key != "empty"
+        }
+
+    @contextmanager
+    def _takeover_lock(self) -> Iterator[None]:
+        if fcntl is None:  # pragma: no cover - Windows
+            with _local_lock:
+                yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
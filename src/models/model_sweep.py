@@ -0,0 +1,193 @@
+"""Fit several change-point counts in parallel and rank them by LOO/WAIC."""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+import multiprocessing
+import os
+from pathlib import Path
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import arviz as az
+import numpy as np
+import pandas as pd
+
+from src.config import ModelConfig, load_model_config
+from src.constants import (
+    CHANGE_POINT_RESULTS_PATH,
+    CHANGE_POINT_SWEEP_PATH,
+    MODEL_V2_POSTERIOR_PATH,
+    MODEL_V2_SWEEP_DIR,
+    PROCESSED_PRICES_PATH,
+)
+from src.data.load_data import load_prices
+from src.models.bayesian_change_point import (
+    add_pointwise_log_likelihood,
+    load_or_fit_change_point_model,
+    summarize_change_point_trace,
+)
+from src.models.model_utils import save_inference_data, write_json
+from src.models.posterior_cache import PosteriorCache
+
+
+def plan_sweep_workers(n_models: int, chains: int, core_budget: int) -> Tuple[int, int]:
+    """
+    Split ``core_budget`` into (concurrent fits, sampler cores per fit).
+
+    Each fit gets as many cores as it has chains (capped by the budget), and
+    only as many fits run at once as fit in the remaining budget.
+    """
+    budget = max(1, int(core_budget))
+    cores_per_fit = max(1, min(chains, budget))
+    n_workers = max(1, min(n_models, budget // cores_per_fit))
+    return n_workers, cores_per_fit
+
+
+def _fit_one(
+    log_returns: np.ndarray,
+    dates: pd.Series,
+    config: ModelConfig,
+    cores: int,
+    posterior_path: str,
+    use_cache: bool,
+) -> Dict[str, Any]:
+    """Worker: fit one K, score it, and persist its posterior without the log-likelihood."""
+    start = time.perf_counter()
+    trace = load_or_fit_change_point_model(
+        log_returns, config, cache=PosteriorCache() if use_cache else None, cores=cores
+    )
+    add_pointwise_log_likelihood(trace, log_returns)
+    loo = az.loo(trace, pointwise=True)
+    waic = az.waic(trace, pointwise=True)
+    del trace.log_likelihood
+    save_inference_data(trace, posterior_path)
+    return {
+        "n_change_points": config.n_change_points,
+        "posterior_path": posterior_path,
+        "runtime_seconds": time.perf_counter() - start,
+        "loo": loo,
+        "waic": waic,
+        "summary": summarize_change_point_trace(trace, dates),
+    }
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def run_change_point_sweep(
+    df: pd.DataFrame,
+    n_change_points: Sequence[int],
+    config: Optional[ModelConfig] = None,
+    core_budget: Optional[int] = None,
+    sweep_dir: str = MODEL_V2_SWEEP_DIR,
+    report_path: str = CHANGE_POINT_SWEEP_PATH,
+    posterior_path: str = MODEL_V2_POSTERIOR_PATH,
+    results_path: Optional[str] = CHANGE_POINT_RESULTS_PATH,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Fit one model per entry of ``n_change_points`` and rank them by PSIS-LOO.
+
+    Fits run concurrently in a process pool sized by ``plan_sweep_workers`` so
+    that concurrent fits times PyMC's per-fit chain processes stay within
+    ``core_budget`` (default: all cores). The best model's posterior is copied
+    to ``posterior_path`` and its summary written to ``results_path``.
+    """
+    cfg = config or load_model_config()
+    counts = sorted({int(k) for k in n_change_points})
+    if not counts or counts[0] < 1:
+        raise ValueError("n_change_points must contain integers >= 1")
+    log_returns = df["log_return"].dropna().to_numpy()
+    dates = df["Date"].reset_index(drop=True)
+    n_workers, cores_per_fit = plan_sweep_workers(
+        len(counts), cfg.chains, core_budget or os.cpu_count() or 1
+    )
+
+    # Spawned workers do not inherit the parent's threads or compiled state.
+    with ProcessPoolExecutor(
+        max_workers=n_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = [
+            pool.submit(
+                _fit_one,
+                log_returns,
+                dates,
+                replace(cfg, n_change_points=k),
+                cores_per_fit,
+                str(Path(sweep_dir) / f"n_change_points_{k}.nc"),
+                use_cache,
+            )
+            for k in counts
+        ]
+        fits = {f"K={k}": future.result() for k, future in zip(counts, futures)}
+
+    comparison = az.compare({name: fit["loo"] for name, fit in fits.items()}, ic="loo")
+    models: List[Dict[str, Any]] = []
+    for name, row in comparison.iterrows():
+        fit = fits[name]
+        models.append(
+            {
+                "rank": int(row["rank"]),
+                "n_change_points": fit["n_change_points"],
+                "elpd_loo": float(row["elpd_loo"]),
+                "p_loo": float(row["p_loo"]),
+                "se": float(row["se"]),
+                "elpd_diff": float(row["elpd_diff"]),
+                "dse": float(row["dse"]),
+                "weight": float(row["weight"]),
+                "loo_warning": bool(row["warning"]),
+                "max_pareto_k": _optional_float(np.max(fit["loo"].pareto_k)),
+                "elpd_waic": float(fit["waic"].elpd_waic),
+                "p_waic": float(fit["waic"].p_waic),
+                "waic_warning": bool(fit["waic"].warning),
+                "runtime_seconds": fit["runtime_seconds"],
+                "posterior_path": fit["posterior_path"],
+                "change_points": fit["summary"]["change_points"],
+            }
+        )
+
+    best = fits[comparison.index[0]]
+    Path(posterior_path).parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(best["posterior_path"], posterior_path)
+    if results_path is not None:
+        write_json(best["summary"], results_path)
+
+    report = {
+        "best_n_change_points": best["n_change_points"],
+        "ic": "loo",
+        "workers": n_workers,
+        "cores_per_fit": cores_per_fit,
+        "models": models,
+    }
+    write_json(report, report_path)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-k", type=int, default=1)
+    parser.add_argument("--max-k", type=int, default=4)
+    parser.add_argument("--cores", type=int, default=None, help="Global core budget.")
+    parser.add_argument("--data", default=PROCESSED_PRICES_PATH)
+    args = parser.parse_args()
+
+    report = run_change_point_sweep(
+        load_prices(args.data),
+        range(args.min_k, args.max_k + 1),
+        core_budget=args.cores,
+    )
+    for model in report["models"]:
+        print(
+            f"#{model['rank']} K={model['n_change_points']}  elpd_loo={model['elpd_loo']:.1f}  "
+            f"weight={model['weight']:.2f}  {model['runtime_seconds']:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
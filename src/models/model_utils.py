@@ -1,15 +1,28 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import arviz as az
 import numpy as np
-import pandas as pd
 import pymc as pm
+from pymc.exceptions import SamplingError
+from pymc.initial_point import make_initial_point_fn
+from pymc.step_methods.hmc.quadpotential import QuadPotentialDiagAdapt
+import pytensor.tensor as pt
 
-from src.constants import CHANGE_POINT_RESULTS_PATH
+from src.constants import (
+    WARM_START_MASS_WEIGHT,
+    WARM_START_MAX_DIVERGENCE_RATE,
+    WARM_START_MAX_RHAT,
+)
+
+# Report helpers live in a PyMC-free module; re-exported for existing callers.
+from src.models.change_point_summary import (  # noqa: F401
+    hdi_bounds,
+    summarize_change_points,
+    write_json,
+)
 
 
 def run_mcmc(
@@ -18,100 +31,114 @@ def run_mcmc(
     tune: int,
     chains: int = 4,
     target_accept: float = 0.9,
+    init: str = "auto",
+    cores: Optional[int] = None,
+    step: Any = None,
+    initvals: Optional[Sequence[Dict[str, np.ndarray]]] = None,
 ) -> az.InferenceData:
     """Run PyMC sampling and return an ArviZ inference object."""
+    # A provided step already carries its target_accept; PyMC rejects it twice.
+    step_kwargs: Dict[str, Any] = (
+        {"step": step} if step is not None else {"target_accept": target_accept}
+    )
     with model:
         trace = pm.sample(
             draws=draws,
             tune=tune,
             chains=chains,
-            target_accept=target_accept,
+            cores=cores,
+            init=init,
+            initvals=initvals,
+            **step_kwargs,
             return_inferencedata=True,
             progressbar=False,
         )
     return trace
 
 
-def save_inference_data(trace: az.InferenceData, posterior_path: str) -> Path:
-    """Persist posterior netcdf to disk."""
-    output = Path(posterior_path)
-    output.parent.mkdir(parents=True, exist_ok=True)
-    az.to_netcdf(trace, output)
-    return output
-
-
-def write_json(payload: Dict[str, Any], path: str = CHANGE_POINT_RESULTS_PATH) -> Path:
-    """Write JSON report to disk."""
-    output = Path(path)
-    output.parent.mkdir(parents=True, exist_ok=True)
-    with output.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, indent=2)
-    return output
-
-
-def summarize_change_points(
-    dates: pd.Series,
-    tau_samples: np.ndarray,
-    mu_samples: np.ndarray,
-    sigma_samples: np.ndarray,
-) -> Dict[str, Any]:
-    """Build structured JSON output for multi-change-point analysis."""
-    date_values = pd.to_datetime(dates).reset_index(drop=True)
-    tau_medians = np.median(tau_samples, axis=0).astype(int).tolist()
-    tau_sorted = sorted(
-        max(0, min(len(date_values) - 1, int(tau_val))) for tau_val in tau_medians
+def warm_start_sampler(
+    model: pm.Model,
+    previous: az.InferenceData,
+    chains: int,
+    target_accept: float = 0.9,
+) -> Optional[Tuple[Any, List[Dict[str, np.ndarray]]]]:
+    """
+    NUTS step and per-chain initvals carried over from a previous posterior.
+
+    Chains start from the previous last draws, the diagonal mass matrix from
+    the variance of the previous draws in the unconstrained space, and the
+    step size from the previous adapted one. Returns ``None`` when the
+    previous posterior does not match the model's free variables, or when
+    its last draws lie outside this model's support (e.g. ``tau_raw``
+    outside PELT-derived bounds that moved with the new data).
+    """
+    posterior = previous.posterior
+    for rv in model.free_RVs:
+        if rv.name not in posterior or posterior[rv.name].shape[2:] != tuple(rv.shape.eval()):
+            return None
+
+    n_prev_chains = posterior.sizes["chain"]
+    initvals = [
+        {rv.name: posterior[rv.name].values[chain % n_prev_chains, -1] for rv in model.free_RVs}
+        for chain in range(chains)
+    ]
+    for chain_initvals in initvals:
+        start = make_initial_point_fn(
+            model=model, overrides=chain_initvals, jitter_rvs=set(), return_transformed=True
+        )(0)
+        try:
+            model.check_start_vals(start)
+        except SamplingError:
+            return None
+
+    blocks: List[np.ndarray] = []
+    for value_var in model.continuous_value_vars:
+        rv = model.values_to_rvs[value_var]
+        draws = posterior[rv.name].values
+        draws = draws.reshape((-1,) + draws.shape[2:])
+        transform = model.rvs_to_transforms.get(rv)
+        if transform is not None:
+            draws = transform.forward(pt.as_tensor_variable(draws), *rv.owner.inputs).eval()
+        blocks.append(np.asarray(draws, dtype=float).reshape(len(draws), -1))
+    unconstrained = np.concatenate(blocks, axis=1)
+    n_dims = unconstrained.shape[1]
+    potential = QuadPotentialDiagAdapt(
+        n_dims,
+        unconstrained.mean(axis=0),
+        np.maximum(unconstrained.var(axis=0), 1e-10),
+        WARM_START_MASS_WEIGHT,
     )
 
-    change_points: List[Dict[str, Any]] = []
-    for cp_idx, tau_idx in enumerate(tau_sorted, start=1):
-        change_points.append(
-            {
-                "name": f"cp_{cp_idx}",
-                "tau_index": tau_idx,
-                "tau_date": date_values.iloc[tau_idx].strftime("%Y-%m-%d"),
-            }
+    step_kwargs: Dict[str, Any] = {}
+    if "step_size" in previous.sample_stats:
+        step_size = float(np.nanmean(previous.sample_stats["step_size"].values[:, -1]))
+        if np.isfinite(step_size) and step_size > 0:
+            # NUTS divides step_scale by n ** 0.25.
+            step_kwargs["step_scale"] = step_size * n_dims**0.25
+    with model:
+        step = pm.NUTS(
+            vars=model.continuous_value_vars,
+            potential=potential,
+            target_accept=target_accept,
+            **step_kwargs,
         )
+    return step, initvals
 
-    mu_mean = np.mean(mu_samples, axis=0)
-    sigma_mean = np.mean(sigma_samples, axis=0)
-
-    regimes: List[Dict[str, Any]] = []
-    boundaries = [0] + tau_sorted + [len(date_values) - 1]
-    for regime_idx in range(len(boundaries) - 1):
-        start_idx = boundaries[regime_idx]
-        end_idx = boundaries[regime_idx + 1]
-        regimes.append(
-            {
-                "name": f"regime_{regime_idx + 1}",
-                "start_date": date_values.iloc[start_idx].strftime("%Y-%m-%d"),
-                "end_date": date_values.iloc[end_idx].strftime("%Y-%m-%d"),
-                "duration": int(max(1, end_idx - start_idx + 1)),
-                "mu": float(mu_mean[regime_idx]),
-                "sigma": float(sigma_mean[regime_idx]),
-            }
-        )
 
-    business_impact: List[Dict[str, Any]] = []
-    for idx in range(len(regimes) - 1):
-        before = regimes[idx]
-        after = regimes[idx + 1]
-        mean_shift = after["mu"] - before["mu"]
-        pct = (mean_shift / abs(before["mu"]) * 100.0) if before["mu"] != 0 else None
-        volatility_shift = after["sigma"] - before["sigma"]
-        business_impact.append(
-            {
-                "transition": f"{before['name']} -> {after['name']}",
-                "mean_shift": mean_shift,
-                "mean_shift_percent": pct,
-                "volatility_shift": volatility_shift,
-                "duration_before": before["duration"],
-                "duration_after": after["duration"],
-            }
-        )
+def passes_convergence_checks(trace: az.InferenceData, var_names: Sequence[str]) -> bool:
+    """Divergence-rate and R-hat gate used to accept a warm-started fit."""
+    diverging = trace.sample_stats["diverging"].values
+    if diverging.mean() > WARM_START_MAX_DIVERGENCE_RATE:
+        return False
+    if trace.posterior.sizes["chain"] < 2:
+        return True
+    rhat = az.rhat(trace, var_names=list(var_names)).to_array().values
+    return bool(np.nanmax(rhat) <= WARM_START_MAX_RHAT)
 
-    return {
-        "n_change_points": len(change_points),
-        "change_points": change_points,
-        "regimes": regimes,
-        "business_impact": business_impact,
-    }
+
+def save_inference_data(trace: az.InferenceData, posterior_path: str) -> Path:
+    """Persist posterior netcdf to disk."""
+    output = Path(posterior_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    az.to_netcdf(trace, output)
+    return output
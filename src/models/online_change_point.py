@@ -0,0 +1,514 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import io
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import gammaln
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    njit = None  # type: ignore
+
+from src.constants import (
+    CHANGE_POINT_RESULTS_PATH,
+    DEFAULT_BOCPD_HAZARD,
+    DEFAULT_BOCPD_MAX_RUN_LENGTH,
+    DEFAULT_BOCPD_MIN_REGIME,
+    ONLINE_CP_STATE_PATH,
+    PROCESSED_PRICES_PATH,
+)
+from src.data.preprocess import preprocess_prices
+from src.models.change_point_summary import summarize_change_points, write_json
+
+_HEAD_BYTES = 4096
+
+
+@dataclass
+class OnlineChangePointState:
+    """
+    Bayesian online change-point (BOCPD) state for a Normal-Gamma model.
+
+    The run-length posterior is truncated to ``max_run_length`` bins; the last
+    bin absorbs every longer run. Each bin also keeps the index and tau date
+    of its run's start. Next to it the state keeps the running MAP
+    segmentation: each segment's start index, tau date and sufficient
+    statistics (count, sum, sum of squares). Its size grows with the number
+    of segments, not with the history, and so does the cost of an update.
+    """
+
+    hazard: float
+    max_run_length: int
+    prior: np.ndarray  # mu0, kappa0, alpha0, beta0
+    log_probs: np.ndarray
+    params: np.ndarray  # (4, n_active): mu, kappa, alpha, beta per run length
+    run_start: np.ndarray
+    run_date: np.ndarray
+    segment_start: np.ndarray
+    segment_date: np.ndarray  # tau date of each segment; the first date for segment 0
+    segment_stats: np.ndarray  # (3, n_segments): count, sum, sum of squares
+    n_obs: int = 0
+    last_date: np.datetime64 = np.datetime64("NaT", "ns")
+    last_price: float = float("nan")
+    byte_offset: int = 0
+    head_digest: str = ""
+
+
+def init_online_state(
+    warmup_returns: np.ndarray,
+    start_date: Any,
+    hazard: float = DEFAULT_BOCPD_HAZARD,
+    max_run_length: int = DEFAULT_BOCPD_MAX_RUN_LENGTH,
+) -> OnlineChangePointState:
+    """
+    Empty state whose Normal-Gamma prior is scaled to the warm-up returns.
+
+    ``start_date`` is the date of the first price, the one before the first return.
+    """
+    warmup = np.asarray(warmup_returns, dtype=float)
+    warmup = warmup[~np.isnan(warmup)]
+    variance = float(np.var(warmup)) if len(warmup) > 1 else 1e-4
+    # alpha0 = 2 puts the prior mean of sigma**2 at beta0.
+    prior = np.array([0.0, 1.0, 2.0, max(variance, 1e-12)])
+    first_date = np.array([start_date], dtype="datetime64[ns]")
+    return OnlineChangePointState(
+        hazard=float(hazard),
+        max_run_length=int(max_run_length),
+        prior=prior,
+        log_probs=np.zeros(1),
+        params=prior[:, None].copy(),
+        run_start=np.zeros(1, dtype=np.int64),
+        run_date=first_date.copy(),
+        segment_start=np.zeros(1, dtype=np.int64),
+        segment_date=first_date.copy(),
+        segment_stats=np.zeros((3, 1)),
+        last_date=first_date[0],
+    )
+
+
+def _bocpd_numpy(
+    returns: np.ndarray,
+    tau_dates: np.ndarray,
+    log_probs: np.ndarray,
+    params: np.ndarray,
+    run_start: np.ndarray,
+    run_date: np.ndarray,
+    prior: np.ndarray,
+    offset: int,
+    hazard: float,
+    max_run_length: int,
+) -> Tuple[np.ndarray, ...]:
+    log_hazard = np.log(hazard)
+    log_survival = np.log1p(-hazard)
+    map_start = np.empty(len(returns), dtype=np.int64)
+    map_date = np.empty(len(returns), dtype=np.int64)
+    map_params = np.empty((4, len(returns)))
+    for step, value in enumerate(returns):
+        mu, kappa, alpha, beta = params
+        dof = 2.0 * alpha
+        scale2 = beta * (kappa + 1.0) / (alpha * kappa)
+        joint = log_probs + (
+            gammaln((dof + 1.0) / 2.0)
+            - gammaln(dof / 2.0)
+            - 0.5 * np.log(np.pi * dof * scale2)
+            - (dof + 1.0) / 2.0 * np.log1p((value - mu) ** 2 / (dof * scale2))
+        )
+        evidence = np.logaddexp.reduce(joint)
+        # Growth keeps (1 - h) of each run, a change moves h of the total
+        # mass to run length zero; dividing by the evidence normalizes.
+        log_probs = np.concatenate([[log_hazard], joint - evidence + log_survival])
+        updated = np.stack(
+            [
+                (kappa * mu + value) / (kappa + 1.0),
+                kappa + 1.0,
+                alpha + 0.5,
+                beta + kappa * (value - mu) ** 2 / (2.0 * (kappa + 1.0)),
+            ]
+        )
+        params = np.concatenate([prior[:, None], updated], axis=1)
+        run_start = np.concatenate([[offset + step + 1], run_start])
+        run_date = np.concatenate([[tau_dates[step]], run_date])
+        if len(log_probs) > max_run_length:
+            # Fold the two oldest runs into one bin that keeps the statistics
+            # of the more probable of the two.
+            if log_probs[-1] > log_probs[-2]:
+                params[:, -2] = params[:, -1]
+                run_start[-2] = run_start[-1]
+                run_date[-2] = run_date[-1]
+            log_probs[-2] = np.logaddexp(log_probs[-2], log_probs[-1])
+            log_probs, params = log_probs[:-1], params[:, :-1]
+            run_start, run_date = run_start[:-1], run_date[:-1]
+        best = int(np.argmax(log_probs))
+        map_start[step] = run_start[best]
+        map_date[step] = run_date[best]
+        map_params[:, step] = params[:, best]
+    return log_probs, params, run_start, run_date, map_start, map_date, map_params
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _bocpd_kernel(
+        returns: np.ndarray,
+        tau_dates: np.ndarray,
+        log_probs: np.ndarray,
+        params: np.ndarray,
+        run_start: np.ndarray,
+        run_date: np.ndarray,
+        prior: np.ndarray,
+        offset: int,
+        hazard: float,
+        max_run_length: int,
+    ) -> Tuple[np.ndarray, ...]:  # pragma: no cover - compiled
+        log_hazard = np.log(hazard)
+        log_survival = np.log1p(-hazard)
+        n_active = len(log_probs)
+        probs = np.empty(max_run_length + 1)
+        stats = np.empty((4, max_run_length + 1))
+        starts = np.empty(max_run_length + 1, dtype=np.int64)
+        start_dates = np.empty(max_run_length + 1, dtype=np.int64)
+        probs[:n_active] = log_probs
+        stats[:, :n_active] = params
+        starts[:n_active] = run_start
+        start_dates[:n_active] = run_date
+        map_start = np.empty(len(returns), dtype=np.int64)
+        map_date = np.empty(len(returns), dtype=np.int64)
+        map_params = np.empty((4, len(returns)))
+        for step in range(len(returns)):
+            value = returns[step]
+            peak = -np.inf
+            for idx in range(n_active):
+                mu, kappa, alpha, beta = stats[0, idx], stats[1, idx], stats[2, idx], stats[3, idx]
+                dof = 2.0 * alpha
+                scale2 = beta * (kappa + 1.0) / (alpha * kappa)
+                probs[idx] += (
+                    math.lgamma((dof + 1.0) / 2.0)
+                    - math.lgamma(dof / 2.0)
+                    - 0.5 * math.log(math.pi * dof * scale2)
+                    - (dof + 1.0) / 2.0 * math.log1p((value - mu) ** 2 / (dof * scale2))
+                )
+                peak = max(peak, probs[idx])
+            total = 0.0
+            for idx in range(n_active):
+                total += math.exp(probs[idx] - peak)
+            evidence = peak + math.log(total)
+            for idx in range(n_active - 1, -1, -1):
+                mu, kappa = stats[0, idx], stats[1, idx]
+                probs[idx + 1] = probs[idx] - evidence + log_survival
+                stats[0, idx + 1] = (kappa * mu + value) / (kappa + 1.0)
+                stats[1, idx + 1] = kappa + 1.0
+                stats[2, idx + 1] = stats[2, idx] + 0.5
+                stats[3, idx + 1] = stats[3, idx] + kappa * (value - mu) ** 2 / (2.0 * (kappa + 1.0))
+                starts[idx + 1] = starts[idx]
+                start_dates[idx + 1] = start_dates[idx]
+            probs[0] = log_hazard
+            stats[:, 0] = prior
+            starts[0] = offset + step + 1
+            start_dates[0] = tau_dates[step]
+            n_active += 1
+            if n_active > max_run_length:
+                last = n_active - 1
+                if probs[last] > probs[last - 1]:
+                    stats[:, last - 1] = stats[:, last]
+                    starts[last - 1] = starts[last]
+                    start_dates[last - 1] = start_dates[last]
+                high = max(probs[last], probs[last - 1])
+                probs[last - 1] = high + math.log(
+                    math.exp(probs[last] - high) + math.exp(probs[last - 1] - high)
+                )
+                n_active = last
+            best = np.argmax(probs[:n_active])
+            map_start[step] = starts[best]
+            map_date[step] = start_dates[best]
+            map_params[:, step] = stats[:, best]
+        return (
+            probs[:n_active].copy(),
+            stats[:, :n_active].copy(),
+            starts[:n_active].copy(),
+            start_dates[:n_active].copy(),
+            map_start,
+            map_date,
+            map_params,
+        )
+
+else:  # pragma: no cover
+    _bocpd_kernel = _bocpd_numpy
+
+
+def _run_statistics(params: np.ndarray, prior: np.ndarray) -> List[float]:
+    """Count, sum and sum of squares of the returns behind a run's Normal-Gamma posterior."""
+    mu, kappa, _, beta = params
+    mu0, kappa0, _, beta0 = prior
+    count = kappa - kappa0
+    total = kappa * mu - kappa0 * mu0
+    mean = total / count
+    squared_deviations = 2.0 * (beta - beta0) - kappa0 * count * (mean - mu0) ** 2 / kappa
+    return [float(count), float(total), float(squared_deviations + count * mean**2)]
+
+
+def _advance_segments(
+    state: OnlineChangePointState,
+    returns: np.ndarray,
+    map_start: np.ndarray,
+    map_date: np.ndarray,
+    map_params: np.ndarray,
+) -> None:
+    """
+    Follow the MAP run through the new returns, keeping per-segment statistics.
+
+    A MAP run that starts after the last segment's start splits it; the new
+    segment's statistics come from that run's posterior. One that starts
+    earlier merges the later segments back (the change was dropped).
+    """
+    starts = state.segment_start.tolist()
+    dates = state.segment_date.astype("datetime64[ns]").view(np.int64).tolist()
+    stats = state.segment_stats.T.tolist()
+    n_obs = state.n_obs
+    for step, value in enumerate(returns):
+        n_obs += 1
+        current = stats[-1]
+        current[0] += 1.0
+        current[1] += value
+        current[2] += value * value
+        start = int(map_start[step])
+        if start >= n_obs:
+            continue  # a run of length zero has no returns behind it yet
+        while starts[-1] > start:
+            merged = stats.pop()
+            starts.pop()
+            dates.pop()
+            stats[-1] = [left + right for left, right in zip(stats[-1], merged)]
+        if start > starts[-1]:
+            segment = _run_statistics(map_params[:, step], state.prior)
+            stats[-1] = [left - right for left, right in zip(stats[-1], segment)]
+            starts.append(start)
+            dates.append(int(map_date[step]))
+            stats.append(segment)
+    state.segment_start = np.asarray(starts, dtype=np.int64)
+    state.segment_date = np.asarray(dates, dtype=np.int64).view("datetime64[ns]")
+    state.segment_stats = np.asarray(stats, dtype=float).T.reshape(3, -1)
+
+
+def update_online_state(
+    state: OnlineChangePointState,
+    returns: np.ndarray,
+    dates: np.ndarray,
+) -> None:
+    """
+    Advance the state by ``returns`` in place (O(len(returns) * R)).
+
+    ``dates`` are the dates of the returns (of their closing prices).
+    """
+    returns = np.asarray(returns, dtype=float)
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    keep = ~np.isnan(returns)
+    returns, dates = returns[keep], dates[keep]
+    if not len(returns):
+        return
+    # A run starting at a return is dated by the price before it.
+    tau_dates = np.concatenate([[state.last_date], dates[:-1]]).astype("datetime64[ns]")
+    log_probs, params, run_start, run_date, map_start, map_date, map_params = _bocpd_kernel(
+        returns,
+        tau_dates.view(np.int64),
+        state.log_probs,
+        np.ascontiguousarray(state.params),
+        state.run_start,
+        state.run_date.astype("datetime64[ns]").view(np.int64),
+        state.prior,
+        state.n_obs,
+        state.hazard,
+        state.max_run_length,
+    )
+    state.log_probs, state.params, state.run_start = log_probs, params, run_start
+    state.run_date = run_date.view("datetime64[ns]")
+    _advance_segments(state, returns, map_start, map_date, map_params)
+    state.n_obs += len(returns)
+    state.last_date = dates[-1]
+
+
+def online_segments(
+    state: OnlineChangePointState,
+    min_regime_length: int = DEFAULT_BOCPD_MIN_REGIME,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The MAP segments as (start indices, tau dates, statistics), O(number of segments).
+
+    Segments shorter than ``min_regime_length`` (usually isolated outliers)
+    are folded into their predecessor.
+    """
+    starts = state.segment_start
+    kept = [0]
+    for idx in range(1, len(starts)):
+        if starts[idx] - starts[kept[-1]] >= min_regime_length:
+            kept.append(idx)
+    if len(kept) > 1 and state.n_obs - starts[kept[-1]] < min_regime_length:
+        kept.pop()
+    group = np.searchsorted(kept, np.arange(len(starts)), side="right") - 1
+    stats = np.stack(
+        [np.bincount(group, weights=row, minlength=len(kept)) for row in state.segment_stats]
+    )
+    return starts[kept], state.segment_date[kept], stats
+
+
+def summarize_online_state(
+    state: OnlineChangePointState,
+    min_regime_length: int = DEFAULT_BOCPD_MIN_REGIME,
+) -> Dict[str, Any]:
+    """Build the ``summarize_change_points`` report from the segment statistics."""
+    starts, dates, (counts, sums, sumsqs) = online_segments(state, min_regime_length)
+    mean = sums / counts
+    var = sumsqs / counts - mean**2
+    return summarize_change_points(
+        dates=pd.Series(np.append(dates, state.last_date)),
+        tau_samples=(starts[1:] - 1)[None, :],
+        mu_samples=mean[None, :],
+        sigma_samples=np.sqrt(np.maximum(var, 0.0))[None, :],
+        date_index=np.append(np.maximum(starts - 1, 0), state.n_obs),
+    )
+
+
+def save_online_state(state: OnlineChangePointState, path: str = ONLINE_CP_STATE_PATH) -> Path:
+    """Persist the state as an ``.npz`` archive."""
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("wb") as handle:
+        np.savez(
+            handle,
+            hazard=state.hazard,
+            max_run_length=state.max_run_length,
+            prior=state.prior,
+            log_probs=state.log_probs,
+            params=state.params,
+            run_start=state.run_start,
+            run_date=state.run_date.astype("datetime64[ns]").view(np.int64),
+            segment_start=state.segment_start,
+            segment_date=state.segment_date.astype("datetime64[ns]").view(np.int64),
+            segment_stats=state.segment_stats,
+            n_obs=state.n_obs,
+            last_date=np.datetime64(state.last_date, "ns").astype(np.int64),
+            last_price=state.last_price,
+            byte_offset=state.byte_offset,
+            head_digest=state.head_digest,
+        )
+    return output
+
+
+def load_online_state(path: str = ONLINE_CP_STATE_PATH) -> Optional[OnlineChangePointState]:
+    """Load a persisted state, or ``None`` when there is none (or it predates this layout)."""
+    state_path = Path(path)
+    if not state_path.exists():
+        return None
+    with np.load(state_path, allow_pickle=False) as data:
+        if "segment_stats" not in data:
+            return None
+        return OnlineChangePointState(
+            hazard=float(data["hazard"]),
+            max_run_length=int(data["max_run_length"]),
+            prior=data["prior"],
+            log_probs=data["log_probs"],
+            params=data["params"],
+            run_start=data["run_start"],
+            run_date=data["run_date"].view("datetime64[ns]"),
+            segment_start=data["segment_start"],
+            segment_date=data["segment_date"].view("datetime64[ns]"),
+            segment_stats=data["segment_stats"],
+            n_obs=int(data["n_obs"]),
+            last_date=np.int64(data["last_date"]).astype("datetime64[ns]"),
+            last_price=float(data["last_price"]),
+            byte_offset=int(data["byte_offset"]),
+            head_digest=str(data["head_digest"]),
+        )
+
+
+def _head_digest(handle: Any, n_bytes: int) -> str:
+    handle.seek(0)
+    return hashlib.sha1(handle.read(n_bytes)).hexdigest()
+
+
+def _read_appended_rows(
+    csv_path: Path,
+    state: Optional[OnlineChangePointState],
+) -> Tuple[pd.DataFrame, int, str, bool]:
+    """Parse the complete rows appended since the state's byte offset."""
+    with csv_path.open("rb") as handle:
+        header = handle.readline()
+        head_limit = len(header) + _HEAD_BYTES
+        resume = (
+            state is not None
+            and len(header) <= state.byte_offset <= csv_path.stat().st_size
+            and state.head_digest == _head_digest(handle, min(state.byte_offset, head_limit))
+        )
+        start = state.byte_offset if resume else len(header)
+        handle.seek(start)
+        body = handle.read()
+        complete = body[: body.rfind(b"\n") + 1]
+        offset = start + len(complete)
+        digest = _head_digest(handle, min(offset, head_limit))
+    if not complete.strip():
+        return pd.DataFrame(), offset, digest, resume
+    return pd.read_csv(io.BytesIO(header + complete)), offset, digest, resume
+
+
+def run_online_pipeline(
+    csv_path: str = PROCESSED_PRICES_PATH,
+    state_path: str = ONLINE_CP_STATE_PATH,
+    results_path: Optional[str] = CHANGE_POINT_RESULTS_PATH,
+    hazard: float = DEFAULT_BOCPD_HAZARD,
+    max_run_length: int = DEFAULT_BOCPD_MAX_RUN_LENGTH,
+    min_regime_length: int = DEFAULT_BOCPD_MIN_REGIME,
+) -> Dict[str, Any]:
+    """
+    Consume rows appended to ``csv_path`` since the last call and refresh the report.
+
+    The state is rebuilt from scratch when the file's head changes or it
+    shrinks, i.e. when history was rewritten rather than appended to.
+    """
+    state = load_online_state(state_path)
+    rows, offset, digest, resume = _read_appended_rows(Path(csv_path), state)
+    if not resume:
+        state = None
+
+    if not rows.empty:
+        new_rows = rows[["Date", "Price"]].copy()
+        if state is not None:
+            # Prepend the last seen row so preprocess_prices derives the first
+            # new log return; drop rows that are not strictly newer.
+            previous = pd.DataFrame({"Date": [state.last_date], "Price": [state.last_price]})
+            new_rows["Date"] = pd.to_datetime(new_rows["Date"], errors="coerce")
+            new_rows = pd.concat(
+                [previous, new_rows[new_rows["Date"] > state.last_date]], ignore_index=True
+            )
+        prepared = preprocess_prices(new_rows)
+        if state is None and not prepared.empty:
+            state = init_online_state(
+                prepared["log_return"].to_numpy()[:250],
+                prepared["Date"].iloc[0],
+                hazard,
+                max_run_length,
+            )
+        if len(prepared) > 1:
+            # The first row only anchors the first return.
+            update_online_state(
+                state,
+                prepared["log_return"].to_numpy()[1:],
+                prepared["Date"].to_numpy(dtype="datetime64[ns]")[1:],
+            )
+        if not prepared.empty:
+            state.last_price = float(prepared["Price"].iloc[-1])
+
+    if state is None:
+        raise ValueError(f"No price rows found in {csv_path}")
+    state.byte_offset = offset
+    state.head_digest = digest
+    save_online_state(state, state_path)
+
+    summary = summarize_online_state(state, min_regime_length)
+    if results_path is not None:
+        write_json(summary, results_path)
+    return summary
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    njit = None  # type: ignore
+
+from src.constants import (
+    CHANGE_POINT_RESULTS_PATH,
+    DEFAULT_PELT_MAX_GRID,
+    DEFAULT_PELT_MIN_SIZE,
+)
+from src.models.change_point_summary import summarize_change_points, write_json
+
+
+def _prefix_table(clean_returns: np.ndarray) -> np.ndarray:
+    """Prefix sums of 1, x and x**2 with a leading zero column, shape (3, T + 1)."""
+    table = np.zeros((3, len(clean_returns) + 1))
+    table[0, 1:] = np.arange(1, len(clean_returns) + 1)
+    table[1, 1:] = np.cumsum(clean_returns)
+    table[2, 1:] = np.cumsum(clean_returns**2)
+    return table
+
+
+def _segment_cost(prefix: np.ndarray, start: Any, end: Any, var_floor: float) -> Any:
+    """Gaussian mean/variance cost n*log(var) of [start, end); either bound may be an array."""
+    n_obs = prefix[0, end] - prefix[0, start]
+    mean = (prefix[1, end] - prefix[1, start]) / n_obs
+    var = (prefix[2, end] - prefix[2, start]) / n_obs - mean**2
+    return n_obs * np.log(np.maximum(var, var_floor))
+
+
+def _pelt_numpy(
+    prefix: np.ndarray,
+    penalty: float,
+    min_steps: int,
+    var_floor: float,
+) -> np.ndarray:
+    n_steps = prefix.shape[1] - 1
+    best = np.full(n_steps + 1, np.inf)
+    best[0] = -penalty
+    last = np.zeros(n_steps + 1, dtype=np.int64)
+    candidates = np.empty(0, dtype=np.int64)
+    for end in range(min_steps, n_steps + 1):
+        start = end - min_steps
+        if start == 0 or start >= min_steps:
+            candidates = np.append(candidates, start)
+        scores = best[candidates] + _segment_cost(prefix, candidates, end, var_floor)
+        pick = int(np.argmin(scores))
+        best[end] = scores[pick] + penalty
+        last[end] = candidates[pick]
+        candidates = candidates[scores <= best[end]]
+    return last
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _pelt_kernel(
+        prefix: np.ndarray,
+        penalty: float,
+        min_steps: int,
+        var_floor: float,
+    ) -> np.ndarray:  # pragma: no cover - compiled
+        n_steps = prefix.shape[1] - 1
+        best = np.full(n_steps + 1, np.inf)
+        best[0] = -penalty
+        last = np.zeros(n_steps + 1, dtype=np.int64)
+        candidates = np.empty(n_steps + 1, dtype=np.int64)
+        scores = np.empty(n_steps + 1)
+        n_candidates = 0
+        for end in range(min_steps, n_steps + 1):
+            start = end - min_steps
+            if start == 0 or start >= min_steps:
+                candidates[n_candidates] = start
+                n_candidates += 1
+            best_score = np.inf
+            best_start = 0
+            for idx in range(n_candidates):
+                begin = candidates[idx]
+                n_seg = prefix[0, end] - prefix[0, begin]
+                mean = (prefix[1, end] - prefix[1, begin]) / n_seg
+                var = (prefix[2, end] - prefix[2, begin]) / n_seg - mean * mean
+                score = best[begin] + n_seg * np.log(max(var, var_floor))
+                scores[idx] = score
+                if score < best_score:
+                    best_score = score
+                    best_start = begin
+            best[end] = best_score + penalty
+            last[end] = best_start
+            # Prune starts that can never beat the optimum again (K = 0 for
+            # a likelihood cost).
+            kept = 0
+            for idx in range(n_candidates):
+                if scores[idx] <= best[end]:
+                    candidates[kept] = candidates[idx]
+                    kept += 1
+            n_candidates = kept
+        return last
+
+else:  # pragma: no cover
+    _pelt_kernel = _pelt_numpy
+
+
+def _clean(log_returns: np.ndarray) -> np.ndarray:
+    clean_returns = np.asarray(log_returns, dtype=float)
+    return clean_returns[~np.isnan(clean_returns)]
+
+
+def _backtrack(last: np.ndarray) -> List[int]:
+    ends: List[int] = []
+    end = len(last) - 1
+    while end > 0:
+        ends.append(end)
+        end = int(last[end])
+    return sorted(ends)
+
+
+def _refine(
+    prefix: np.ndarray,
+    ends: List[int],
+    jump: int,
+    min_size: int,
+    var_floor: float,
+) -> List[int]:
+    """Move each break to its exact best position within +/- ``jump`` of its neighbours' bounds."""
+    bounds = [0] + list(ends)
+    for idx in range(1, len(bounds) - 1):
+        left, right = bounds[idx - 1], bounds[idx + 1]
+        lo = max(left + min_size, bounds[idx] - jump)
+        hi = min(right - min_size, bounds[idx] + jump)
+        if hi <= lo:
+            continue
+        split = np.arange(lo, hi + 1)
+        cost = _segment_cost(prefix, left, split, var_floor) + _segment_cost(
+            prefix, split, right, var_floor
+        )
+        bounds[idx] = int(split[np.argmin(cost)])
+    return bounds[1:]
+
+
+def pelt_change_points(
+    log_returns: np.ndarray,
+    penalty: Optional[float] = None,
+    min_size: int = DEFAULT_PELT_MIN_SIZE,
+    max_grid: int = DEFAULT_PELT_MAX_GRID,
+) -> np.ndarray:
+    """
+    Detect mean/variance change points with PELT over prefix sums.
+
+    Returns tau indices with the Bayesian model's convention: tau is the last
+    index of the earlier regime. The default penalty is BIC with three
+    parameters (location, mean, variance) per extra segment.
+
+    PELT's pruning stalls inside long homogeneous regimes, so series longer
+    than ``max_grid`` are searched on a grid of every ``ceil(T / max_grid)``
+    observations (prefix sums keep the costs exact) and each break is then
+    refined exactly within one grid step.
+    """
+    clean_returns = _clean(log_returns)
+    n_obs = len(clean_returns)
+    if n_obs < 2 * min_size:
+        return np.empty(0, dtype=np.int64)
+    if penalty is None:
+        penalty = 3.0 * np.log(n_obs)
+    var_floor = max(float(np.var(clean_returns)) * 1e-6, 1e-300)
+    prefix = _prefix_table(clean_returns)
+    jump = max(1, -(-n_obs // max_grid))
+    grid = np.unique(np.append(np.arange(0, n_obs + 1, jump), n_obs))
+    min_steps = max(1, -(-min_size // jump))
+    last = _pelt_kernel(np.ascontiguousarray(prefix[:, grid]), float(penalty), min_steps, var_floor)
+    ends = [int(grid[step]) for step in _backtrack(last)]
+    if jump > 1:
+        # Grid steps that straddle a break can leave an extra boundary
+        # behind; drop any break that no longer pays for its penalty.
+        ends = _refine(prefix, ends, jump, min_size, var_floor)
+        ends = _merge(prefix, ends, var_floor, penalty=float(penalty))
+    return np.asarray(ends[:-1], dtype=np.int64) - 1
+
+
+def _merge(
+    prefix: np.ndarray,
+    ends: List[int],
+    var_floor: float,
+    n_change_points: int = 0,
+    penalty: float = np.inf,
+) -> List[int]:
+    """Greedily drop the break whose removal raises the cost least, while that costs < ``penalty``."""
+    bounds = np.asarray([0] + list(ends), dtype=np.int64)
+    while len(bounds) - 2 > n_change_points:
+        increase = (
+            _segment_cost(prefix, bounds[:-2], bounds[2:], var_floor)
+            - _segment_cost(prefix, bounds[:-2], bounds[1:-1], var_floor)
+            - _segment_cost(prefix, bounds[1:-1], bounds[2:], var_floor)
+        )
+        pick = int(np.argmin(increase))
+        if increase[pick] >= penalty:
+            break
+        bounds = np.delete(bounds, pick + 1)
+    return [int(bound) for bound in bounds[1:]]
+
+
+def pelt_fixed_change_points(
+    log_returns: np.ndarray,
+    n_change_points: int,
+    min_size: int = DEFAULT_PELT_MIN_SIZE,
+    n_passes: int = 2,
+) -> np.ndarray:
+    """
+    Find exactly ``n_change_points`` breaks for seeding the Bayesian model.
+
+    PELT runs at the default penalty (lowered until it finds enough breaks),
+    the segmentation is merged down greedily, and each remaining break is
+    re-optimized exactly between its neighbours.
+    """
+    clean_returns = _clean(log_returns)
+    penalty = 3.0 * np.log(max(len(clean_returns), 2))
+    taus = pelt_change_points(clean_returns, penalty=penalty, min_size=min_size)
+    while len(taus) < n_change_points:
+        if penalty < 1e-6:
+            raise ValueError("Series too short for the requested number of change points.")
+        penalty /= 4.0
+        taus = pelt_change_points(clean_returns, penalty=penalty, min_size=min_size)
+    prefix = _prefix_table(clean_returns)
+    var_floor = max(float(np.var(clean_returns)) * 1e-6, 1e-300)
+    ends = _merge(prefix, list(taus + 1) + [len(clean_returns)], var_floor, n_change_points)
+    for _ in range(n_passes):
+        ends = _refine(prefix, ends, len(clean_returns), min_size, var_floor)
+    return np.asarray(ends[:-1], dtype=np.int64) - 1
+
+
+def segment_moments(log_returns: np.ndarray, taus: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-regime mean and standard deviation for the given breaks."""
+    segments = np.split(_clean(log_returns), np.asarray(taus, dtype=np.int64) + 1)
+    return (
+        np.array([segment.mean() for segment in segments]),
+        np.array([segment.std() for segment in segments]),
+    )
+
+
+def tau_prior_bounds(
+    taus: np.ndarray,
+    n_obs: int,
+    margin: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-change-point DiscreteUniform bounds of +/- ``margin`` around ``taus``."""
+    taus = np.sort(np.asarray(taus, dtype=np.int64))
+    lower = np.clip(taus - margin, 1, n_obs - 2)
+    upper = np.clip(taus + margin, 1, n_obs - 2)
+    return lower, upper
+
+
+def summarize_pelt_change_points(
+    dates: pd.Series,
+    log_returns: np.ndarray,
+    taus: np.ndarray,
+) -> Dict[str, Any]:
+    """Build the ``summarize_change_points`` report from a point segmentation."""
+    mu, sigma = segment_moments(log_returns, taus)
+    return summarize_change_points(
+        dates=dates,
+        tau_samples=np.asarray(taus, dtype=np.int64)[None, :],
+        mu_samples=mu[None, :],
+        sigma_samples=sigma[None, :],
+    )
+
+
+def run_pelt_pipeline(
+    df: pd.DataFrame,
+    n_change_points: Optional[int] = None,
+    penalty: Optional[float] = None,
+    min_size: int = DEFAULT_PELT_MIN_SIZE,
+    results_path: Optional[str] = CHANGE_POINT_RESULTS_PATH,
+) -> Dict[str, Any]:
+    """Detect change points deterministically and optionally write the results JSON."""
+    log_returns = df["log_return"].dropna().to_numpy()
+    if n_change_points is None:
+        taus = pelt_change_points(log_returns, penalty=penalty, min_size=min_size)
+    else:
+        taus = pelt_fixed_change_points(log_returns, n_change_points, min_size=min_size)
+    summary = summarize_pelt_change_points(df["Date"].reset_index(drop=True), log_returns, taus)
+    if results_path is not None:
+        write_json(summary, results_path)
+    return summary
@@ -0,0 +1,206 @@
+"""Content-addressed cache of fitted change-point posteriors."""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict
+from datetime import datetime, timezone
+from functools import lru_cache
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Dict, List, Optional
+
+import arviz as az
+import numpy as np
+import pandas as pd
+
+from src.config import ModelConfig
+from src.constants import DEFAULT_POSTERIOR_CACHE_MAX_BYTES, MODEL_V2_CACHE_DIR
+from src.models.model_utils import save_inference_data, write_json
+
+# Modules whose source determines what a fit produces.
+_MODEL_SOURCES = (
+    "bayesian_change_point.py",
+    "pelt_change_point.py",
+    "model_utils.py",
+    "change_point_summary.py",
+)
+
+
+@lru_cache(maxsize=1)
+def model_code_version() -> str:
+    """Hash of the model source files, so code changes invalidate cached fits."""
+    digest = hashlib.sha256()
+    for name in _MODEL_SOURCES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def dates_digest(dates: pd.Series) -> str:
+    """Hash of a date column, to check a cached summary belongs to the same index."""
+    values = pd.to_datetime(dates).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    return hashlib.sha256(values.tobytes()).hexdigest()
+
+
+def fit_cache_key(log_returns: np.ndarray, config: ModelConfig) -> str:
+    """Key over the cleaned returns, the model code version and the config."""
+    clean_returns = np.asarray(log_returns, dtype=np.float64)
+    clean_returns = np.ascontiguousarray(clean_returns[~np.isnan(clean_returns)])
+    digest = hashlib.sha256()
+    digest.update(clean_returns.tobytes())
+    digest.update(model_code_version().encode("utf-8"))
+    digest.update(json.dumps(asdict(config), sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PosteriorCache:
+    """Netcdf posteriors keyed by ``fit_cache_key`` with LRU eviction by disk size."""
+
+    def __init__(
+        self,
+        root: str = MODEL_V2_CACHE_DIR,
+        max_bytes: int = DEFAULT_POSTERIOR_CACHE_MAX_BYTES,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def _posterior_path(self, key: str) -> Path:
+        return self.root / f"{key}.nc"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Sidecar metadata of a cached fit (counts as a use), or ``None``."""
+        path = self._posterior_path(key)
+        if not path.exists() or not self._meta_path(key).exists():
+            return None
+        os.utime(path)
+        with self._meta_path(key).open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def annotate(self, key: str, metadata: Dict[str, Any]) -> None:
+        """Merge ``metadata`` into a cached fit's sidecar."""
+        current = self.lookup(key)
+        if current is not None:
+            write_json({**current, **metadata}, str(self._meta_path(key)))
+
+    def copy_to(self, key: str, destination: str) -> Path:
+        output = Path(destination)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self._posterior_path(key), output)
+        return output
+
+    def get(self, key: str) -> Optional[az.InferenceData]:
+        path = self._posterior_path(key)
+        if not path.exists():
+            return None
+        # The posterior's mtime records the last use for LRU eviction.
+        os.utime(path)
+        return az.from_netcdf(path)
+
+    def put(
+        self,
+        key: str,
+        trace: az.InferenceData,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        path = self._posterior_path(key)
+        partial = path.with_suffix(".nc.partial")
+        save_inference_data(trace, str(partial))
+        os.replace(partial, path)
+        created_at = datetime.now(timezone.utc).isoformat()
+        write_json(
+            {"key": key, "created_at": created_at, **(metadata or {})},
+            str(self._meta_path(key)),
+        )
+        self.prune(self.max_bytes, keep=key)
+        return path
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Cached fits, most recently used first."""
+        if not self.root.exists():
+            return []
+        entries: List[Dict[str, Any]] = []
+        for path in self.root.glob("*.nc"):
+            key = path.stem
+            meta: Dict[str, Any] = {}
+            if self._meta_path(key).exists():
+                with self._meta_path(key).open("r", encoding="utf-8") as handle:
+                    meta = json.load(handle)
+            stat = path.stat()
+            entries.append(
+                {
+                    **meta,
+                    "key": key,
+                    "size_bytes": stat.st_size,
+                    "last_used": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+                }
+            )
+        return sorted(entries, key=lambda entry: entry["last_used"], reverse=True)
+
+    def remove(self, key: str) -> None:
+        self._posterior_path(key).unlink(missing_ok=True)
+        self._meta_path(key).unlink(missing_ok=True)
+
+    def prune(self, max_bytes: int, keep: Optional[str] = None) -> List[str]:
+        """Evict least recently used fits until the cache fits in ``max_bytes``."""
+        entries = self.entries()
+        total = sum(entry["size_bytes"] for entry in entries)
+        removed: List[str] = []
+        for entry in reversed(entries):
+            if total <= max_bytes:
+                break
+            if entry["key"] == keep:
+                continue
+            self.remove(entry["key"])
+            total -= entry["size_bytes"]
+            removed.append(entry["key"])
+        return removed
+
+
+def _parse_size(value: str) -> int:
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    value = value.strip().upper().rstrip("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--root", default=MODEL_V2_CACHE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List cached fits, most recently used first.")
+    prune = commands.add_parser("prune", help="Evict fits by size budget or key.")
+    prune.add_argument("--max-size", type=_parse_size, default=None, help="e.g. 500M or 2G")
+    prune.add_argument("--key", action="append", default=[], help="Remove this key (repeatable).")
+    args = parser.parse_args()
+
+    cache = PosteriorCache(args.root)
+    if args.command == "list":
+        for entry in cache.entries():
+            config = entry.get("config", {})
+            print(
+                f"{entry['key'][:16]}  {entry['size_bytes'] / 1024**2:8.1f} MB  "
+                f"last_used={entry['last_used']}  K={config.get('n_change_points')}  "
+                f"marginalize_tau={config.get('marginalize_tau')}  n_obs={entry.get('n_obs')}"
+            )
+        return
+
+    removed: List[str] = []
+    for key in args.key:
+        matches = [entry["key"] for entry in cache.entries() if entry["key"].startswith(key)]
+        for match in matches:
+            cache.remove(match)
+        removed.extend(matches)
+    if args.max_size is not None:
+        removed.extend(cache.prune(args.max_size))
+    print(f"removed {len(removed)} cached fit(s)")
+
+
+if __name__ == "__main__":
+    main()
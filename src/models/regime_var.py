@@ -0,0 +1,231 @@
+"""One VAR per change-point regime, fitted concurrently, with the coefficient shifts between regimes."""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.time_index import TimeIndex
+from src.constants import (
+    CHANGE_POINT_RESULTS_PATH,
+    DEFAULT_VAR_MAXLAGS,
+    PROCESSED_PRICES_PATH,
+    REGIME_VAR_RESULTS_PATH,
+)
+from src.data.load_data import load_prices
+from src.data.macro_loader import load_macro_data
+from src.models.change_point_summary import write_json
+from src.models.var_model import (
+    VAR_COLUMNS,
+    VarResults,
+    fit_var,
+    select_lag_order,
+    summarize_var_results,
+)
+
+
+def regime_slices(dates: Any, regimes: Sequence[Dict[str, Any]]) -> List[slice]:
+    """
+    Row ranges of ``regimes`` (ordered, as in the change-point results) in ``dates``.
+
+    A regime runs from its ``start_date`` up to the next regime's start; the
+    last one runs through its ``end_date``. The shared boundary date belongs
+    to the later regime.
+    """
+    if not regimes:
+        raise ValueError("No regimes to slice")
+    index = TimeIndex(dates)
+    starts = index.positions([regime["start_date"] for regime in regimes], "left")
+    stop = index.positions(regimes[-1]["end_date"], "right")
+    stops = np.append(starts[1:], stop)
+    return [slice(int(lo), int(hi)) for lo, hi in zip(starts, stops)]
+
+
+def spectral_radius(result: VarResults) -> float:
+    """Largest companion-matrix eigenvalue modulus; below one means a stable VAR."""
+    if result.k_ar == 0:
+        return 0.0
+    k = result.neqs
+    companion = np.eye(k * result.k_ar, k=-k)
+    companion[:k] = np.hstack(list(result.coefs))
+    return float(np.abs(np.linalg.eigvals(companion)).max())
+
+
+def fit_regime_var(values: np.ndarray, maxlags: int = DEFAULT_VAR_MAXLAGS) -> VarResults:
+    """
+    AIC-selected VAR of one regime's rows.
+
+    The lag grid is capped so every order leaves at least ``k`` residual
+    degrees of freedom; a regime too short for even a VAR(0) is a ValueError.
+    """
+    n_obs, n_vars = values.shape
+    lags = min(maxlags, (n_obs - 1 - n_vars) // (n_vars + 1))
+    if lags < 0:
+        raise ValueError(f"{n_obs} rows are too few for a {n_vars}-variable VAR")
+    return fit_var(values, select_lag_order(values, lags)["selected"]["aic"])
+
+
+def _regime_summary(result: VarResults) -> Dict[str, Any]:
+    return {
+        "status": "fitted",
+        **summarize_var_results(result),
+        "nobs": result.nobs,
+        "sigma_u": result.sigma_u.tolist(),
+        "spectral_radius": spectral_radius(result),
+    }
+
+
+def coefficient_shift(before: VarResults, after: VarResults) -> Dict[str, Any]:
+    """
+    Change of the VAR coefficients from one regime to the next.
+
+    Only the constant and the lags both regimes share are compared. ``norm``
+    is the Frobenius norm of the coefficient change; ``largest_shift`` names
+    the single coefficient that moved most.
+    """
+    common = min(before.k_ar, after.k_ar)
+    rows = 1 + before.neqs * common
+    names = after.param_names[:rows]
+    delta = after.params[:rows] - before.params[:rows]
+    row, col = np.unravel_index(int(np.argmax(np.abs(delta))), delta.shape)
+    _, logdet_before = np.linalg.slogdet(before.sigma_u)
+    _, logdet_after = np.linalg.slogdet(after.sigma_u)
+    return {
+        "common_lags": common,
+        "norm": float(np.linalg.norm(delta)),
+        "max_abs_shift": float(np.abs(delta[row, col])),
+        "largest_shift": {
+            "param": names[row],
+            "equation": after.names[col],
+            "before": float(before.params[row, col]),
+            "after": float(after.params[row, col]),
+        },
+        "sigma_u_logdet_change": float(logdet_after - logdet_before),
+        "spectral_radius_change": spectral_radius(after) - spectral_radius(before),
+        "shifts": {
+            name: {equation: float(value) for equation, value in zip(after.names, delta_row)}
+            for name, delta_row in zip(names, delta)
+        },
+    }
+
+
+def run_regime_var_pipeline(
+    df: pd.DataFrame,
+    regimes: Optional[Sequence[Dict[str, Any]]] = None,
+    change_point_results_path: str = CHANGE_POINT_RESULTS_PATH,
+    output_path: Optional[str] = REGIME_VAR_RESULTS_PATH,
+    maxlags: int = DEFAULT_VAR_MAXLAGS,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Fit one VAR per regime of the change-point results and compare neighbours.
+
+    ``df`` is the merged oil/macro frame; ``regimes`` defaults to the
+    ``regimes`` of ``change_point_results_path``. The VAR columns are copied
+    once into a single array and every regime is fitted on a view of its
+    rows, in a thread pool of ``max_workers`` (the least-squares and
+    eigenvalue routines release the GIL, and views need no pickling). The
+    full sample is fitted alongside as the reference. The report holds each
+    regime's coefficients and the shift across every transition.
+    """
+    if regimes is None:
+        with open(change_point_results_path, "r", encoding="utf-8") as handle:
+            regimes = json.load(handle)["regimes"]
+    data = df[["Date", *VAR_COLUMNS]].dropna().sort_values("Date")
+    values = np.ascontiguousarray(data[list(VAR_COLUMNS)].to_numpy(dtype=float))
+    slices = regime_slices(data["Date"].to_numpy(), regimes)
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(slices) + 1))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="regime-var") as pool:
+        full = pool.submit(fit_regime_var, values, maxlags)
+        futures = [pool.submit(fit_regime_var, values[rows], maxlags) for rows in slices]
+        fits: List[Optional[VarResults]] = []
+        errors: List[Optional[str]] = []
+        for future in futures:
+            try:
+                fits.append(future.result())
+                errors.append(None)
+            except ValueError as exc:
+                fits.append(None)
+                errors.append(str(exc))
+        full_sample = full.result()
+
+    regime_reports = []
+    for regime, rows, result, error in zip(regimes, slices, fits, errors):
+        report = {
+            "name": regime["name"],
+            "start_date": regime["start_date"],
+            "end_date": regime["end_date"],
+            "n_rows": rows.stop - rows.start,
+        }
+        if result is None:
+            report.update(status="skipped", error=error)
+        else:
+            report.update(_regime_summary(result))
+        regime_reports.append(report)
+
+    transitions = []
+    for idx in range(len(regimes) - 1):
+        before, after = fits[idx], fits[idx + 1]
+        transition = {"transition": f"{regimes[idx]['name']} -> {regimes[idx + 1]['name']}"}
+        if before is not None and after is not None:
+            transition.update(coefficient_shift(before, after))
+        transitions.append(transition)
+
+    report = {
+        "variables": list(VAR_COLUMNS),
+        "maxlags": maxlags,
+        "workers": workers,
+        "wall_seconds": time.perf_counter() - started,
+        "full_sample": _regime_summary(full_sample),
+        "regimes": regime_reports,
+        "coefficient_shifts": transitions,
+    }
+    if output_path is not None:
+        write_json(report, output_path)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", default=PROCESSED_PRICES_PATH)
+    parser.add_argument("--change-points", default=CHANGE_POINT_RESULTS_PATH)
+    parser.add_argument("--output", default=REGIME_VAR_RESULTS_PATH)
+    parser.add_argument("--maxlags", type=int, default=DEFAULT_VAR_MAXLAGS)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    report = run_regime_var_pipeline(
+        load_macro_data(load_prices(args.data)),
+        change_point_results_path=args.change_points,
+        output_path=args.output,
+        maxlags=args.maxlags,
+        max_workers=args.workers,
+    )
+    for regime in report["regimes"]:
+        detail = (
+            f"VAR({regime['lag_order']}), spectral radius {regime['spectral_radius']:.3f}"
+            if regime["status"] == "fitted"
+            else regime["error"]
+        )
+        print(f"{regime['name']}  {regime['start_date']} .. {regime['end_date']}  {detail}")
+    for shift in report["coefficient_shifts"]:
+        if "largest_shift" in shift:
+            largest = shift["largest_shift"]
+            print(
+                f"{shift['transition']}: |dB| = {shift['norm']:.3f}, largest "
+                f"{largest['param']} in {largest['equation']} "
+                f"({largest['before']:.3f} -> {largest['after']:.3f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
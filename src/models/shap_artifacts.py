@@ -0,0 +1,313 @@
+"""Versioned SHAP artifacts and the background jobs that build them."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cached_property, lru_cache
+import hashlib
+import json
+import os
+from pathlib import Path
+import pickle
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.time_index import TimeIndex
+from src.constants import DEFAULT_SHAP_METHOD, SHAP_ARTIFACT_DIR, SHAP_ARTIFACT_KEEP
+from src.data.macro_loader import load_macro_data
+from src.models.explainability import (
+    ShapExplanation,
+    explain_macro_drivers,
+    plot_global_importance,
+    plot_local_explanation,
+    shap_runtime_status,
+)
+from src.models.job_state import JobMarker, utc_now
+
+# Modules whose source determines what an explanation contains.
+_SHAP_SOURCES = ("explainability.py", "shap_artifacts.py")
+
+
+@lru_cache(maxsize=1)
+def _code_version() -> str:
+    digest = hashlib.sha256()
+    for name in _SHAP_SOURCES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()
+
+
+def shap_artifact_version(data_digest: str, method: str = DEFAULT_SHAP_METHOD) -> str:
+    """Version of the artifacts for a price file digest, SHAP method, this code and runtime mode."""
+    digest = hashlib.sha256()
+    digest.update(data_digest.encode("utf-8"))
+    digest.update(method.encode("utf-8"))
+    digest.update(_code_version().encode("utf-8"))
+    digest.update(str(shap_runtime_status()["mode"]).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class ShapArtifacts:
+    """
+    One published artifact version; arrays are read-only memory maps.
+
+    ``values`` (SHAP) and ``features`` are float32 ``(n_rows, n_features)``
+    matrices aligned with the sorted ``dates``.
+    """
+
+    version: str
+    directory: Path
+    meta: Dict[str, Any]
+    dates: np.ndarray
+    features: np.ndarray
+    values: np.ndarray
+
+    @property
+    def global_plot(self) -> Path:
+        return self.directory / "global.png"
+
+    @cached_property
+    def index(self) -> TimeIndex:
+        """Date index over the rows, for O(log N) date and range lookups."""
+        return TimeIndex(self.dates)
+
+    def row_asof(self, date: Any) -> Optional[int]:
+        """Last row on or before ``date``; ``None`` before the first row."""
+        row = int(self.index.positions(date, "right")) - 1
+        return row if row >= 0 else None
+
+    def rows(self, start: Any = None, end: Any = None) -> slice:
+        """Rows dated within ``[start, end]`` (``None`` leaves a side open)."""
+        return self.index.slice(start, end)
+
+    def explanation(self) -> ShapExplanation:
+        """The stored explanation (without the fitted model)."""
+        return ShapExplanation(
+            dates=self.dates,
+            features=self.features,
+            values=self.values,
+            feature_names=tuple(self.meta["feature_names"]),
+            base_value=float(self.meta["base_value"]),
+            global_importance=np.asarray(self.meta["global_importance"], dtype=float),
+            mode=str(self.meta["mode"]),
+        )
+
+    def local_plot(self, row: int) -> Path:
+        """Local explanation PNG for ``row``, rendered once from the stored values."""
+        date = str(np.datetime_as_string(self.dates[row], unit="D"))
+        path = self.directory / "local" / f"{date}.png"
+        if not path.exists():
+            partial = path.with_name(f"{date}.partial-{os.getpid()}-{threading.get_ident()}.png")
+            plot_local_explanation(self.explanation(), row, str(partial))
+            os.replace(partial, path)
+        return path
+
+
+class ShapArtifactStore:
+    """
+    SHAP values, fitted model and plots, one directory per artifact version.
+
+    A version is published atomically (written to a partial directory, then
+    renamed), so readers in any process see either nothing or a complete
+    set. Only the ``keep`` most recent versions are kept.
+    """
+
+    def __init__(self, root: str = SHAP_ARTIFACT_DIR, keep: int = SHAP_ARTIFACT_KEEP) -> None:
+        self.root = Path(root)
+        self.keep = keep
+        self._loaded: Dict[str, ShapArtifacts] = {}
+        self._lock = threading.Lock()
+
+    def _directory(self, version: str) -> Path:
+        return self.root / version
+
+    def exists(self, version: str) -> bool:
+        return (self._directory(version) / "meta.json").exists()
+
+    def job_marker(self, version: str) -> JobMarker:
+        """Status of the job building ``version``, shared by every process."""
+        return JobMarker(str(self.root / f"{version}.job.json"))
+
+    def load(self, version: str) -> Optional[ShapArtifacts]:
+        with self._lock:
+            artifacts = self._loaded.get(version)
+        if artifacts is not None and artifacts.directory.exists():
+            return artifacts
+        directory = self._directory(version)
+        try:
+            with (directory / "meta.json").open("r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        artifacts = ShapArtifacts(
+            version=version,
+            directory=directory,
+            meta=meta,
+            dates=np.load(directory / "dates.npy", mmap_mode="r"),
+            features=np.load(directory / "features.npy", mmap_mode="r"),
+            values=np.load(directory / "shap_values.npy", mmap_mode="r"),
+        )
+        with self._lock:
+            self._loaded[version] = artifacts
+        return artifacts
+
+    def versions(self) -> List[str]:
+        """Published versions, newest first."""
+        if not self.root.exists():
+            return []
+        published = [path for path in self.root.iterdir() if (path / "meta.json").exists()]
+        published.sort(key=lambda path: (path / "meta.json").stat().st_mtime_ns, reverse=True)
+        return [path.name for path in published]
+
+    def latest(self) -> Optional[ShapArtifacts]:
+        for version in self.versions():
+            artifacts = self.load(version)
+            if artifacts is not None:
+                return artifacts
+        return None
+
+    def publish(
+        self,
+        version: str,
+        explanation: ShapExplanation,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> ShapArtifacts:
+        directory = self._directory(version)
+        if not self.exists(version):
+            partial = self.root / f"{version}.partial-{os.getpid()}-{threading.get_ident()}"
+            shutil.rmtree(partial, ignore_errors=True)
+            (partial / "local").mkdir(parents=True)
+            np.save(partial / "dates.npy", explanation.dates)
+            # float32 halves the maps; attributions need nowhere near float64 precision.
+            np.save(partial / "features.npy", np.asarray(explanation.features, dtype=np.float32))
+            np.save(partial / "shap_values.npy", np.asarray(explanation.values, dtype=np.float32))
+            if explanation.model is not None:
+                with (partial / "model.pkl").open("wb") as handle:
+                    pickle.dump(explanation.model, handle)
+            plot_global_importance(explanation, str(partial / "global.png"))
+            meta = {
+                "version": version,
+                "mode": explanation.mode,
+                "feature_names": list(explanation.feature_names),
+                "base_value": explanation.base_value,
+                "global_importance": explanation.global_importance.tolist(),
+                "n_rows": int(len(explanation.dates)),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                **(metadata or {}),
+            }
+            with (partial / "meta.json").open("w", encoding="utf-8") as handle:
+                json.dump(meta, handle, indent=2)
+            try:
+                os.replace(partial, directory)
+            except OSError:
+                # Another worker published this version first.
+                shutil.rmtree(partial, ignore_errors=True)
+        self.prune(keep=version)
+        artifacts = self.load(version)
+        if artifacts is None:  # pragma: no cover - removed concurrently
+            raise FileNotFoundError(f"SHAP artifacts {version} disappeared after publishing")
+        return artifacts
+
+    def prune(self, keep: Optional[str] = None) -> List[str]:
+        """Remove all but the ``self.keep`` newest versions (never ``keep``)."""
+        removed: List[str] = []
+        for version in self.versions()[self.keep :]:
+            if version == keep:
+                continue
+            shutil.rmtree(self._directory(version), ignore_errors=True)
+            self.job_marker(version).remove()
+            with self._lock:
+                self._loaded.pop(version, None)
+            removed.append(version)
+        return removed
+
+
+def build_shap_artifacts(
+    prices: pd.DataFrame,
+    store: ShapArtifactStore,
+    version: str,
+    data_digest: Optional[str] = None,
+    method: str = DEFAULT_SHAP_METHOD,
+) -> ShapArtifacts:
+    """Train, explain and render once for ``prices`` and publish it as ``version``."""
+    explanation = explain_macro_drivers(load_macro_data(prices), method=method)
+    return store.publish(
+        version, explanation, {"data_digest": data_digest, "diagnostics": explanation.diagnostics}
+    )
+
+
+class ShapJobRunner:
+    """
+    Builds SHAP artifacts in one background thread, at most once per version.
+
+    ``submit`` returns immediately with the job's status; a version that is
+    already published, queued or running is not built again. A failed job is
+    only retried when submitted with ``retry=True``. Every job explains with
+    ``method`` (see ``explain_macro_drivers``).
+
+    Job status lives next to the artifacts (``ShapArtifactStore.job_marker``),
+    not in this object, so all server workers share it: only the worker whose
+    claim creates the marker builds, and any worker can report its status.
+    """
+
+    def __init__(self, store: ShapArtifactStore, method: str = DEFAULT_SHAP_METHOD) -> None:
+        self.store = store
+        self.method = method
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shap-job")
+
+    def status(self, version: str) -> Optional[Dict[str, Any]]:
+        job = self.store.job_marker(version).read()
+        if job is not None and (job["status"] != "done" or self.store.exists(version)):
+            return {"version": version, **job}
+        if self.store.exists(version):
+            return {"version": version, "status": "done"}
+        return None
+
+    def submit(
+        self,
+        version: str,
+        load_prices: Callable[[], pd.DataFrame],
+        data_digest: Optional[str] = None,
+        retry: bool = False,
+    ) -> Dict[str, Any]:
+        if self.store.exists(version):
+            return {"version": version, "status": "done"}
+        # A "done" marker without artifacts was pruned or removed: build again.
+        replace = ("done", "failed") if retry else ("done",)
+        claimed, job = self.store.job_marker(version).claim(replace=replace)
+        if claimed:
+            self._executor.submit(self._run, version, load_prices, data_digest)
+        return {"version": version, **job}
+
+    def _run(
+        self,
+        version: str,
+        load_prices: Callable[[], pd.DataFrame],
+        data_digest: Optional[str],
+    ) -> None:
+        marker = self.store.job_marker(version)
+        marker.update(status="running", started_at=utc_now())
+        try:
+            build_shap_artifacts(load_prices(), self.store, version, data_digest, self.method)
+            outcome: Dict[str, Any] = {"status": "done"}
+        except Exception as exc:  # pragma: no cover - surfaced through status
+            outcome = {"status": "failed", "error": str(exc)}
+        marker.update(**outcome, finished_at=utc_now())
+
+    def wait(self, version: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until ``version`` is no longer queued or running (tests, CLI)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status(version)
+            if status is None or status["status"] not in ("queued", "running"):
+                return status
+            if deadline is not None and time.monotonic() >= deadline:
+                return status
+            time.sleep(0.05)
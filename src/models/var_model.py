@@ -1,78 +1,235 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from functools import cached_property
 import json
 import logging
 from pathlib import Path
-from typing import Any, Dict
+from statistics import NormalDist
+from typing import Any, Dict, List, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
-import warnings
+from numpy.lib.stride_tricks import sliding_window_view
 
-try:
-    from statsmodels.tsa.api import VAR
-except ImportError:  # pragma: no cover
-    VAR = None  # type: ignore
-
-from src.constants import VAR_RESULTS_PATH
+from src.constants import DEFAULT_VAR_ALPHA, DEFAULT_VAR_MAXLAGS, VAR_RESULTS_PATH
 
 LOGGER = logging.getLogger(__name__)
 
+VAR_COLUMNS = ("log_return", "GDP", "Inflation", "ExchangeRate")
+VAR_CRITERIA = ("aic", "bic", "hqic", "fpe")
+
+
+def lagged_design(values: np.ndarray, maxlags: int) -> tuple:
+    """
+    Targets ``Y`` and the shared design ``Z = [1, y(t-1), ..., y(t-maxlags)]``.
+
+    Both start at row ``maxlags``, so the leading ``1 + k * p`` columns of
+    ``Z`` are the design of a VAR(p) on the same sample for every ``p``. The
+    lag blocks are read from a strided window view of ``values``.
+    """
+    values = np.asarray(values, dtype=float)
+    n_obs, n_vars = values.shape
+    if n_obs <= maxlags:
+        raise ValueError(f"{n_obs} rows are too few for {maxlags} lags")
+    # windows[t, j] is values[t + j]; row t + maxlags is the target.
+    windows = sliding_window_view(values, (maxlags + 1, n_vars))[:, 0]
+    lags = windows[:, :maxlags][:, ::-1].reshape(n_obs - maxlags, maxlags * n_vars)
+    design = np.hstack([np.ones((n_obs - maxlags, 1)), lags])
+    return values[maxlags:], design
+
+
+def _information_criteria(
+    sigma_mle: np.ndarray, n_obs: int, n_vars: int, lag: int
+) -> Dict[str, float]:
+    """AIC/BIC/HQIC/FPE of a VAR(``lag``) with a constant, as statsmodels computes them."""
+    n_params = 1 + n_vars * lag
+    _, logdet = np.linalg.slogdet(sigma_mle)
+    free = lag * n_vars**2 + n_vars
+    return {
+        "aic": float(logdet + 2.0 / n_obs * free),
+        "bic": float(logdet + np.log(n_obs) / n_obs * free),
+        "hqic": float(logdet + 2.0 * np.log(np.log(n_obs)) / n_obs * free),
+        "fpe": float(((n_obs + n_params) / (n_obs - n_params)) ** n_vars * np.exp(logdet)),
+    }
+
+
+def select_lag_order(values: np.ndarray, maxlags: int = DEFAULT_VAR_MAXLAGS) -> Dict[str, Any]:
+    """
+    Information criteria of VAR(0) ... VAR(``maxlags``), as statsmodels ``select_order``.
+
+    All orders are compared on the sample after the first ``maxlags`` rows.
+    One QR factorization of the shared design serves every order: the
+    leading columns of ``Q`` span the design of each smaller VAR, so each
+    residual covariance is ``Y'Y`` minus a partial sum of the projections,
+    with no refit.
+    """
+    targets, design = lagged_design(values, maxlags)
+    n_obs, n_vars = targets.shape
+    q, _ = np.linalg.qr(design)
+    projected = q.T @ targets
+    explained = np.cumsum(projected[:, :, None] * projected[:, None, :], axis=0)
+    total = targets.T @ targets
+    table: Dict[str, List[float]] = {name: [] for name in VAR_CRITERIA}
+    for lag in range(maxlags + 1):
+        sigma = (total - explained[n_vars * lag]) / n_obs
+        for name, value in _information_criteria(sigma, n_obs, n_vars, lag).items():
+            table[name].append(value)
+    return {
+        "maxlags": maxlags,
+        "nobs": n_obs,
+        "criteria": table,
+        "selected": {name: int(np.argmin(row)) for name, row in table.items()},
+    }
+
+
+@dataclass
+class VarResults:
+    """
+    A VAR(p) with a constant, estimated by OLS.
+
+    ``coefs[i]`` maps ``y(t-i-1)`` to ``y(t)`` (``(p, k, k)``). ``sigma_u``
+    is the residual covariance with the degrees-of-freedom correction
+    (statsmodels' ``sigma_u``) and ``sigma_u_mle`` divides by ``nobs``.
+    Forecasts, impulse responses and FEVD follow statsmodels' ``VARResults``.
+    """
+
+    names: Tuple[str, ...]
+    intercept: np.ndarray
+    coefs: np.ndarray
+    sigma_u: np.ndarray
+    sigma_u_mle: np.ndarray
+    nobs: int
+
+    @property
+    def k_ar(self) -> int:
+        return int(self.coefs.shape[0])
+
+    @property
+    def neqs(self) -> int:
+        return len(self.names)
 
-def fit_var_model(df: pd.DataFrame, maxlags: int = 3) -> Any:
-    """Fit a VAR model over oil and macroeconomic variables."""
-    data = df[["log_return", "GDP", "Inflation", "ExchangeRate"]].dropna().copy()
+    @cached_property
+    def info_criteria(self) -> Dict[str, float]:
+        return _information_criteria(self.sigma_u_mle, self.nobs, self.neqs, self.k_ar)
+
+    @property
+    def aic(self) -> float:
+        return self.info_criteria["aic"]
+
+    @property
+    def bic(self) -> float:
+        return self.info_criteria["bic"]
+
+    @property
+    def hqic(self) -> float:
+        return self.info_criteria["hqic"]
+
+    @property
+    def param_names(self) -> List[str]:
+        lagged = [f"L{lag}.{name}" for lag in range(1, self.k_ar + 1) for name in self.names]
+        return ["const", *lagged]
+
+    @property
+    def params(self) -> np.ndarray:
+        """``(1 + k * p, k)`` coefficients, one column per equation, rows as ``param_names``."""
+        lags = self.coefs.transpose(0, 2, 1).reshape(self.k_ar * self.neqs, self.neqs)
+        return np.vstack([self.intercept[None, :], lags])
+
+    def forecast(self, y: np.ndarray, steps: int) -> np.ndarray:
+        """Point forecasts ``(steps, k)`` from the last ``k_ar`` rows of ``y``."""
+        history = [row for row in np.asarray(y, dtype=float)[len(y) - self.k_ar :]]
+        out = np.empty((steps, self.neqs))
+        for step in range(steps):
+            value = self.intercept.copy()
+            for lag in range(self.k_ar):
+                value += self.coefs[lag] @ history[-1 - lag]
+            out[step] = value
+            history.append(value)
+        return out
+
+    def ma_rep(self, periods: int) -> np.ndarray:
+        """MA(infinity) coefficients ``phi_0 ... phi_periods`` (``(periods + 1, k, k)``)."""
+        phis = np.zeros((periods + 1, self.neqs, self.neqs))
+        phis[0] = np.eye(self.neqs)
+        for i in range(1, periods + 1):
+            for lag in range(min(i, self.k_ar)):
+                phis[i] += phis[i - 1 - lag] @ self.coefs[lag]
+        return phis
+
+    def orth_ma_rep(self, periods: int) -> np.ndarray:
+        """MA coefficients of the Cholesky-orthogonalized shocks."""
+        return self.ma_rep(periods) @ np.linalg.cholesky(self.sigma_u)
+
+    def mse(self, steps: int) -> np.ndarray:
+        """Forecast error covariances for horizons ``1 ... steps`` (``(steps, k, k)``)."""
+        phis = self.ma_rep(steps - 1)
+        return np.cumsum(phis @ self.sigma_u @ phis.transpose(0, 2, 1), axis=0)
+
+    def forecast_interval(
+        self, y: np.ndarray, steps: int, alpha: float = DEFAULT_VAR_ALPHA
+    ) -> tuple:
+        """Point forecasts with their ``1 - alpha`` normal bounds: ``(mean, lower, upper)``."""
+        mean = self.forecast(y, steps)
+        z = NormalDist().inv_cdf(1 - alpha / 2)
+        half = z * np.sqrt(np.diagonal(self.mse(steps), axis1=1, axis2=2))
+        return mean, mean - half, mean + half
+
+    def fevd(self, periods: int) -> np.ndarray:
+        """Variance decomposition ``(variable, horizon, shock)``; each row sums to one."""
+        contributions = np.cumsum(self.orth_ma_rep(periods - 1) ** 2, axis=0)
+        totals = np.diagonal(self.mse(periods), axis1=1, axis2=2)
+        return (contributions / totals[:, :, None]).transpose(1, 0, 2)
+
+
+def fit_var(values: np.ndarray, lags: int, names: Sequence[str] = VAR_COLUMNS) -> VarResults:
+    """OLS fit of a VAR(``lags``) with a constant: one ``lstsq`` solves every equation."""
+    targets, design = lagged_design(values, lags)
+    n_obs, n_vars = targets.shape
+    params, _, _, _ = np.linalg.lstsq(design, targets, rcond=None)
+    residuals = targets - design @ params
+    ssr = residuals.T @ residuals
+    df_resid = n_obs - design.shape[1]
+    if df_resid <= 0:
+        raise ValueError(f"{n_obs} observations are too few for a VAR({lags})")
+    return VarResults(
+        names=tuple(names),
+        intercept=params[0],
+        coefs=params[1:].reshape(lags, n_vars, n_vars).transpose(0, 2, 1),
+        sigma_u=ssr / df_resid,
+        sigma_u_mle=ssr / n_obs,
+        nobs=n_obs,
+    )
+
+
+def fit_var_model(df: pd.DataFrame, maxlags: int = DEFAULT_VAR_MAXLAGS) -> VarResults:
+    """
+    Fit a VAR model over oil and macroeconomic variables.
+
+    The lag order is the AIC choice of ``select_lag_order`` (the choice of
+    statsmodels' ``fit(maxlags, ic="aic")``), and the selected order is fitted
+    on all rows, as statsmodels does.
+    """
+    data = df[list(VAR_COLUMNS)].dropna()
     if data.empty:
         raise ValueError("No data available for VAR fit.")
-    if VAR is None:
-        warnings.warn(
-            "statsmodels not available; VAR running in fallback-no-statsmodels mode.",
-            RuntimeWarning,
-        )
-        LOGGER.warning("VAR execution mode: fallback-no-statsmodels")
-        # Fallback: pseudo-VAR summary based on lag-1 correlations.
-        lagged = data.shift(1).dropna()
-        aligned = data.iloc[1:]
-        corr = aligned.corrwith(lagged["log_return"]).fillna(0.0)
-        return {
-            "fallback": True,
-            "k_ar": 1,
-            "aic": float(np.nan),
-            "bic": float(np.nan),
-            "hqic": float(np.nan),
-            "params": {"lag1_log_return": corr.to_dict()},
-        }
-    model = VAR(data)
-    return model.fit(maxlags=maxlags, ic="aic")
-
-
-def summarize_var_results(result: Any) -> Dict[str, Any]:
+    values = data.to_numpy(dtype=float)
+    lag_order = select_lag_order(values, maxlags)["selected"]["aic"]
+    return fit_var(values, lag_order)
+
+
+def summarize_var_results(result: VarResults) -> Dict[str, Any]:
     """Build serializable summary from VAR results."""
-    if isinstance(result, dict) and result.get("fallback"):
-        return {
-            "lag_order": int(result["k_ar"]),
-            "selected_lag": int(result["k_ar"]),
-            "aic": None,
-            "bic": None,
-            "hqic": None,
-            "params": {
-                "log_return": {
-                    key: float(value) for key, value in result["params"]["lag1_log_return"].items()
-                }
-            },
-            "mode": "fallback-no-statsmodels",
-        }
-    LOGGER.info("VAR execution mode: full-statsmodels")
     return {
-        "mode": "full-statsmodels",
-        "lag_order": int(result.k_ar),
-        "selected_lag": int(result.k_ar),
-        "aic": float(result.aic),
-        "bic": float(result.bic),
-        "hqic": float(result.hqic),
+        "mode": "numpy-ols",
+        "lag_order": result.k_ar,
+        "selected_lag": result.k_ar,
+        "aic": result.aic,
+        "bic": result.bic,
+        "hqic": result.hqic,
         "params": {
-            key: {k: float(v) for k, v in row.items()}
-            for key, row in result.params.to_dict(orient="index").items()
+            key: {name: float(value) for name, value in zip(result.names, row)}
+            for key, row in zip(result.param_names, result.params)
         },
     }
 
@@ -0,0 +1,301 @@
+"""VAR fits with precomputed forecasts, impulse responses and FEVD, one per data version."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.constants import (
+    DEFAULT_VAR_ALPHA,
+    DEFAULT_VAR_MAXLAGS,
+    VAR_ARTIFACT_DIR,
+    VAR_ARTIFACT_KEEP,
+    VAR_FORECAST_STEPS,
+    VAR_IRF_PERIODS,
+)
+from src.data.json_values import float32_list
+from src.models.var_model import (
+    VAR_COLUMNS,
+    fit_var,
+    select_lag_order,
+    summarize_var_results,
+)
+
+# Modules whose source determines what the precomputed arrays contain.
+_VAR_SOURCES = ("var_model.py", "var_service.py")
+
+
+@lru_cache(maxsize=1)
+def _code_version() -> str:
+    digest = hashlib.sha256()
+    for name in _VAR_SOURCES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()
+
+
+def var_artifact_version(data_digest: str, maxlags: int = DEFAULT_VAR_MAXLAGS) -> str:
+    """Version of the VAR artifacts for a price file digest, lag grid and this code."""
+    digest = hashlib.sha256()
+    digest.update(data_digest.encode("utf-8"))
+    digest.update(str(maxlags).encode("utf-8"))
+    digest.update(_code_version().encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class VarArtifacts:
+    """
+    One fitted VAR and everything derived from it, as compact float32 arrays.
+
+    ``forecast``/``lower``/``upper`` are ``(steps, k)``; ``irf`` and
+    ``orth_irf`` are ``(periods + 1, response, impulse)``; ``fevd`` is
+    ``(variable, periods, shock)``, as in statsmodels.
+    """
+
+    version: str
+    meta: Dict[str, Any]
+    forecast: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    irf: np.ndarray
+    orth_irf: np.ndarray
+    fevd: np.ndarray
+
+    @property
+    def variables(self) -> List[str]:
+        return list(self.meta["variables"])
+
+    def variable_index(self, name: str) -> int:
+        try:
+            return self.variables.index(name)
+        except ValueError:
+            raise ValueError(f"Unknown VAR variable '{name}'") from None
+
+
+_ARRAYS = ("forecast", "lower", "upper", "irf", "orth_irf", "fevd")
+
+
+def build_var_artifacts(
+    frame: pd.DataFrame,
+    version: str,
+    maxlags: int = DEFAULT_VAR_MAXLAGS,
+    steps: int = VAR_FORECAST_STEPS,
+    periods: int = VAR_IRF_PERIODS,
+    alpha: float = DEFAULT_VAR_ALPHA,
+) -> VarArtifacts:
+    """Select the lag order, fit once and precompute forecasts, IRFs and FEVD."""
+    data = frame[["Date", *VAR_COLUMNS]].dropna()
+    values = data[list(VAR_COLUMNS)].to_numpy(dtype=float)
+    selection = select_lag_order(values, maxlags)
+    result = fit_var(values, selection["selected"]["aic"])
+    forecast, lower, upper = result.forecast_interval(values, steps, alpha=alpha)
+    last_date = pd.Timestamp(data["Date"].iloc[-1])
+    meta = {
+        "version": version,
+        **summarize_var_results(result),
+        "variables": list(VAR_COLUMNS),
+        "lag_selection": selection,
+        "nobs": result.nobs,
+        "sigma_u": result.sigma_u.tolist(),
+        "alpha": alpha,
+        "last_date": last_date.strftime("%Y-%m-%d"),
+        "forecast_dates": pd.bdate_range(last_date + pd.Timedelta(days=1), periods=steps)
+        .strftime("%Y-%m-%d")
+        .tolist(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    arrays = {
+        "forecast": forecast,
+        "lower": lower,
+        "upper": upper,
+        "irf": result.ma_rep(periods),
+        "orth_irf": result.orth_ma_rep(periods),
+        "fevd": result.fevd(periods),
+    }
+    return VarArtifacts(
+        version=version,
+        meta=meta,
+        **{name: np.asarray(array, dtype=np.float32) for name, array in arrays.items()},
+    )
+
+
+class VarArtifactStore:
+    """
+    Precomputed VAR artifacts on disk, one ``<version>.npz`` + ``<version>.json`` pair each.
+
+    The arrays are written first and the JSON last (each atomically), so a
+    version exists only once both are complete. Loaded versions are kept in
+    memory; ``get_or_build`` fits at most once per version per process. Only
+    the ``keep`` most recent versions are kept on disk.
+    """
+
+    def __init__(self, root: str = VAR_ARTIFACT_DIR, keep: int = VAR_ARTIFACT_KEEP) -> None:
+        self.root = Path(root)
+        self.keep = keep
+        self._loaded: Dict[str, VarArtifacts] = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, version: str) -> tuple:
+        return self.root / f"{version}.npz", self.root / f"{version}.json"
+
+    def versions(self) -> List[str]:
+        """Published versions, newest first."""
+        if not self.root.exists():
+            return []
+        published = list(self.root.glob("*.json"))
+        published.sort(key=lambda path: path.stat().st_mtime_ns, reverse=True)
+        return [path.stem for path in published]
+
+    def load(self, version: str) -> Optional[VarArtifacts]:
+        with self._lock:
+            artifacts = self._loaded.get(version)
+        if artifacts is not None:
+            return artifacts
+        arrays_path, meta_path = self._paths(version)
+        try:
+            with meta_path.open("r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+            with np.load(arrays_path) as arrays:
+                loaded = {name: arrays[name] for name in _ARRAYS}
+        except (OSError, ValueError, KeyError):
+            return None
+        artifacts = VarArtifacts(version=version, meta=meta, **loaded)
+        with self._lock:
+            self._loaded[version] = artifacts
+        return artifacts
+
+    def publish(self, artifacts: VarArtifacts) -> VarArtifacts:
+        self.root.mkdir(parents=True, exist_ok=True)
+        arrays_path, meta_path = self._paths(artifacts.version)
+        suffix = f".partial-{os.getpid()}-{threading.get_ident()}"
+        partial = arrays_path.with_name(arrays_path.name + suffix)
+        with partial.open("wb") as handle:
+            np.savez(handle, **{name: getattr(artifacts, name) for name in _ARRAYS})
+        os.replace(partial, arrays_path)
+        partial = meta_path.with_name(meta_path.name + suffix)
+        with partial.open("w", encoding="utf-8") as handle:
+            json.dump(artifacts.meta, handle)
+        os.replace(partial, meta_path)
+        with self._lock:
+            self._loaded[artifacts.version] = artifacts
+        self.prune(keep=artifacts.version)
+        return artifacts
+
+    def prune(self, keep: Optional[str] = None) -> List[str]:
+        """Remove all but the ``self.keep`` newest versions (never ``keep``)."""
+        removed: List[str] = []
+        for version in self.versions()[self.keep :]:
+            if version == keep:
+                continue
+            # The JSON goes first: without it the version no longer exists.
+            for path in reversed(self._paths(version)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            with self._lock:
+                self._loaded.pop(version, None)
+            removed.append(version)
+        return removed
+
+    def get_or_build(
+        self,
+        version: str,
+        load_frame: Any,
+        maxlags: int = DEFAULT_VAR_MAXLAGS,
+    ) -> VarArtifacts:
+        artifacts = self.load(version)
+        if artifacts is not None:
+            return artifacts
+        # One fit per version even when several requests miss at once.
+        with _build_lock(self.root, version):
+            artifacts = self.load(version)
+            if artifacts is None:
+                artifacts = self.publish(build_var_artifacts(load_frame(), version, maxlags))
+        return artifacts
+
+
+_build_locks: Dict[tuple, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+
+
+def _build_lock(root: Path, version: str) -> threading.Lock:
+    with _build_locks_guard:
+        return _build_locks.setdefault((str(root), version), threading.Lock())
+
+
+def forecast_payload(artifacts: VarArtifacts, steps: Optional[int] = None) -> Dict[str, Any]:
+    steps = len(artifacts.forecast) if steps is None else steps
+    if not 1 <= steps <= len(artifacts.forecast):
+        raise ValueError(f"steps must be between 1 and {len(artifacts.forecast)}")
+    return {
+        "dates": artifacts.meta["forecast_dates"][:steps],
+        "alpha": artifacts.meta["alpha"],
+        "forecast": {
+            name: {
+                "mean": float32_list(artifacts.forecast[:steps, col]),
+                "lower": float32_list(artifacts.lower[:steps, col]),
+                "upper": float32_list(artifacts.upper[:steps, col]),
+            }
+            for col, name in enumerate(artifacts.variables)
+        },
+    }
+
+
+def irf_payload(
+    artifacts: VarArtifacts,
+    impulse: Optional[str] = None,
+    responses: Optional[Sequence[str]] = None,
+    orthogonalized: bool = True,
+    periods: Optional[int] = None,
+) -> Dict[str, Any]:
+    irf = artifacts.orth_irf if orthogonalized else artifacts.irf
+    periods = len(irf) - 1 if periods is None else periods
+    if not 0 <= periods < len(irf):
+        raise ValueError(f"periods must be between 0 and {len(irf) - 1}")
+    impulses = [impulse] if impulse else artifacts.variables
+    responses = list(responses) if responses else artifacts.variables
+    index = artifacts.variable_index
+    return {
+        "orthogonalized": orthogonalized,
+        "periods": periods,
+        "irf": {
+            shock: {
+                name: float32_list(irf[: periods + 1, index(name), index(shock)])
+                for name in responses
+            }
+            for shock in impulses
+        },
+    }
+
+
+def fevd_payload(
+    artifacts: VarArtifacts,
+    variable: Optional[str] = None,
+    periods: Optional[int] = None,
+) -> Dict[str, Any]:
+    fevd = artifacts.fevd
+    periods = fevd.shape[1] if periods is None else periods
+    if not 1 <= periods <= fevd.shape[1]:
+        raise ValueError(f"periods must be between 1 and {fevd.shape[1]}")
+    variables = [variable] if variable else artifacts.variables
+    return {
+        "periods": periods,
+        "fevd": {
+            name: {
+                shock: float32_list(fevd[artifacts.variable_index(name), :periods, col])
+                for col, shock in enumerate(artifacts.variables)
+            }
+            for name in variables
+        },
+    }
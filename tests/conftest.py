@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _columnar_store_dir(tmp_path_factory, monkeypatch) -> None:
+    """Keep the columnar stores of test CSVs out of the repository's data cache."""
+    from src.data import columnar_store
+
+    monkeypatch.setattr(columnar_store, "STORE_DIR", tmp_path_factory.mktemp("columns"))
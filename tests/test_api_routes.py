@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import json
+import os
+import re
+import subprocess
 import sys
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+import pytest
+
 repo_root = Path(__file__).resolve().parents[1]
 backend_path = repo_root / "dashboard" / "backend"
 if str(backend_path) not in sys.path:
@@ -10,6 +18,21 @@ if str(backend_path) not in sys.path:
 
 from app import create_app  # noqa: E402
 
+# Cold-start budget for ``import app; create_app()``; flask and pandas alone take ~1 s.
+IMPORT_BUDGET_SECONDS = float(os.environ.get("DASHBOARD_IMPORT_BUDGET_SECONDS", "3.0"))
+# Stacks that must only be imported by the endpoints that use them.
+LAZY_MODULES = (
+    "arviz",
+    "matplotlib",
+    "numba",
+    "pymc",
+    "pytensor",
+    "scipy",
+    "shap",
+    "sklearn",
+    "statsmodels",
+)
+
 
 def test_api_health_and_prices() -> None:
     app = create_app()
@@ -26,6 +49,25 @@ def test_api_health_and_prices() -> None:
     assert payload["count"] >= 1
 
 
+def test_create_app_import_time_budget() -> None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app; app.create_app()"],
+        cwd=backend_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stderr.splitlines()
+    # Only what the app adds: everything after interpreter startup (``site``).
+    site = max(i for i, line in enumerate(lines) if re.search(r"\| site$", line))
+    pattern = re.compile(r"import time:\s*\d+ \|\s*(\d+) \|( +)(\S+)")
+    imported = [match for match in map(pattern.match, lines[site + 1 :]) if match]
+    heavy = sorted({match[3] for match in imported if match[3].split(".")[0] in LAZY_MODULES})
+    assert not heavy, f"create_app() imports {heavy[:10]}"
+    seconds = sum(int(match[1]) for match in imported if match[2] == " ") / 1e6
+    assert seconds <= IMPORT_BUDGET_SECONDS, f"create_app() imports took {seconds:.2f}s"
+
+
 def test_change_points_endpoint() -> None:
     app = create_app()
     client = app.test_client()
@@ -43,3 +85,324 @@ def test_shap_status_endpoint() -> None:
     payload = resp.get_json()
     assert "shap_available" in payload
     assert payload["mode"] in {"full", "fallback"}
+
+
+def test_posterior_endpoint_is_deterministic() -> None:
+    app = create_app()
+    client = app.test_client()
+    first = client.get("/api/change-points/posterior")
+    assert first.status_code == 200
+    assert first.get_json() == client.get("/api/change-points/posterior").get_json()
+    for tau in first.get_json().values():
+        assert tau["hdi_lower"] <= tau["hdi_upper"]
+        assert "posterior_mass" in tau
+
+
+def _price_client(tmp_path, monkeypatch):
+    from routes import prices
+
+    csv_path = tmp_path / "prices.csv"
+    pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2020-01-01", periods=25).strftime("%Y-%m-%d"),
+            "Price": [60.0 + i for i in range(25)],
+        }
+    ).to_csv(csv_path, index=False)
+    monkeypatch.setattr(prices, "DATA_PATH", csv_path)
+    return create_app().test_client()
+
+
+def test_prices_stream_pages_with_cursor(tmp_path, monkeypatch) -> None:
+    client = _price_client(tmp_path, monkeypatch)
+
+    full = client.get("/api/prices/").get_json()
+    assert full["count"] == 25 and full["next_cursor"] is None
+    assert full["data"][0] == {
+        "Date": "2020-01-01",
+        "Price": 60.0,
+        "log_price": pytest.approx(4.0943445622),
+        "log_return": None,
+    }
+
+    rows, cursor = [], None
+    while True:
+        query = "/api/prices/?limit=10" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(query).get_json()
+        rows += page["data"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert rows == full["data"]
+
+    ndjson = client.get("/api/prices/?limit=4&format=ndjson")
+    assert ndjson.mimetype == "application/x-ndjson"
+    assert ndjson.headers["X-Next-Cursor"] == full["data"][4]["Date"]
+    assert [json.loads(line) for line in ndjson.data.decode().splitlines()] == full["data"][:4]
+    assert client.get("/api/prices/?limit=0").status_code == 400
+
+    sampled = client.get("/api/prices/?max_points=10&downsample=minmax").get_json()
+    assert sampled["count"] <= 10
+    assert sampled["downsample"]["source_count"] == 25
+    assert sampled["data"][0] == full["data"][0] and sampled["data"][-1] == full["data"][-1]
+
+
+def test_prices_negotiate_columnar_formats(tmp_path, monkeypatch) -> None:
+    client = _price_client(tmp_path, monkeypatch)
+    records = client.get("/api/prices/?limit=5").get_json()
+
+    resp = client.get("/api/prices/?limit=5", headers={"Accept": "application/vnd.columns+json"})
+    assert resp.mimetype == "application/vnd.columns+json"
+    assert "Accept" in resp.headers["Vary"]
+    payload = json.loads(resp.data)
+    assert payload["count"] == 5 and payload["next_cursor"] == records["next_cursor"]
+    rows = [dict(zip(payload["columns"], values)) for values in zip(*payload["columns"].values())]
+    assert rows == records["data"]
+
+    # Unknown or unavailable types fall back to the default record JSON.
+    fallback = client.get("/api/prices/?limit=5", headers={"Accept": "text/csv"})
+    assert fallback.mimetype == "application/json" and fallback.get_json() == records
+
+
+def _record_columns(records: dict) -> dict:
+    rows = records["data"]
+    return {name: [row[name] for row in rows] for name in rows[0]}
+
+
+def test_prices_msgpack_format(tmp_path, monkeypatch) -> None:
+    import msgpack
+
+    client = _price_client(tmp_path, monkeypatch)
+    records = client.get("/api/prices/?limit=5").get_json()
+    resp = client.get("/api/prices/?limit=5", headers={"Accept": "application/x-msgpack"})
+    assert resp.mimetype == "application/msgpack"
+    payload = msgpack.unpackb(resp.data)
+    assert payload["columns"] == _record_columns(records)
+    assert payload["count"] == 5 and payload["next_cursor"] == records["next_cursor"]
+
+
+def test_prices_arrow_format(tmp_path, monkeypatch) -> None:
+    import pyarrow as pa
+
+    client = _price_client(tmp_path, monkeypatch)
+    records = client.get("/api/prices/?limit=5").get_json()
+    resp = client.get(
+        "/api/prices/?limit=5", headers={"Accept": "application/vnd.apache.arrow.stream"}
+    )
+    assert resp.mimetype == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(resp.data).read_all()
+    columns = table.to_pydict()
+    columns["Date"] = [day.isoformat() for day in columns["Date"]]
+    assert columns == _record_columns(records)
+    meta = json.loads(table.schema.metadata[b"meta"])
+    assert meta["count"] == 5 and meta["next_cursor"] == records["next_cursor"]
+
+
+def test_events_serve_missing_text_as_empty_strings(tmp_path, monkeypatch) -> None:
+    from routes import events
+
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text(
+        "event_name,start_date,category,description\n"
+        "Cut,2020-03-06,supply,OPEC+ talks fail\n"
+        ",2020-04-20,,\n"
+    )
+    monkeypatch.setattr(events, "EVENTS_PATH", csv_path)
+    client = create_app().test_client()
+
+    payload = client.get("/api/events/").get_json()
+    assert payload["events"] == [
+        {"date": "2020-04-20", "title": "", "description": "", "category": ""},
+        {
+            "date": "2020-03-06",
+            "title": "Cut",
+            "description": "OPEC+ talks fail",
+            "category": "supply",
+        },
+    ]
+
+
+def _events_client(tmp_path, monkeypatch):
+    from routes import events
+
+    events_path = tmp_path / "events.csv"
+    events_path.write_text("event_name,start_date\nCut,2020-01-15\n")
+    prices_path = tmp_path / "prices.csv"
+    pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2020-01-01", periods=25).strftime("%Y-%m-%d"),
+            "Price": [60.0 + i for i in range(25)],
+        }
+    ).to_csv(prices_path, index=False)
+    monkeypatch.setattr(events, "EVENTS_PATH", events_path)
+    monkeypatch.setattr(events, "PRICES_PATH", prices_path)
+    return create_app().test_client()
+
+
+def test_event_impact_rejects_an_empty_window_list(tmp_path, monkeypatch) -> None:
+    client = _events_client(tmp_path, monkeypatch)
+    assert client.get("/api/events/impact?windows=7").status_code == 200
+    resp = client.get("/api/events/impact?windows=,")
+    assert resp.status_code == 400
+    assert "At least one" in resp.get_json()["error"]
+
+
+def test_event_correlation_validates_event_date(tmp_path, monkeypatch) -> None:
+    client = _events_client(tmp_path, monkeypatch)
+    found = client.get("/api/events/correlation?event_date=2020-01-15&window=5")
+    assert found.status_code == 200
+    assert found.get_json()["event"] == {"date": "2020-01-15", "title": "Cut"}
+    assert client.get("/api/events/correlation?event_date=2020-01-16").status_code == 404
+    for bad in ("not-a-date", "2020/01/15"):
+        resp = client.get(f"/api/events/correlation?event_date={bad}")
+        assert resp.status_code == 400 and "YYYY-MM-DD" in resp.get_json()["error"]
+    assert client.get("/api/events/correlation?event_date=2020-01-15&window=x").status_code == 400
+
+
+def _stored_shap_client(tmp_path, monkeypatch):
+    from routes import change_points
+
+    from src.models.explainability import ShapExplanation
+    from src.models.shap_artifacts import ShapArtifactStore
+
+    dates = pd.bdate_range("2021-01-01", periods=6).to_numpy(dtype="datetime64[ns]")
+    values = np.arange(18, dtype=float).reshape(6, 3) / 100
+    store = ShapArtifactStore(str(tmp_path / "shap"))
+    store.publish(
+        "v1",
+        ShapExplanation(
+            dates=dates,
+            features=np.ones((6, 3)),
+            values=values,
+            feature_names=("GDP", "Inflation", "ExchangeRate"),
+            base_value=0.5,
+            global_importance=np.ones(3),
+            mode="full",
+        ),
+    )
+    monkeypatch.setattr(change_points, "_shap_store", store)
+    monkeypatch.setattr(change_points, "_shap_version", lambda: ("v1", "digest"))
+    return create_app().test_client()
+
+
+def test_shap_local_explanations_from_stored_matrix(tmp_path, monkeypatch) -> None:
+    client = _stored_shap_client(tmp_path, monkeypatch)
+
+    # 2021-01-02 is a Saturday: the lookup falls back to Friday's row.
+    single = client.get("/api/change-points/shap/local?date=2021-01-02").get_json()
+    assert single["dates"] == ["2021-01-01"]
+    assert single["shap_values"] == {"GDP": [0.0], "Inflation": [0.01], "ExchangeRate": [0.02]}
+    assert single["prediction"] == [0.53]
+
+    ranged = client.get(
+        "/api/change-points/shap/local?start_date=2021-01-05&end_date=2021-01-07"
+    ).get_json()
+    assert ranged["dates"] == ["2021-01-05", "2021-01-06", "2021-01-07"]
+    assert ranged["shap_values"]["GDP"] == [0.06, 0.09, 0.12]
+
+    assert client.get("/api/change-points/shap/local?date=2020-12-31").status_code == 404
+    assert client.get("/api/change-points/shap/local?date=31/12/2020").status_code == 400
+
+
+def test_shap_charts_are_data_with_etag_cached_plot_files(tmp_path, monkeypatch) -> None:
+    client = _stored_shap_client(tmp_path, monkeypatch)
+    payload = client.get("/api/change-points/shap?selected_date=2021-01-04").get_json()
+    assert "global_plot_b64" not in payload
+    assert payload["global_chart"]["labels"] == ["GDP", "Inflation", "ExchangeRate"]
+    assert payload["local_chart"]["values"] == pytest.approx([0.03, 0.04, 0.05])
+    assert payload["local_plot_url"] == "/api/change-points/shap/plots/v1/local/2021-01-04.png"
+
+    plot = client.get(payload["local_plot_url"])
+    assert plot.status_code == 200 and plot.mimetype == "image/png"
+    assert plot.data.startswith(b"\x89PNG")
+    cached = client.get(payload["local_plot_url"], headers={"If-None-Match": plot.headers["ETag"]})
+    assert cached.status_code == 304
+
+    assert client.get(payload["global_plot_url"]).status_code == 200
+    assert client.get("/api/change-points/shap/plots/v1/local/2020-12-31.png").status_code == 404
+    assert client.get("/api/change-points/shap/plots/v2/global.png").status_code == 404
+
+
+def test_change_point_events_attributes_nearest_events(tmp_path, monkeypatch) -> None:
+    from routes import change_points
+
+    events_path = tmp_path / "events.csv"
+    pd.DataFrame(
+        {
+            "date": ["2020-02-20", "2020-03-05", "2020-05-01", "", "2019-01-01"],
+            "event": ["Cut", "Sanctions", "Storm", "Undated", "Old"],
+            "category": ["OPEC", "Geopolitics", "Weather", "", "OPEC"],
+        }
+    ).to_csv(events_path, index=False)
+    monkeypatch.setattr(change_points, "EVENTS_PATH", events_path)
+    monkeypatch.setattr(
+        change_points,
+        "_load_change_point_results",
+        lambda: {"change_points": [{"name": "cp_1", "tau_date": "2020-03-01"}]},
+    )
+    client = create_app().test_client()
+
+    payload = client.get("/api/change-points/events?tolerance_days=30&limit=2").get_json()
+    (cp,) = payload["change_points"]
+    assert cp["name"] == "cp_1"
+    assert [(e["title"], e["offset_days"]) for e in cp["events"]] == [("Sanctions", 4), ("Cut", -10)]
+    assert cp["events"][0]["date"] == "2020-03-05"
+
+    wide = client.get("/api/change-points/events?tolerance_days=500&limit=10").get_json()
+    assert [e["title"] for e in wide["change_points"][0]["events"]] == ["Sanctions", "Cut", "Storm", "Old"]
+    assert client.get("/api/change-points/events?limit=0").status_code == 400
+
+
+def test_var_endpoints_serve_precomputed_artifacts(tmp_path, monkeypatch) -> None:
+    from routes import var
+    from src.models.var_service import VarArtifactStore
+
+    csv_path = tmp_path / "prices.csv"
+    pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2020-01-01", periods=200).strftime("%Y-%m-%d"),
+            "Price": 60.0 * np.exp(np.random.default_rng(5).normal(0, 0.02, 200).cumsum()),
+        }
+    ).to_csv(csv_path, index=False)
+    monkeypatch.setattr(var, "PRICES_PATH", csv_path)
+    monkeypatch.setattr(var, "_var_store", VarArtifactStore(str(tmp_path / "var")))
+    client = create_app().test_client()
+
+    summary = client.get("/api/var/").get_json()
+    assert summary["mode"] == "numpy-ols"
+    assert (tmp_path / "var" / f"{summary['version']}.npz").exists()
+    lag_order = client.get("/api/var/lag-order").get_json()
+    assert lag_order["selected"]["aic"] == summary["lag_order"]
+
+    forecast = client.get("/api/var/forecast?steps=3").get_json()
+    assert forecast["version"] == summary["version"] and len(forecast["dates"]) == 3
+    irf = client.get("/api/var/irf?impulse=GDP&response=log_return&orth=false").get_json()
+    assert irf["orthogonalized"] is False and list(irf["irf"]["GDP"]) == ["log_return"]
+    assert set(client.get("/api/var/fevd?variable=GDP").get_json()["fevd"]) == {"GDP"}
+
+    assert client.get("/api/var/forecast?steps=99").status_code == 400
+    assert client.get("/api/var/irf?impulse=Brent").status_code == 400
+
+
+def test_refresh_status_is_shared_between_workers(tmp_path, monkeypatch) -> None:
+    from routes import change_points
+    from src.models.job_state import JobMarker
+
+    state_path = tmp_path / "refresh.job.json"
+    monkeypatch.setattr(change_points, "REFRESH_STATE_PATH", state_path)
+    monkeypatch.setattr(change_points, "_load_prices", lambda: pd.DataFrame())
+    client = create_app().test_client()
+    assert client.get("/api/change-points/refresh").get_json()["status"] == "idle"
+
+    # Another worker claimed the refit: this one reports it and refuses a second.
+    other = JobMarker(str(state_path))
+    assert other.claim()[0]
+    other.update(status="running")
+    response = client.post("/api/change-points/refresh")
+    assert response.status_code == 409 and response.get_json()["status"] == "running"
+    assert client.get("/api/change-points/refresh").get_json()["status"] == "running"
+
+    other.update(status="completed")
+    started = []
+    monkeypatch.setattr(change_points, "_run_refresh", lambda prices: started.append(prices))
+    response = client.post("/api/change-points/refresh")
+    assert response.status_code == 202 and response.get_json()["status"] == "running"
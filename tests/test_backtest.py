@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.backtest import _detect, backtest_windows, break_stability
+
+
+def test_backtest_windows_expanding_and_rolling() -> None:
+    assert backtest_windows(100, "expanding", window=50, step=20, horizon=10) == [
+        (0, 50, 60),
+        (0, 70, 80),
+        (0, 90, 100),
+    ]
+    assert backtest_windows(100, "rolling", window=50, step=20, horizon=10) == [
+        (0, 50, 60),
+        (20, 70, 80),
+        (40, 90, 100),
+    ]
+    with pytest.raises(ValueError):
+        backtest_windows(100, "sliding")
+
+
+def test_break_stability_counts_only_covering_windows() -> None:
+    windows = [
+        {
+            "train_start": "2020-01-01",
+            "train_end": "2020-06-30",
+            "change_point_dates": ["2020-03-10"],
+        },
+        {
+            "train_start": "2020-01-01",
+            "train_end": "2020-12-31",
+            "change_point_dates": ["2020-08-01"],
+        },
+        {
+            "train_start": "2020-01-01",
+            "train_end": "2021-06-30",
+            "change_point_dates": ["2020-03-01", "2020-09-01"],
+        },
+    ]
+    first, second = break_stability(windows, tolerance_days=15)
+    # The last (reference) window is not counted: it always finds its own breaks.
+    assert first["windows_covering"] == 2 and first["detection_rate"] == 0.5
+    assert first["mean_offset_days"] == pytest.approx(9.0)
+    # The first window ends before 2020-09-01; the second misses it by 31 days.
+    assert second["windows_covering"] == 1 and second["detection_rate"] == 0.0
+    assert break_stability(windows[-1:])[0]["detection_rate"] is None
+
+
+def test_backtest_checkpoints_and_resumes(tmp_path) -> None:
+    pytest.importorskip("pymc")
+    from src.models.backtest import run_backtest
+
+    rng = np.random.default_rng(5)
+    n = 400
+    returns = np.concatenate([rng.normal(0, 0.01, n // 2), rng.normal(0, 0.04, n // 2)])
+    prices = pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2015-01-01", periods=n),
+            "Price": 60 * np.exp(np.cumsum(returns)),
+            "log_return": returns,
+        }
+    )
+    options = dict(
+        scheme="rolling",
+        window=250,
+        step=50,
+        horizon=20,
+        n_change_points=1,
+        max_workers=2,
+        checkpoint_dir=str(tmp_path / "checkpoints"),
+        report_path=str(tmp_path / "backtest.json"),
+    )
+    report = run_backtest(prices, **options)
+    assert report["n_windows"] == 3 and report["resumed_windows"] == 0
+    assert all(len(window["change_point_dates"]) == 1 for window in report["windows"])
+    assert report["forecast"]["windows_scored"] == 3
+    assert (tmp_path / "backtest.json").exists()
+
+    resumed = run_backtest(prices, **options)
+    assert resumed["resumed_windows"] == 3
+    assert resumed["windows"] == report["windows"]
+
+
+def test_bayesian_windows_use_their_core_share_and_no_shared_cache(tmp_path, monkeypatch) -> None:
+    pytest.importorskip("pymc")
+    from src.models import bayesian_change_point
+
+    calls = []
+    monkeypatch.setattr(
+        bayesian_change_point,
+        "run_change_point_pipeline",
+        lambda train, **kwargs: calls.append(kwargs) or {"change_points": []},
+    )
+    posterior_path = str(tmp_path / "window_0000.nc")
+    _detect(pd.DataFrame(), "bayesian", 2, None, posterior_path, cores=3)
+    (kwargs,) = calls
+    assert kwargs["use_cache"] is False and kwargs["cores"] == 3
+    assert kwargs["posterior_path"] == posterior_path
+    assert kwargs["config"].n_change_points == 2
+
+
+def test_failed_window_is_recorded_and_not_checkpointed(tmp_path) -> None:
+    pytest.importorskip("pymc")
+    from src.models.backtest import run_backtest
+
+    rng = np.random.default_rng(11)
+    n = 320
+    returns = rng.normal(0, 0.02, n)
+    prices = pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2015-01-01", periods=n),
+            "Price": 60 * np.exp(np.cumsum(returns)),
+            "log_return": returns,
+        }
+    )
+    options = dict(
+        window=120,
+        step=180,
+        horizon=20,
+        # Six breaks need at least 210 rows at the 30-row minimum segment.
+        n_change_points=6,
+        max_workers=1,
+        checkpoint_dir=str(tmp_path / "checkpoints"),
+        report_path=None,
+    )
+    report = run_backtest(prices, **options)
+    short, full = report["windows"]
+    assert report["failed_windows"] == 1
+    assert short["error"].startswith("ValueError") and "forecast" not in short
+    assert len(full["change_point_dates"]) == 6
+    assert report["forecast"]["windows_scored"] == 1
+    # Only the reference window succeeded, so no earlier window can confirm its breaks.
+    assert all(row["windows_covering"] == 0 for row in report["break_stability"])
+    checkpoints = sorted(path.name for path in (tmp_path / "checkpoints").glob("*/*.json"))
+    assert checkpoints == ["window_0001.json"]
+
+    resumed = run_backtest(prices, **options)
+    assert resumed["resumed_windows"] == 1 and resumed["failed_windows"] == 1
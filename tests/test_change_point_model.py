@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import itertools
+
 import numpy as np
 import pytest
 
@@ -7,7 +9,12 @@ from src.analysis.impact_quantification import quantify_mean_shift
 
 pymc = pytest.importorskip("pymc")
 pytest.importorskip("arviz")
-from src.models.bayesian_change_point import build_change_point_model
+from src.models.bayesian_change_point import (
+    build_change_point_model,
+    build_marginalized_change_point_model,
+    marginal_change_point_loglik,
+    sample_change_point_locations,
+)
 
 
 def test_build_change_point_model_supports_multiple_breaks() -> None:
@@ -19,6 +26,78 @@ def test_build_change_point_model_supports_multiple_breaks() -> None:
     assert "sigma_regimes" in var_names
 
 
+def test_marginalized_model_samples_only_continuous_parameters() -> None:
+    returns = np.random.normal(0, 0.01, 120)
+    model = build_marginalized_change_point_model(returns, n_change_points=2)
+    assert {rv.name for rv in model.free_RVs} == {"mu_regimes", "sigma_regimes"}
+
+
+@pytest.mark.parametrize("n_change_points", [2, 3])
+def test_marginal_loglik_matches_enumeration_over_taus(n_change_points) -> None:
+    # tau is the sorted draw of iid uniform locations, as in the discrete model.
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0, 1, 10)
+    mu = np.array([-0.3, 0.1, 0.4, -0.2])[: n_change_points + 1]
+    sigma = np.array([0.8, 1.2, 1.5, 0.9])[: n_change_points + 1]
+    t_index = np.arange(len(returns))
+    log_liks = []
+    for taus in itertools.product(range(1, len(returns) - 1), repeat=n_change_points):
+        regime = np.sum(t_index[:, None] > np.sort(taus), axis=1)
+        log_liks.append(
+            np.sum(
+                -0.5 * np.log(2 * np.pi * sigma[regime] ** 2)
+                - (returns - mu[regime]) ** 2 / (2 * sigma[regime] ** 2)
+            )
+        )
+    expected = np.logaddexp.reduce(log_liks) - np.log(len(log_liks))
+    actual = marginal_change_point_loglik(returns, mu, sigma, n_change_points).eval()
+    assert np.isclose(actual, expected)
+
+
+def test_marginal_loglik_gradient_matches_numpy_reference() -> None:
+    from src.models.bayesian_change_point import (
+        _expected_regime_stats,
+        _expected_regime_stats_numpy,
+        _prefix_stats,
+    )
+
+    prefix = _prefix_stats(np.random.default_rng(2).normal(0, 1, 40))
+    mu = np.array([-0.3, 0.1, 0.4, -0.2])
+    sigma = np.array([0.8, 1.2, 1.5, 0.9])
+    compiled = _expected_regime_stats(prefix, mu, sigma)
+    reference = _expected_regime_stats_numpy(prefix, mu, sigma)
+    assert compiled[0] == pytest.approx(reference[0])
+    np.testing.assert_allclose(compiled[1], reference[1], rtol=1e-9)
+    np.testing.assert_allclose(compiled[1].sum(axis=1), prefix[:, -1])
+
+
+def test_sampled_taus_follow_the_tie_weighted_prior() -> None:
+    # With flat regimes the posterior over tau is the prior: sorted iid uniform
+    # locations, so ties have probability 1 / n_positions for two breaks.
+    returns = np.random.default_rng(4).normal(0, 1, 12)
+    taus = sample_change_point_locations(
+        returns,
+        mu_samples=np.zeros((20000, 3)),
+        sigma_samples=np.ones((20000, 3)),
+        random_seed=1,
+    )
+    assert np.all(np.diff(taus, axis=1) >= 0)
+    assert np.mean(taus[:, 0] == taus[:, 1]) == pytest.approx(1 / 10, abs=0.01)
+
+
+def test_sample_change_point_locations_recovers_break() -> None:
+    rng = np.random.default_rng(1)
+    returns = np.concatenate([rng.normal(0, 0.01, 200), rng.normal(0.01, 0.05, 200)])
+    taus = sample_change_point_locations(
+        returns,
+        mu_samples=np.tile([0.0, 0.01], (50, 1)),
+        sigma_samples=np.tile([0.01, 0.05], (50, 1)),
+        random_seed=0,
+    )
+    assert taus.shape == (50, 1)
+    assert abs(np.median(taus) - 199) <= 5
+
+
 class _Posterior:
     def __init__(self) -> None:
         self._data = {"mu_regimes": type("V", (), {"values": np.array([[[0.1, 0.4]]])})()}
@@ -38,3 +117,105 @@ def test_quantify_mean_shift_with_multi_regime_trace() -> None:
     out = quantify_mean_shift(_Trace())
     assert out["mean_before"] == 0.1
     assert out["mean_after"] == 0.4
+
+
+def test_tau_bounds_narrow_the_discrete_prior() -> None:
+    returns = np.random.normal(0, 0.01, 120)
+    model = build_change_point_model(
+        returns, n_change_points=2, tau_bounds=(np.array([20, 70]), np.array([40, 90]))
+    )
+    initial = model.initial_point()
+    assert list(initial["tau_raw"]) == [30, 80]
+
+
+def test_warm_start_sampler_reuses_previous_posterior() -> None:
+    from src.models.model_utils import warm_start_sampler
+
+    az = pytest.importorskip("arviz")
+    returns = np.random.default_rng(3).normal(0, 0.01, 200)
+    model = build_marginalized_change_point_model(returns, n_change_points=1)
+    mu = np.random.default_rng(4).normal(0.0, 0.001, (2, 50, 2))
+    sigma = np.abs(np.random.default_rng(5).normal(0.01, 0.001, (2, 50, 2)))
+    previous = az.from_dict(
+        posterior={"mu_regimes": mu, "sigma_regimes": sigma},
+        sample_stats={"step_size": np.full((2, 50), 0.3)},
+    )
+    step, initvals = warm_start_sampler(model, previous, chains=3)
+    assert len(initvals) == 3
+    np.testing.assert_allclose(initvals[2]["mu_regimes"], mu[0, -1])
+    assert step.step_size == pytest.approx(0.3)
+    assert warm_start_sampler(
+        build_marginalized_change_point_model(returns, n_change_points=2), previous, chains=1
+    ) is None
+
+
+def test_warm_start_sampler_rejects_draws_outside_tau_bounds() -> None:
+    from src.models.model_utils import warm_start_sampler
+
+    az = pytest.importorskip("arviz")
+    returns = np.random.default_rng(3).normal(0, 0.01, 120)
+    bounds = (np.array([20, 70]), np.array([40, 90]))
+    model = build_change_point_model(returns, n_change_points=2, tau_bounds=bounds)
+    posterior = {
+        "mu_regimes": np.zeros((1, 10, 3)),
+        "sigma_regimes": np.full((1, 10, 3), 0.01),
+    }
+    stats = {"step_size": np.full((1, 10), 0.3)}
+    inside = az.from_dict(
+        posterior={**posterior, "tau_raw": np.full((1, 10, 2), [30, 80])}, sample_stats=stats
+    )
+    assert warm_start_sampler(model, inside, chains=1) is not None
+    # The new PELT window moved: the previous last tau_raw draw is outside it.
+    outside = az.from_dict(
+        posterior={**posterior, "tau_raw": np.full((1, 10, 2), [50, 80])}, sample_stats=stats
+    )
+    assert warm_start_sampler(model, outside, chains=1) is None
+
+
+def test_warm_fit_that_cannot_start_is_redone_cold(monkeypatch) -> None:
+    from pymc.exceptions import SamplingError
+
+    from src.config import ModelConfig
+    from src.models import bayesian_change_point
+
+    az = pytest.importorskip("arviz")
+    calls = []
+
+    def run_mcmc(model, **kwargs):
+        calls.append("warm" if "step" in kwargs else "cold")
+        if "step" in kwargs:
+            raise SamplingError("Initial evaluation of model at starting point failed!")
+        return az.from_dict(posterior={"mu_regimes": np.zeros((1, 5, 2))})
+
+    monkeypatch.setattr(bayesian_change_point, "run_mcmc", run_mcmc)
+    monkeypatch.setattr(bayesian_change_point, "warm_start_sampler", lambda *args: (None, [{}]))
+    trace = bayesian_change_point.fit_change_point_model(
+        np.random.default_rng(3).normal(0, 0.01, 120),
+        ModelConfig(n_change_points=1, warm_start=True),
+        previous=object(),
+    )
+    assert calls == ["warm", "cold"]
+    assert trace.posterior.attrs["warm_start"] == "warm-failed"
+
+
+def test_summarize_change_points_reports_posterior_quantities() -> None:
+    import pandas as pd
+
+    from src.models.model_utils import hdi_bounds, summarize_change_points
+
+    rng = np.random.default_rng(6)
+    dates = pd.Series(pd.date_range("2020-01-01", periods=100, freq="D"))
+    taus = np.column_stack([rng.integers(28, 33, 400), rng.integers(60, 62, 400)])
+    mu = rng.normal([0.0, 0.02, -0.01], 0.001, (400, 3))
+    sigma = np.abs(rng.normal([0.01, 0.03, 0.02], 0.001, (400, 3)))
+    summary = summarize_change_points(dates, taus, mu, sigma)
+
+    first = summary["change_points"][0]
+    assert 28 <= first["hdi_lower"] <= first["tau_index"] <= first["hdi_upper"] <= 32
+    assert sum(entry["probability"] for entry in first["posterior_mass"]) == pytest.approx(1.0)
+    assert len(summary["change_points"][1]["posterior_mass"]) == 2
+    assert summary["business_impact"][0]["prob_mean_increase"] == 1.0
+    assert summary["business_impact"][1]["prob_volatility_increase"] == 0.0
+    assert summary["regimes"][0]["mu"] == pytest.approx(mu[:, 0].mean())
+    lower, upper = hdi_bounds(np.arange(100.0)[:, None], 0.9)
+    assert (lower[0], upper[0]) == (0.0, 90.0)
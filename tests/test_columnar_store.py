@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data.columnar_store import _open_tables, event_table, price_table
+
+
+def _write_prices(path, prices) -> None:
+    rows = "".join(f"2020-01-{day:02d},{price}\n" for day, price in enumerate(prices, start=1))
+    path.write_text("Date,Price\n" + rows)
+
+
+def test_price_table_is_typed_mapped_and_rebuilt_on_change(tmp_path) -> None:
+    csv = tmp_path / "prices.csv"
+    _write_prices(csv, [10.0, 11.0, 12.0])
+
+    table = price_table(str(csv))
+    assert table["Date"].dtype == np.dtype("datetime64[ns]")
+    assert isinstance(table["Price"], np.memmap)
+    assert not table["Price"].flags.writeable
+    assert {"log_price", "log_return"} <= set(table.columns)
+
+    # A touch without a content change keeps the converted columns.
+    os.utime(csv, ns=(1, 1))
+    assert price_table(str(csv)).directory == table.directory
+
+    _write_prices(csv, [10.0, 11.0, 12.0, 13.0])
+    rebuilt = price_table(str(csv))
+    assert len(rebuilt) == 4
+    assert rebuilt.digest != table.digest
+    assert np.shares_memory(rebuilt.to_frame()["Price"].to_numpy(), rebuilt["Price"])
+
+
+def test_event_table_parses_dates_and_keeps_missing_text(tmp_path) -> None:
+    csv = tmp_path / "events.csv"
+    csv.write_text("event_name,start_date,category\nA,2020-04-22,supply\nB,not a date,\n")
+    frame = event_table(str(csv)).to_frame()
+    assert frame["start_date"].dtype == np.dtype("datetime64[ns]")
+    assert frame["start_date"].isna().tolist() == [False, True]
+    assert frame["category"].tolist()[0] == "supply" and pd.isna(frame["category"][1])
+    # A second process maps the stored columns rather than converting again.
+    _open_tables.clear()
+    mapped = event_table(str(csv)).to_frame()
+    assert mapped["category"].tolist()[0] == "supply" and pd.isna(mapped["category"][1])
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["events.csv"]
+
+
+def test_price_snapshot_shares_read_only_arrays(tmp_path) -> None:
+    from src.data.price_snapshot import load_price_snapshot
+
+    csv = tmp_path / "prices.csv"
+    _write_prices(csv, np.linspace(10.0, 20.0, 25) + np.sin(np.arange(25)))
+    snapshot = load_price_snapshot(str(csv), window=5)
+    expected = pd.Series(snapshot.log_return).rolling(window=5).std().to_numpy()
+    np.testing.assert_allclose(snapshot.volatility, expected, equal_nan=True)
+    assert not snapshot.volatility.flags.writeable
+    again = load_price_snapshot(str(csv), window=5)
+    assert np.shares_memory(again.price, snapshot.price)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.analysis import downsample
+from src.analysis.downsample import downsample_indices, lttb_indices, minmax_indices
+
+
+def _reference_lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    def edge(bucket: int) -> int:
+        # floor(bucket * every) + 1 with every = (n - 2) / (max_points - 2), in exact arithmetic.
+        return bucket * (len(x) - 2) // (max_points - 2) + 1
+
+    anchor, picks = 0, [0]
+    for bucket in range(max_points - 2):
+        lo = edge(bucket + 1)
+        hi = min(edge(bucket + 2), len(x))
+        avg_x, avg_y = x[lo:hi].mean(), y[lo:hi].mean()
+        start = edge(bucket)
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:lo] - y[anchor])
+            - (x[anchor] - x[start:lo]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        picks.append(anchor)
+    return np.array(picks + [len(x) - 1])
+
+
+def test_lttb_matches_reference_implementation(monkeypatch) -> None:
+    rng = np.random.default_rng(0)
+    x = np.arange(2000, dtype=float)
+    y = np.cumsum(rng.normal(size=2000))
+    for max_points in (3, 50, 700):
+        expected = _reference_lttb(x, y, max_points)
+        np.testing.assert_array_equal(lttb_indices(x, y, max_points), expected)
+    assert len(lttb_indices(x, y, 5000)) == 2000
+
+    monkeypatch.setattr(downsample, "_lttb_kernel", downsample._lttb_numpy)
+    np.testing.assert_array_equal(lttb_indices(x, y, 700), _reference_lttb(x, y, 700))
+
+
+def test_minmax_keeps_extremes_and_skips_missing_values() -> None:
+    rng = np.random.default_rng(1)
+    y = np.cumsum(rng.normal(size=3000))
+    picks = minmax_indices(y, 100)
+    assert len(picks) <= 100 and np.all(np.diff(picks) > 0)
+    assert {0, 2999, int(np.argmin(y)), int(np.argmax(y))} <= set(picks.tolist())
+
+    y[10:40] = np.nan
+    for method in downsample.DOWNSAMPLE_METHODS:
+        picks = downsample_indices(np.arange(3000), y, 100, method)
+        assert len(picks) <= 100 and np.isfinite(y[picks]).all()
+    with pytest.raises(ValueError):
+        downsample_indices(np.arange(3000), y, 100, "every_nth")
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.event_impact import batch_event_impact
+from src.analysis.time_index import TimeIndex
+
+
+def _series(n_obs: int = 400):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-01", periods=n_obs)
+    price = 50.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n_obs)))
+    log_return = np.concatenate([[np.nan], np.diff(np.log(price))])
+    return dates, price, log_return
+
+
+def test_batch_event_impact_matches_per_event_masks() -> None:
+    dates, price, log_return = _series()
+    index = TimeIndex(dates, {"Price": price, "log_return": log_return})
+    events = pd.to_datetime(["2015-06-10", "2015-01-03", "2016-02-29"])
+    impact = batch_event_impact(index, events, windows=(7, 30))
+    assert impact["percent_change"].shape == (3, 2)
+
+    prices = pd.Series(price, index=dates)
+    returns = pd.Series(log_return, index=dates)
+    for row, event in enumerate(events):
+        for col, days in enumerate((7, 30)):
+            before = (dates >= event - pd.Timedelta(days=days)) & (dates < event)
+            after = (dates > event) & (dates <= event + pd.Timedelta(days=days))
+            expected = (prices[after].mean() - prices[before].mean()) / prices[before].mean() * 100
+            assert impact["percent_change"][row, col] == pytest.approx(expected, nan_ok=True)
+            vol_change = returns[after].std() - returns[before].std()
+            assert impact["volatility_change"][row, col] == pytest.approx(vol_change, nan_ok=True)
+            abnormal = returns[after].sum() - returns[before].mean() * returns[after].count()
+            assert impact["abnormal_return"][row, col] == pytest.approx(abnormal, nan_ok=True)
+
+
+def test_batch_event_impact_handles_missing_dates_and_bad_windows() -> None:
+    dates, price, log_return = _series(50)
+    index = TimeIndex(dates, {"Price": price, "log_return": log_return})
+    impact = batch_event_impact(index, pd.to_datetime(["2015-01-20", None]))
+    assert np.isfinite(impact["percent_change"][0, 0])
+    assert np.isnan(impact["percent_change"][1, 0])
+    assert impact["n_before"][1, 0] == 0
+    with pytest.raises(ValueError):
+        batch_event_impact(index, pd.to_datetime(["2015-01-20"]), windows=(0,))
+    with pytest.raises(ValueError, match="At least one"):
+        batch_event_impact(index, pd.to_datetime(["2015-01-20"]), windows=())
@@ -15,3 +15,50 @@ def test_map_taus_to_dates_multiple() -> None:
     df = pd.DataFrame({"Date": pd.date_range("2020-01-01", periods=10)})
     mapped = map_taus_to_dates(df, [1, 5])
     assert mapped == ["2020-01-02", "2020-01-06"]
+
+
+def test_time_index_windows_match_boolean_masks() -> None:
+    import numpy as np
+
+    from src.analysis.time_index import TimeIndex
+
+    dates = pd.date_range("2020-01-01", periods=40, freq="2D")
+    price = np.arange(40.0)
+    price[5] = np.nan
+    index = TimeIndex(dates, {"Price": price})
+    start, end = pd.Timestamp("2020-01-05"), pd.Timestamp("2020-02-10")
+
+    rows = index.slice(start, end)
+    assert list(dates[rows]) == list(dates[(dates >= start) & (dates <= end)])
+    lo, hi = index.bounds([start, end], [end, end + pd.Timedelta(days=9)], closed="left")
+    means = index.window_mean("Price", lo, hi)
+    mask = (dates >= start) & (dates < end)
+    assert means[0] == np.nanmean(price[mask])
+    assert index.window_count("Price", lo, hi)[0] == mask.sum() - 1
+
+
+def test_map_tau_samples_to_dates_is_vectorized_and_clipped() -> None:
+    import numpy as np
+
+    from src.analysis.event_mapping import map_tau_samples_to_dates
+
+    df = pd.DataFrame({"Date": pd.date_range("2020-01-01", periods=10)})
+    dates = map_tau_samples_to_dates(df, np.array([[0, 3], [9, 42], [-1, 5]]))
+    assert dates.dtype == np.dtype("datetime64[ns]") and dates.shape == (3, 2)
+    assert np.datetime_as_string(dates, unit="D").tolist() == [
+        ["2020-01-01", "2020-01-04"],
+        ["2020-01-10", "2020-01-10"],
+        ["2020-01-01", "2020-01-06"],
+    ]
+
+
+def test_nearest_events_within_tolerance() -> None:
+    from src.analysis.event_mapping import nearest_events
+
+    events = ["2020-02-20", "2020-03-05", "2020-05-01", None, "2020-03-01", "2020-06-10"]
+    owner, event, offset = nearest_events(
+        ["2020-03-01", "2020-06-01", "2021-01-01"], events, tolerance_days=40, limit=2
+    )
+    assert owner.tolist() == [0, 0, 1, 1]
+    assert event.tolist() == [4, 1, 5, 2]
+    assert offset.tolist() == [0.0, 4.0, 9.0, -31.0]
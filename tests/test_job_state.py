@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import sys
+
+from src.models.job_state import JobMarker
+
+
+def test_only_the_first_claim_runs_the_job(tmp_path) -> None:
+    path = str(tmp_path / "jobs" / "v1.job.json")
+    claimed, job = JobMarker(path).claim()
+    assert claimed and job["status"] == "queued" and "pid" not in job
+
+    other = JobMarker(path)
+    assert other.claim() == (False, job)
+    JobMarker(path).update(status="failed", error="boom")
+    claimed, job = other.claim()
+    assert not claimed and job["status"] == "failed" and job["error"] == "boom"
+
+    claimed, job = other.claim(replace=("failed",))
+    assert claimed and job["status"] == "queued" and job["error"] is None
+    assert other.read() == job
+
+
+def test_job_of_a_dead_process_can_be_claimed_again(tmp_path) -> None:
+    path = tmp_path / "v1.job.json"
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[2]);"
+        "from src.models.job_state import JobMarker;"
+        "JobMarker(sys.argv[1]).claim()"
+    )
+    subprocess.run([sys.executable, "-c", code, str(path), str(Path(__file__).resolve().parents[1])], check=True)
+    assert JobMarker(str(path)).read()["status"] == "queued"
+
+    claimed, job = JobMarker(str(path)).claim()
+    assert claimed and job["status"] == "queued"
+
+    marker = JobMarker(str(path))
+    marker.remove()
+    assert marker.read() is None and not (tmp_path / "v1.job.json.lock").exists()
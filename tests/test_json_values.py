@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.data.json_values import float32_list
+
+
+def test_float32_list_drops_float64_noise_digits() -> None:
+    values = np.array([0.1, 0.53, -7.037352e-05, 123456789.0, 0.0], dtype=np.float32)
+    assert float32_list(values) == [0.1, 0.53, -7.037352e-05, 123456800.0, 0.0]
+    assert np.isnan(float32_list([np.nan])[0]) and float32_list([np.inf]) == [np.inf]
+
+
+def test_float32_list_keeps_float32_precision() -> None:
+    rng = np.random.default_rng(0)
+    values = (rng.normal(size=5000) * 10.0 ** rng.integers(-8, 8, 5000)).astype(np.float32)
+    rounded = np.array(float32_list(values))
+    np.testing.assert_allclose(rounded, values.astype(np.float64), rtol=5e-7, atol=0)
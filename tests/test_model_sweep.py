@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+az = pytest.importorskip("arviz")
+pytest.importorskip("pymc")
+from src.models.bayesian_change_point import add_pointwise_log_likelihood
+from src.models.model_sweep import plan_sweep_workers
+
+
+def test_worker_plan_respects_core_budget() -> None:
+    assert plan_sweep_workers(n_models=4, chains=4, core_budget=8) == (2, 4)
+    assert plan_sweep_workers(n_models=4, chains=2, core_budget=16) == (4, 2)
+    assert plan_sweep_workers(n_models=3, chains=4, core_budget=2) == (1, 2)
+    workers, cores = plan_sweep_workers(n_models=5, chains=3, core_budget=7)
+    assert workers * cores <= 7
+
+
+def test_pointwise_log_likelihood_follows_sampled_regimes() -> None:
+    returns = np.array([0.1, -0.2, 0.3, 1.0, 1.2])
+    trace = az.from_dict(
+        posterior={
+            "tau": np.array([[[2]]]),
+            "mu_regimes": np.array([[[0.0, 1.0]]]),
+            "sigma_regimes": np.array([[[1.0, 0.5]]]),
+        }
+    )
+    add_pointwise_log_likelihood(trace, returns)
+    loglik = trace.log_likelihood["obs"].values[0, 0]
+    mu = np.array([0.0, 0.0, 0.0, 1.0, 1.0])
+    sigma = np.array([1.0, 1.0, 1.0, 0.5, 0.5])
+    expected = -0.5 * ((returns - mu) / sigma) ** 2 - np.log(sigma) - 0.5 * np.log(2 * np.pi)
+    np.testing.assert_allclose(loglik, expected, rtol=1e-6)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("scipy")
+from src.models.online_change_point import (
+    init_online_state,
+    load_online_state,
+    run_online_pipeline,
+    summarize_online_state,
+    update_online_state,
+)
+
+
+def _shifted_returns(seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.concatenate(
+        [rng.normal(0.0, 0.01, 600), rng.normal(0.001, 0.03, 600), rng.normal(0.0, 0.015, 600)]
+    )
+
+
+def test_online_detector_finds_variance_breaks() -> None:
+    returns = _shifted_returns()
+    dates = pd.bdate_range("2000-01-03", periods=len(returns) + 1).to_numpy()
+    state = init_online_state(returns[:250], dates[0], max_run_length=400)
+    update_online_state(state, returns, dates[1:])
+    summary = summarize_online_state(state)
+    taus = [cp["tau_index"] for cp in summary["change_points"]]
+    assert len(taus) == 2
+    assert np.all(np.abs(np.array(taus) - np.array([599, 1199])) <= 20)
+    assert [cp["tau_date"] for cp in summary["change_points"]] == [
+        str(dates[tau])[:10] for tau in taus
+    ]
+    # Regime statistics come from the per-segment sums, not from stored returns.
+    first = summary["regimes"][0]
+    assert first["mu"] == pytest.approx(returns[: taus[0] + 1].mean())
+    assert first["sigma"] == pytest.approx(returns[: taus[0] + 1].std())
+
+
+def test_online_state_does_not_grow_with_history() -> None:
+    returns = _shifted_returns()
+    dates = pd.bdate_range("2000-01-03", periods=len(returns) + 1).to_numpy()
+    state = init_online_state(returns[:250], dates[0], max_run_length=100)
+    update_online_state(state, returns[:900], dates[1:901])
+    update_online_state(state, returns[900:], dates[901:])
+    assert state.n_obs == len(returns)
+    assert state.last_date == dates[-1]
+    assert len(state.log_probs) == len(state.run_start) == len(state.run_date) <= 100
+    assert state.segment_stats.shape == (3, len(state.segment_start)) and len(state.segment_start) < 50
+    assert state.segment_stats[0].sum() == len(returns)
+
+
+def test_appended_rows_match_full_history(tmp_path) -> None:
+    returns = _shifted_returns()
+    prices = pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2000-01-03", periods=len(returns) + 1).strftime("%Y-%m-%d"),
+            "Price": 50.0 * np.exp(np.concatenate([[0.0], np.cumsum(returns)])),
+        }
+    )
+    prices.to_csv(tmp_path / "full.csv", index=False)
+    full = run_online_pipeline(
+        str(tmp_path / "full.csv"), str(tmp_path / "full.npz"), str(tmp_path / "full.json")
+    )
+
+    csv_path = tmp_path / "appended.csv"
+    prices.iloc[:900].to_csv(csv_path, index=False)
+    run_online_pipeline(str(csv_path), str(tmp_path / "appended.npz"), None)
+    with csv_path.open("a", encoding="utf-8") as handle:
+        handle.write(prices.iloc[900:].to_csv(index=False, header=False))
+    appended = run_online_pipeline(str(csv_path), str(tmp_path / "appended.npz"), None)
+
+    state = load_online_state(str(tmp_path / "appended.npz"))
+    assert state is not None and state.n_obs == len(returns)
+    assert appended["change_points"] == full["change_points"]
+    for left, right in zip(appended["regimes"], full["regimes"]):
+        assert left["mu"] == pytest.approx(right["mu"])
+        assert left["sigma"] == pytest.approx(right["sigma"])
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.models.pelt_change_point import (
+    pelt_change_points,
+    pelt_fixed_change_points,
+    run_pelt_pipeline,
+    tau_prior_bounds,
+)
+
+
+def _shifted_returns(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.concatenate(
+        [rng.normal(0.0, 0.01, 400), rng.normal(0.002, 0.03, 400), rng.normal(0.0, 0.015, 400)]
+    )
+
+
+def test_pelt_recovers_mean_variance_breaks() -> None:
+    taus = pelt_change_points(_shifted_returns())
+    assert len(taus) == 2
+    assert np.all(np.abs(taus - np.array([399, 799])) <= 10)
+
+
+def test_pelt_grid_search_matches_exact_breaks() -> None:
+    returns = _shifted_returns()
+    exact = pelt_change_points(returns)
+    coarse = pelt_change_points(returns, max_grid=100)
+    assert np.all(np.abs(coarse - exact) <= 12)
+
+
+def test_fixed_count_and_prior_bounds() -> None:
+    taus = pelt_fixed_change_points(_shifted_returns(), n_change_points=1)
+    assert len(taus) == 1
+    lower, upper = tau_prior_bounds(taus, n_obs=1200, margin=50)
+    assert lower[0] == taus[0] - 50 and upper[0] == taus[0] + 50
+
+
+def test_pipeline_emits_summary_schema(tmp_path) -> None:
+    returns = _shifted_returns()
+    prices = 50.0 * np.exp(np.concatenate([[0.0], np.cumsum(returns)]))
+    df = pd.DataFrame({"Date": pd.bdate_range("2000-01-03", periods=len(prices)), "Price": prices})
+    df["log_return"] = np.log(df["Price"]).diff()
+    summary = run_pelt_pipeline(df, n_change_points=2, results_path=None)
+    assert summary["n_change_points"] == 2
+    assert len(summary["regimes"]) == 3
+    assert len(summary["business_impact"]) == 2
+
+    # The results directory is created rather than the write skipped.
+    results_path = tmp_path / "reports" / "change_point_results.json"
+    assert run_pelt_pipeline(df, n_change_points=2, results_path=str(results_path)) == summary
+    assert json.loads(results_path.read_text())["n_change_points"] == 2
+
+
+def test_pelt_does_not_import_pymc() -> None:
+    # Isolated interpreter (-I): no PYTHONPATH or sitecustomize preloading either stack.
+    repo_root = str(Path(__file__).resolve().parents[1])
+    code = (
+        f"import sys; sys.path.insert(0, {repo_root!r}); import src.models.pelt_change_point; "
+        "print(sorted({'pymc', 'arviz'} & {name.split('.')[0] for name in sys.modules}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-I", "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pytest
+
+az = pytest.importorskip("arviz")
+pytest.importorskip("pymc")
+from src.config import ModelConfig
+from src.models.posterior_cache import PosteriorCache, fit_cache_key
+
+
+def _trace(n_draws: int = 20) -> "az.InferenceData":
+    return az.from_dict(posterior={"mu_regimes": np.zeros((1, n_draws, 2))})
+
+
+def test_cache_key_tracks_data_and_config() -> None:
+    returns = np.array([np.nan, 0.01, -0.02, 0.03])
+    key = fit_cache_key(returns, ModelConfig())
+    assert key == fit_cache_key(returns[1:], ModelConfig())
+    assert key != fit_cache_key(returns[1:] * 2, ModelConfig())
+    assert key != fit_cache_key(returns, ModelConfig(n_change_points=3))
+
+
+def test_cache_roundtrip_and_lru_eviction(tmp_path) -> None:
+    cache = PosteriorCache(str(tmp_path), max_bytes=10**9)
+    cache.put("a", _trace())
+    cache.put("b", _trace())
+    assert cache.get("missing") is None
+    assert cache.get("a").posterior["mu_regimes"].shape == (1, 20, 2)
+
+    # "b" is now the least recently used entry.
+    os.utime(tmp_path / "b.nc", (0, 0))
+    size = max(entry["size_bytes"] for entry in cache.entries())
+    assert cache.prune(max_bytes=size) == ["b"]
+    assert [entry["key"] for entry in cache.entries()] == ["a"]
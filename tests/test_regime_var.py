@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.regime_var import regime_slices, run_regime_var_pipeline, spectral_radius
+from src.models.var_model import VAR_COLUMNS, fit_var
+
+
+def _simulate(coef: float, n: int, rng: np.random.Generator) -> np.ndarray:
+    values = np.zeros((n, len(VAR_COLUMNS)))
+    for t in range(1, n):
+        values[t] = coef * values[t - 1] + rng.normal(0, 1, len(VAR_COLUMNS))
+    return values
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    values = np.vstack([_simulate(0.2, 400, rng), _simulate(0.8, 400, rng)])
+    frame = pd.DataFrame(values, columns=list(VAR_COLUMNS))
+    frame.insert(0, "Date", pd.bdate_range("2010-01-01", periods=len(frame)))
+    return frame
+
+
+def _regimes(frame: pd.DataFrame, bounds: list) -> list:
+    dates = frame["Date"].dt.strftime("%Y-%m-%d").tolist()
+    return [
+        {"name": f"regime_{idx + 1}", "start_date": dates[lo], "end_date": dates[hi]}
+        for idx, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:]))
+    ]
+
+
+def test_regime_slices_give_shared_boundaries_to_the_later_regime() -> None:
+    frame = _frame()
+    regimes = _regimes(frame, [0, 400, 799])
+    assert regime_slices(frame["Date"], regimes) == [slice(0, 400), slice(400, 800)]
+    with pytest.raises(ValueError):
+        regime_slices(frame["Date"], [])
+
+
+def test_regime_vars_recover_each_regime_and_report_shifts(tmp_path) -> None:
+    frame = _frame()
+    results = tmp_path / "change_point_results.json"
+    results.write_text(json.dumps({"regimes": _regimes(frame, [0, 400, 797, 799])}))
+    output = tmp_path / "regime_var_results.json"
+
+    report = run_regime_var_pipeline(
+        frame, change_point_results_path=str(results), output_path=str(output), max_workers=2
+    )
+    assert json.loads(output.read_text())["coefficient_shifts"] == report["coefficient_shifts"]
+
+    calm, persistent, short = report["regimes"]
+    values = frame[list(VAR_COLUMNS)].to_numpy()
+    expected = fit_var(values[:400], calm["lag_order"])
+    assert calm["params"]["L1.GDP"]["GDP"] == pytest.approx(expected.params[2, 1])
+    assert calm["spectral_radius"] == pytest.approx(spectral_radius(expected))
+    assert calm["spectral_radius"] < persistent["spectral_radius"] < 1
+    assert short["status"] == "skipped" and short["n_rows"] == 3
+
+    first, second = report["coefficient_shifts"]
+    assert first["transition"] == "regime_1 -> regime_2"
+    assert first["largest_shift"]["param"].startswith("L1.")
+    assert first["spectral_radius_change"] > 0.4
+    assert "norm" not in second
+    assert report["full_sample"]["status"] == "fitted"
@@ -31,3 +31,123 @@ def test_shap_artifact_generation(tmp_path) -> None:
     )
     assert global_out.exists()
     assert local_out.exists()
+
+    charts = run_shap_analysis(df, selected_date="2020-02-10", render=False)
+    assert charts["global"]["labels"] == ["GDP", "Inflation", "ExchangeRate"]
+    assert charts["local"]["date"] == "2020-02-10" and charts["local"]["signed"]
+
+
+def test_shap_job_builds_versioned_artifacts_once(tmp_path) -> None:
+    from src.data.preprocess import preprocess_prices
+    from src.models.shap_artifacts import ShapArtifactStore, ShapJobRunner
+
+    n = 150
+    prices = preprocess_prices(
+        pd.DataFrame(
+            {
+                "Date": pd.bdate_range("2020-01-01", periods=n),
+                "Price": 60 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, n))),
+            }
+        )
+    )
+    calls = []
+
+    def load_prices() -> pd.DataFrame:
+        calls.append(1)
+        return prices
+
+    store = ShapArtifactStore(str(tmp_path / "shap"), keep=1)
+    runner = ShapJobRunner(store)
+    assert runner.submit("v1", load_prices)["status"] in {"queued", "running", "done"}
+    assert runner.wait("v1", timeout=300)["status"] == "done"
+    assert runner.submit("v1", load_prices)["status"] == "done"
+    assert len(calls) == 1
+
+    artifacts = store.load("v1")
+    assert artifacts.values.shape == (n - 1, 3) and artifacts.values.dtype == np.float32
+    assert not artifacts.values.flags.writeable
+    assert artifacts.global_plot.exists()
+    row = artifacts.explanation().row_for_date("2020-02-10")
+    assert str(artifacts.dates[row])[:10] == "2020-02-10"
+    assert artifacts.local_plot(row).name == "2020-02-10.png"
+
+    store.publish("v2", artifacts.explanation())
+    assert store.versions() == ["v2"]
+
+
+def test_shap_job_is_shared_by_runners_on_one_store(tmp_path) -> None:
+    """Two server workers: one builds, both report the same job."""
+    import threading
+
+    from src.data.preprocess import preprocess_prices
+    from src.models.shap_artifacts import ShapArtifactStore, ShapJobRunner
+
+    n = 150
+    prices = preprocess_prices(
+        pd.DataFrame(
+            {
+                "Date": pd.bdate_range("2020-01-01", periods=n),
+                "Price": 60 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.01, n))),
+            }
+        )
+    )
+    release = threading.Event()
+    calls = []
+
+    def load_prices() -> pd.DataFrame:
+        calls.append(1)
+        release.wait(60)
+        return prices
+
+    first = ShapJobRunner(ShapArtifactStore(str(tmp_path / "shap")))
+    second = ShapJobRunner(ShapArtifactStore(str(tmp_path / "shap")))
+    assert second.status("v1") is None
+    assert first.submit("v1", load_prices)["status"] == "queued"
+    assert second.submit("v1", load_prices)["status"] in {"queued", "running"}
+    assert second.status("v1")["status"] in {"queued", "running"}
+    release.set()
+    assert second.wait("v1", timeout=300)["status"] == "done"
+    assert first.status("v1")["status"] == "done"
+    assert len(calls) == 1
+
+
+def _macro_frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    return pd.DataFrame(
+        {
+            "Date": pd.date_range("2020-01-01", periods=n),
+            "GDP": np.linspace(100, 105, n) + rng.normal(0, 0.1, n),
+            "Inflation": 2 + np.sin(np.linspace(0, 6, n)),
+            "ExchangeRate": 1.1 + 0.01 * np.cos(np.linspace(0, 5, n)),
+            "log_return": rng.normal(0, 0.01, n),
+        }
+    )
+
+
+def test_parallel_shap_matches_exact() -> None:
+    from src.models.explainability import explain_macro_drivers
+
+    df = _macro_frame(60)
+    exact = explain_macro_drivers(df, method="exact")
+    parallel = explain_macro_drivers(df, method="parallel", n_jobs=2)
+    np.testing.assert_allclose(parallel.values, exact.values, atol=1e-12)
+    assert parallel.diagnostics["method"] == "parallel"
+    assert parallel.diagnostics["rows_explained"] == 60
+
+
+def test_approximate_shap_explains_stratified_sample() -> None:
+    from src.models.explainability import compare_shap_methods, stratified_rows
+
+    rows = stratified_rows(1000, 50, seed=1)
+    assert len(rows) == 50 and np.all(np.diff(rows) > 0)
+    # One row from each stratum of 20.
+    assert np.array_equal(rows // 20, np.arange(50))
+
+    report = compare_shap_methods(
+        _macro_frame(120), methods=("approximate",), sample_size=30, background_size=20
+    )
+    approximate = report["approximate"]
+    assert approximate["rows_explained"] == 30
+    assert approximate["background_size"] == 20
+    assert approximate["max_abs_error"] >= approximate["mean_abs_error"] >= 0
+    assert 0 <= approximate["global_importance_rel_error"] < 1
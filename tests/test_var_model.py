@@ -4,8 +4,7 @@ import numpy as np
 import pandas as pd
 import pytest
 
-pytest.importorskip("statsmodels")
-from src.models.var_model import run_var_pipeline
+from src.models.var_model import VAR_COLUMNS, fit_var, run_var_pipeline, select_lag_order
 
 
 def test_var_pipeline_returns_summary(tmp_path) -> None:
@@ -23,5 +22,113 @@ def test_var_pipeline_returns_summary(tmp_path) -> None:
     assert output.exists()
     assert summary["selected_lag"] >= 1
     assert "aic" in summary
-    assert summary["mode"] == "full-statsmodels"
+    assert summary["mode"] == "numpy-ols"
     assert "lag_order" in summary
+
+
+def _macro_frame(n: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    idx = np.arange(n, dtype=float)
+    return pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2015-01-01", periods=n),
+            "log_return": rng.normal(0, 0.02, n),
+            "GDP": 100 + 0.02 * idx + rng.normal(0, 0.1, n).cumsum(),
+            "Inflation": 2 + np.sin(idx / 20) + rng.normal(0, 0.05, n),
+            "ExchangeRate": 1.1 + rng.normal(0, 0.002, n).cumsum(),
+        }
+    )
+
+
+def test_lag_search_matches_statsmodels_select_order() -> None:
+    VAR = pytest.importorskip("statsmodels.tsa.api").VAR
+    values = _macro_frame()[list(VAR_COLUMNS)].to_numpy()
+    reference = VAR(values).select_order(5)
+    selection = select_lag_order(values, 5)
+    for name, row in selection["criteria"].items():
+        np.testing.assert_allclose(row, [reference.ics[name][lag] for lag in range(6)], rtol=1e-9)
+    assert selection["selected"] == reference.selected_orders
+
+
+@pytest.mark.parametrize("lags", [1, 3])
+def test_numpy_var_matches_statsmodels(lags) -> None:
+    VAR = pytest.importorskip("statsmodels.tsa.api").VAR
+    values = _macro_frame()[list(VAR_COLUMNS)].to_numpy()
+    reference = VAR(values).fit(lags)
+    result = fit_var(values, lags)
+
+    np.testing.assert_allclose(result.params, reference.params, rtol=1e-8, atol=1e-12)
+    np.testing.assert_allclose(result.sigma_u, reference.sigma_u, rtol=1e-8)
+    for name in ("aic", "bic", "hqic"):
+        assert getattr(result, name) == pytest.approx(getattr(reference, name), rel=1e-10)
+    for ours, theirs in zip(
+        result.forecast_interval(values, 10, alpha=0.1),
+        reference.forecast_interval(values[-lags:], 10, alpha=0.1),
+    ):
+        np.testing.assert_allclose(ours, theirs, rtol=1e-8, atol=1e-12)
+    impulse = reference.irf(12)
+    np.testing.assert_allclose(result.ma_rep(12), impulse.irfs, atol=1e-12)
+    np.testing.assert_allclose(result.orth_ma_rep(12), impulse.orth_irfs, atol=1e-12)
+    np.testing.assert_allclose(result.fevd(12), reference.fevd(12).decomp, atol=1e-12)
+
+
+def test_var_artifacts_are_built_once_and_reloaded(tmp_path) -> None:
+    from src.models.var_service import (
+        VarArtifactStore,
+        fevd_payload,
+        forecast_payload,
+        irf_payload,
+    )
+
+    frame = _macro_frame()
+    builds = []
+
+    def load_frame() -> pd.DataFrame:
+        builds.append(1)
+        return frame
+
+    store = VarArtifactStore(str(tmp_path))
+    artifacts = store.get_or_build("v1", load_frame)
+    assert store.get_or_build("v1", load_frame) is artifacts
+    assert len(builds) == 1
+
+    reloaded = VarArtifactStore(str(tmp_path)).load("v1")
+    assert reloaded is not None and reloaded.meta["lag_order"] == artifacts.meta["lag_order"]
+    assert reloaded.forecast.dtype == np.float32
+    assert reloaded.irf.shape == (21, 4, 4)
+
+    forecast = forecast_payload(reloaded, steps=5)
+    assert len(forecast["dates"]) == 5 and forecast["dates"][0] > reloaded.meta["last_date"]
+    band = forecast["forecast"]["log_return"]
+    assert all(lo <= mean <= hi for lo, mean, hi in zip(band["lower"], band["mean"], band["upper"]))
+
+    irf = irf_payload(reloaded, impulse="GDP", responses=["log_return"], periods=10)
+    assert list(irf["irf"]) == ["GDP"] and len(irf["irf"]["GDP"]["log_return"]) == 11
+    shares = fevd_payload(reloaded, "log_return")["fevd"]["log_return"]
+    np.testing.assert_allclose(np.sum(list(shares.values()), axis=0), 1.0, atol=1e-5)
+    with pytest.raises(ValueError):
+        irf_payload(reloaded, impulse="Brent")
+    # float32 arrays are served without float64 noise digits.
+    assert all(value == float(f"{value:.7g}") for value in band["mean"])
+
+
+def test_var_artifact_store_keeps_only_recent_versions(tmp_path) -> None:
+    import os
+
+    from src.models.var_service import VarArtifactStore, build_var_artifacts
+
+    frame = _macro_frame()
+    store = VarArtifactStore(str(tmp_path), keep=2)
+    for step, version in enumerate(("v1", "v2", "v3")):
+        store.publish(build_var_artifacts(frame, version))
+        # Distinct modification times, oldest first, whatever the clock resolution.
+        os.utime(tmp_path / f"{version}.json", ns=(step * 10**9, step * 10**9))
+    store.prune()
+    assert store.versions() == ["v3", "v2"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "v2.json",
+        "v2.npz",
+        "v3.json",
+        "v3.npz",
+    ]
+    assert store.load("v1") is None and store.load("v3") is not None
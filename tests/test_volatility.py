@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.volatility import VolatilityEngine
+
+
+def _returns(n_obs: int = 500) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    returns = rng.normal(0.0005, 0.02, n_obs)
+    returns[0] = np.nan
+    returns[200] = np.nan
+    return returns
+
+
+def test_rolling_std_matches_pandas_and_is_memoized() -> None:
+    returns = _returns()
+    engine = VolatilityEngine(returns, cache_size=2)
+    for window in (5, 30, 90):
+        expected = pd.Series(returns).rolling(window).std().to_numpy()
+        np.testing.assert_allclose(engine.rolling_std(window), expected, rtol=1e-9, equal_nan=True)
+
+    first = engine.rolling_std(30)
+    assert engine.rolling_std(30) is first
+    assert not first.flags.writeable
+    assert engine.cache_info() == {"entries": 2, "capacity": 2}
+    with pytest.raises(ValueError):
+        engine.rolling_std(0)
+
+
+def test_ewma_and_realized_volatility() -> None:
+    returns = _returns()
+    engine = VolatilityEngine(returns)
+
+    decay = 0.9
+    finite = returns[np.isfinite(returns)]
+    variance = float(np.mean(finite[:30] ** 2))
+    expected = []
+    for value in finite:
+        variance = decay * variance + (1 - decay) * value**2
+        expected.append(np.sqrt(variance))
+    ewma = engine.ewma(decay)
+    assert np.isnan(ewma[0]) and np.isnan(ewma[200])
+    np.testing.assert_allclose(ewma[np.isfinite(returns)], expected, rtol=1e-10)
+    with pytest.raises(ValueError):
+        engine.ewma(1.0)
+
+    realized = engine.realized(20, periods_per_year=252)
+    expected_realized = np.sqrt(252 / 20 * (pd.Series(returns) ** 2).rolling(20).sum())
+    np.testing.assert_allclose(realized, expected_realized, rtol=1e-9, equal_nan=True)
+
+
+def test_price_and_returns_plot_data_and_agg_render(tmp_path) -> None:
+    from src.analysis.time_series_properties import plot_price_and_returns, price_and_returns_data
+
+    returns = _returns()
+    df = pd.DataFrame(
+        {
+            "Date": pd.bdate_range("2020-01-01", periods=len(returns)),
+            "Price": 60 * np.exp(np.nancumsum(returns)),
+            "log_return": returns,
+        }
+    )
+    chart = plot_price_and_returns(df, render=False)
+    price, log_return = chart["panels"]
+    assert price["dates"][0] == "2020-01-01" and len(price["values"]) == len(df)
+    # Missing returns are left out rather than sent as NaN.
+    assert len(log_return["values"]) == len(df) - 2
+
+    sampled = price_and_returns_data(df, max_points=50)
+    assert all(len(panel["values"]) <= 50 for panel in sampled["panels"])
+
+    out = plot_price_and_returns(df, path=str(tmp_path / "series.png"))
+    assert out.read_bytes().startswith(b"\x89PNG")